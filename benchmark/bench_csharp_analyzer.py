@@ -0,0 +1,104 @@
+"""
+CSharpAnalyzer.analyze_file 吞吐量基準測試
+
+以合成的 C# 專案（預設 10k 個檔案，每檔一個 service class + interface）量測 files/s：
+
+- baseline: 每次使用查詢都重新編譯 tree-sitter Query，太慢所以只量測前幾個檔案
+- precompiled: 建構時編譯一次並重複使用 QueryCursor，每個檔案只跑一次合併查詢
+
+Usage:
+    python -m benchmark.bench_csharp_analyzer --files 10000
+"""
+import argparse
+import random
+import time
+
+from tree_sitter import Query, QueryCursor
+
+from src.analyzer.csharp_analyzer import CSharpAnalyzer
+from src.entity import SourceCodeEntity
+
+
+class PerCallCompiledAnalyzer(CSharpAnalyzer):
+    """每次使用查詢都重新編譯 Query（未預先編譯時的行為）"""
+
+    def _cursor(self, name: str) -> QueryCursor:
+        return QueryCursor(Query(self.lang, self.queries[name]))
+
+
+def generate_file(i: int, rng: random.Random, methods: int) -> str:
+    deps = [rng.randrange(max(i, 1)) for _ in range(3)]
+    fields = "\n".join(f"    private readonly IService{d} _service{d};" for d in deps)
+    params = ", ".join(f"IService{d} service{d}" for d in deps)
+    assigns = "\n".join(f"        _service{d} = service{d};" for d in deps)
+    bodies = []
+    for m in range(methods):
+        d = rng.choice(deps)
+        bodies.append(f"""
+    public async Task<Result{m}> Method{m}(int id, Request{m} request)
+    {{
+        var item = await _service{d}.Method{rng.randrange(methods)}(id, request);
+        if (item == null) {{ return NotFound(); }}
+        var mapped = Map{m}(item);
+        this._service{d}.Method{rng.randrange(methods)}(mapped.Id, request);
+        foreach (var entry in request.Items) {{ Validate(entry); }}
+        return new Result{m}(mapped);
+    }}""")
+    signatures = "\n".join(f"    Task<Result{m}> Method{m}(int id, Request{m} request);" for m in range(methods))
+    return f"""using System;
+using System.Threading.Tasks;
+
+namespace Bench.Services
+{{
+public interface IService{i}
+{{
+{signatures}
+}}
+
+public class Service{i} : ServiceBase, IService{i}
+{{
+{fields}
+
+    public Service{i}({params})
+    {{
+{assigns}
+    }}
+{"".join(bodies)}
+}}
+}}
+"""
+
+
+def time_analyzer(analyzer: CSharpAnalyzer, files: list[SourceCodeEntity]) -> float:
+    start = time.perf_counter()
+    for entity in files:
+        analyzer.analyze_file(entity)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSharpAnalyzer throughput")
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--methods", type=int, default=8, help="methods per generated class")
+    parser.add_argument("--baseline-files", type=int, default=100,
+                        help="baseline compiles ~0.05s of queries per call, so only a sample is timed")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    files = [
+        SourceCodeEntity(file_id=i, path=f"src/Services/Service{i}.cs", content=generate_file(i, rng, args.methods))
+        for i in range(args.files)
+    ]
+    print(f"files={len(files)} methods/file={args.methods}")
+
+    sample = files[:args.baseline_files]
+    baseline = len(sample) / time_analyzer(PerCallCompiledAnalyzer(), sample)
+    print(f"baseline (compile on use):   {baseline:10.1f} files/s (first {len(sample)} files)")
+    elapsed = time_analyzer(CSharpAnalyzer(), files)
+    precompiled = len(files) / elapsed
+    print(f"precompiled queries:         {precompiled:10.1f} files/s ({elapsed:.1f}s for {len(files)} files)")
+    print(f"speedup: {precompiled / baseline:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+find_caller_by_dep 熱路徑微基準測試
+
+以合成資料建立 N 筆相依關係的 run，量測工具每次呼叫
+（find_callee_by_caller + 每個結果一次 get_by_component_and_function）的平均延遲：
+
+- baseline: TinyDB 預設 JSONStorage + Query 全表掃描（每次查詢重新解析 JSON）
+- in-memory scan: 共用記憶體資料表，但仍以 Query 全表掃描
+- hash index: 預先建立並持久化的雜湊索引
+
+Usage:
+    python -m benchmark.bench_dependency_lookup --edges 100000
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from tinydb import TinyDB, Query
+
+
+def build_dataset(edges: int, seed: int = 7):
+    rng = random.Random(seed)
+    classes = max(edges // 20, 10)
+    func_maps = []
+    for i in range(classes):
+        funcs = [f"Method{j}" for j in range(10)]
+        func_maps.append({
+            "ciname": f"Component{i}",
+            "file_id": i // 2,
+            "path": f"src/Component{i // 2}.cs",
+            "type": "class",
+            "funcs": funcs,
+            "fcalls": {}
+        })
+
+    deps = []
+    for n in range(edges):
+        caller = func_maps[n % classes]
+        callee = func_maps[rng.randrange(classes)]
+        method = rng.choice(callee["funcs"])
+        deps.append({
+            "caller_file_id": caller["file_id"],
+            "caller_entity": caller["ciname"],
+            "caller_func": rng.choice(caller["funcs"]),
+            "callee_file_if": callee["file_id"],
+            "callee_entity": callee["ciname"],
+            "call": {"method": method, "expr": f"_dep{n % 40}.{method}(x)"}
+        })
+    return func_maps, deps
+
+
+def time_calls(lookup, probes) -> float:
+    start = time.perf_counter()
+    for probe in probes:
+        lookup(*probe)
+    return (time.perf_counter() - start) / len(probes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dependency tool lookups")
+    parser.add_argument("--edges", type=int, default=100000)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--baseline-calls", type=int, default=5, help="baseline re-parses JSON per call, keep this small")
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp()
+    os.environ["CACHE_PATH"] = cache_dir
+    os.environ["STORAGE_BACKEND"] = "tinydb"
+
+    from src.entity import DependencyEntity, FuncMapEntity
+    from src.model import DependencyModel, FuncMapModel
+    from src.storage import close_all, flush_all
+
+    try:
+        func_maps, deps = build_dataset(args.edges)
+        dependency_model = DependencyModel("bench")
+        func_map_model = FuncMapModel("bench")
+        dependency_model.batch_insert([DependencyEntity(**d) for d in deps])
+        func_map_model.batch_insert([FuncMapEntity(**f) for f in func_maps])
+        flush_all()
+
+        rng = random.Random(11)
+        probes = [
+            (d["caller_file_id"], d["caller_entity"], d["call"]["expr"])
+            for d in (rng.choice(deps) for _ in range(args.calls))
+        ]
+
+        # baseline: 與原本 model 相同的查詢方式
+        dep_db = TinyDB(os.path.join(cache_dir, "bench", "dep.json"))
+        func_db = TinyDB(os.path.join(cache_dir, "bench", "func_map.json"))
+        Dep, File = Query(), Query()
+
+        def baseline(file_id, component, expr):
+            rows = dep_db.search(
+                (Dep['caller_file_id'] == file_id) & (Dep['caller_entity'] == component) & (Dep['call']['expr'] == expr)
+            )
+            for row in rows:
+                func_db.search(
+                    (File.ciname == row["callee_entity"]) & (File.funcs.any([row["call"]["method"]])) &
+                    (File.file_id == row["callee_file_if"])
+                )
+
+        def scan(file_id, component, expr):
+            rows = dependency_model.db.db.search(
+                (Dep['caller_file_id'] == file_id) & (Dep['caller_entity'] == component) & (Dep['call']['expr'] == expr)
+            )
+            for row in rows:
+                func_map_model.db.db.search(
+                    (File.ciname == row["callee_entity"]) & (File.funcs.any([row["call"]["method"]])) &
+                    (File.file_id == row["callee_file_if"])
+                )
+
+        def indexed(file_id, component, expr):
+            for dep in dependency_model.find_callee_by_caller(file_id, component, expr):
+                func_map_model.get_by_component_and_function(dep.callee_entity, dep.call.method, dep.callee_file_if)
+
+        print(f"edges={len(deps)} components={len(func_maps)}")
+        baseline_latency = time_calls(baseline, probes[:args.baseline_calls])
+        print(f"baseline (JSONStorage + scan): {baseline_latency * 1000:10.3f} ms/call")
+        scan_latency = time_calls(scan, probes[:max(args.calls // 20, 1)])
+        print(f"in-memory scan:                {scan_latency * 1000:10.3f} ms/call")
+
+        start = time.perf_counter()
+        dependency_model.build_index()
+        func_map_model.build_index()
+        print(f"index build + persist:         {(time.perf_counter() - start) * 1000:10.3f} ms (once per run)")
+
+        indexed_latency = time_calls(indexed, probes)
+        print(f"hash index:                    {indexed_latency * 1000:10.3f} ms/call")
+        print(f"speedup vs baseline: {baseline_latency / indexed_latency:,.0f}x")
+    finally:
+        close_all()
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == "__main__":
+    main()
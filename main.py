@@ -53,7 +53,63 @@ async def main():
         help="Target function to analyze (e.g., 'main', 'run'). If specified, only files related to this function will be processed."
     )
     
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Maximum number of entry points analyzed concurrently (default: MAX_CONCURRENCY or 1)"
+    )
+    parser.add_argument(
+        "--stage-workers",
+        nargs="+",
+        help="Workers per stage, e.g. 'call_chain=4' 'feature=2' 'chart=1' 'doc=1'. Defaults to --concurrency."
+    )
+    
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Processes used to parse source files; 1 parses serially in-process, 0 uses every CPU (default: ANALYZER_JOBS or 1)"
+    )
+    
+    parser.add_argument(
+        "--call-chain-mode",
+        choices=["static", "llm"],
+        help="static: trace call chains from the dependency table and ask the model only for ambiguous calls; llm: let the agent trace with tools (default: CALL_CHAIN_MODE or static)"
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Always call the model instead of reusing responses from the shared LLM cache (cache/llm_cache.db)"
+    )
+    parser.add_argument(
+        "--no-func-map-cache",
+        action="store_true",
+        help="Re-parse every source file instead of reusing func maps of unchanged files from the shared cache (cache/func_map_cache.db)"
+    )
+    parser.add_argument(
+        "--incremental-from",
+        metavar="RUN_ID",
+        help="Compare the crawled files with a previous run and only re-analyze entry points whose call chain touches a changed file; everything else is copied from that run"
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Discard saved entry point progress and analyze every entry point from the first stage. By default a reused --run-id resumes where it stopped."
+    )
+    
     args = parser.parse_args()
+    
+    if args.concurrency:
+        config.max_concurrency = args.concurrency
+    if args.jobs is not None:
+        config.analyzer_jobs = args.jobs
+    if args.call_chain_mode:
+        config.call_chain_mode = args.call_chain_mode
+    if args.no_llm_cache:
+        config.llm_cache_enabled = False
+    if args.no_func_map_cache:
+        config.func_map_cache_enabled = False
+    if args.stage_workers:
+        config.stage_workers.update(config.parse_stage_workers(args.stage_workers))
 
     # Use provided patterns or defaults
     include_patterns = args.include if args.include else DEFAULT_INCLUDE_PATTERNS
@@ -69,7 +125,9 @@ async def main():
         run_id=args.run_id,
         appoint_entries=target_func,
         include_patterns=include_patterns,
-        exclude_patterns=exclude_patterns
+        exclude_patterns=exclude_patterns,
+        restart=args.restart,
+        incremental_from=args.incremental_from
     )
 
 if __name__ == "__main__":
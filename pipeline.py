@@ -1,16 +1,20 @@
-import asyncio
-import re
 from datetime import datetime
 from typing import Optional
-from openai import RateLimitError
 
-from src.agent import CallChainAnalyzerAgent, CallChainFinisherAgent, EntryPointDetectorAgent, FeatureAnalyzerAgent, GenerateChartAgent, GenerateDocumentationAgent
+from src.agent import CallChainAnalyzerAgent, CallChainFinisherAgent, CallDisambiguatorAgent, EntryPointDetectorAgent, FeatureAnalyzerAgent, GenerateChartAgent, GenerateDocumentationAgent, MethodSummaryAgent
+from src.agent.function_tool import ToolContext
+from src.analyzer.call_chain_tracer import CallChainTracer
 from src.analyzer.code_dependency_analyzer import CodeDependencyAnalyzer
+from src.analyzer.dependency_graph import DependencyGraph
+from src.analyzer.func_map_cache import open_func_map_cache
 from src.analyzer.language_analyze_provider import LanguageAnalyzeProvider
 from src.core.config import Config
-from src.entity import FeatureStatusEntity
-from src.model import CallChainAnalysisModel, DependencyModel, EntryPointModel, FeatureAnalysisModel, FuncMapModel, SourceCodeModel, FeatureStatusModel, ChartModel
-from src.service import AnalysisService,DependencyService,EntryPointService, SourceCodeService, FuncMapService, ChartService, GenerateDocumentationService
+from src.core.stage_scheduler import Stage, StageScheduler
+from src.entity import EntryPointEntity
+from src.llm import ModelClientFactory, get_api_key_pool, is_rate_limit_error, parse_retry_delay_seconds
+from src.model import CallChainAnalysisModel, DependencyModel, EntryPointModel, FeatureAnalysisModel, FuncMapModel, SourceCodeModel, FeatureStatusModel, ChartModel, ImplementationModel
+from src.service import AnalysisService,DependencyService,EntryPointService, SourceCodeService, FuncMapService, ChartService, GenerateDocumentationService, FeatureStatusService, IncrementalService, FeaturePromptBuilder, MethodSummaryService, open_method_summary_cache
+from src.storage import close_all, flush_all
 class Pipeline:
     def __init__(self, config: Config):
         self.config = config
@@ -22,7 +26,9 @@ class Pipeline:
         run_id: Optional[str] = None,
         appoint_entries: Optional[list[str]] = None,
         include_patterns: Optional[list[str]] = None,
-        exclude_patterns: Optional[list[str]] = None
+        exclude_patterns: Optional[list[str]] = None,
+        restart: bool = False,
+        incremental_from: Optional[str] = None
     ):
         # Generate or use provided run_id
         if not run_id:
@@ -30,9 +36,37 @@ class Pipeline:
         
         print(f"Starting pipeline with run_id: {run_id}")
         
+        # 整個 run 共用的 model client，結束時關閉連線
+        client_factory = ModelClientFactory(self.config)
+        try:
+            await self._run(
+                run_id, client_factory, target_dir, lang, appoint_entries, include_patterns, exclude_patterns,
+                restart, incremental_from)
+        finally:
+            await client_factory.close()
+            # 寫回所有尚未落地的快取資料
+            close_all()
+
+    async def _run(
+        self,
+        run_id: str,
+        client_factory: ModelClientFactory,
+        target_dir: str,
+        lang: str,
+        appoint_entries: Optional[list[str]],
+        include_patterns: Optional[list[str]],
+        exclude_patterns: Optional[list[str]],
+        restart: bool,
+        incremental_from: Optional[str]
+    ):
+        max_concurrency = max(self.config.max_concurrency, 1)
+        # 多個入口點同時執行時不串流 agent 訊息，避免輸出交錯
+        stream_console = max_concurrency == 1
+        
         source_code_model = SourceCodeModel(run_id)
         dependency_model = DependencyModel(run_id)
         func_map_model = FuncMapModel(run_id)
+        implementation_model = ImplementationModel(run_id)
         entry_point_model = EntryPointModel(run_id)
         call_chain_analysis_model = CallChainAnalysisModel(run_id)
         feature_analysis_model = FeatureAnalysisModel(run_id)
@@ -41,22 +75,44 @@ class Pipeline:
         lang_provider = LanguageAnalyzeProvider()
         code_analyzer = CodeDependencyAnalyzer()
         
-        entry_point_detector_agent =  EntryPointDetectorAgent(self.config)
+        entry_point_detector_agent =  EntryPointDetectorAgent(self.config, client_factory)
         
         source_code_service = SourceCodeService(self.config, source_code_model)
+        func_map_cache = None
+        if self.config.func_map_cache_enabled:
+            func_map_cache = open_func_map_cache(self.config.cache_path, self.config.func_map_cache_ttl_days)
         func_map_service = FuncMapService(
-            func_map_model, source_code_model, lang_provider
+            func_map_model, source_code_model, lang_provider, self.config.analyzer_jobs, func_map_cache=func_map_cache
         )
         dependency_service = DependencyService(
-            dependency_model, func_map_model, code_analyzer
+            dependency_model, func_map_model, code_analyzer, implementation_model
         )
         entry_point_service = EntryPointService(self.config, 
             entry_point_model, func_map_model,
             source_code_model, entry_point_detector_agent
         )
-        call_chain_analyzer_agent = CallChainAnalyzerAgent(self.config, run_id)
-        call_chain_finish_agent = CallChainFinisherAgent(self.config)
-        feature_analyzer_agent = FeatureAnalyzerAgent(self.config, lang)
+        tool_context = ToolContext(run_id)
+        # 相依表在 Step 2 之後才完整，warm() 之後再載入
+        dependency_graph = DependencyGraph(tool_context.dependency_model)
+        call_chain_analyzer_agent = CallChainAnalyzerAgent(self.config, client_factory, tool_context)
+        call_chain_finish_agent = CallChainFinisherAgent(self.config, client_factory)
+        feature_analyzer_agent = FeatureAnalyzerAgent(self.config, client_factory, lang)
+        call_chain_tracer = None
+        call_disambiguator_agent = None
+        if self.config.call_chain_mode == "static":
+            call_chain_tracer = CallChainTracer(tool_context.func_map_model, tool_context.dependency_model)
+            call_disambiguator_agent = CallDisambiguatorAgent(self.config, client_factory)
+        method_summary_service = None
+        if self.config.method_summary_enabled:
+            # 摘要跨 run 共用，模型或輸出語言不同時分開存放
+            method_summary_cache = open_method_summary_cache(
+                self.config.cache_path, f"{self.config.default_model}:{lang}", self.config.method_summary_cache_ttl_days)
+            method_summary_cache.prune()
+            method_summary_service = MethodSummaryService(
+                method_summary_cache, tool_context.source_code_model,
+                MethodSummaryAgent(self.config, client_factory, lang), dependency_graph,
+                self.config.get_stage_workers("method_summary")
+            )
         
         analysis_service = AnalysisService(
             entry_point_model,
@@ -65,34 +121,78 @@ class Pipeline:
             source_code_model,
             call_chain_analyzer_agent,
             call_chain_finish_agent,
-            feature_analyzer_agent
+            feature_analyzer_agent,
+            stream_console,
+            call_chain_tracer,
+            call_disambiguator_agent,
+            FeaturePromptBuilder(
+                tool_context.source_code_model, tool_context.func_map_model, self.config.feature_prompt_token_budget
+            ),
+            feature_status_model,
+            method_summary_service,
+            dependency_graph
         )
         
-        generate_chart_agent = GenerateChartAgent(self.config, lang)
-        chart_service = ChartService(chart_model, feature_analysis_model, generate_chart_agent)
+        generate_chart_agent = GenerateChartAgent(self.config, client_factory, lang)
+        chart_service = ChartService(chart_model, feature_analysis_model, generate_chart_agent, stream_console)
         
-        generate_documentation_agent = GenerateDocumentationAgent(self.config, lang)
+        generate_documentation_agent = GenerateDocumentationAgent(self.config, client_factory, lang)
         documentation_service = GenerateDocumentationService(
-            run_id, feature_analysis_model, chart_model, generate_documentation_agent)
+            run_id, feature_analysis_model, chart_model, generate_documentation_agent, stream_console)
+        feature_status_service = FeatureStatusService(
+            feature_status_model, entry_point_model,
+            call_chain_analysis_model, feature_analysis_model,
+            chart_model, documentation_service
+        )
+        incremental_service = None
+        if incremental_from:
+            incremental_service = IncrementalService(
+                incremental_from, source_code_model, func_map_model, dependency_model, entry_point_model,
+                call_chain_analysis_model, feature_analysis_model, chart_model, documentation_service
+            )
         
         # Step 1: Source code extraction
         if not source_code_service.has_cache():
             source_code_ent = source_code_service.crawl_repo(target_dir, include_patterns, exclude_patterns)
+            if incremental_service:
+                source_code_ent = incremental_service.assign_stable_ids(source_code_ent)
             print(f"--- Crawled {len(source_code_ent)} files ---")
             source_code_service.save_cache(source_code_ent)
+            flush_all()
         
         # Step 2: Function mapping and dependency analysis
         if not func_map_service.has_cache():
             print(f"--- Analyzing functions ---")
-            func_map = func_map_service.analyze_file()
+            if incremental_service:
+                # 未變動的檔案沿用先前 run 的 func map，只解析新增 / 修改的檔案
+                changed, removed = incremental_service.diff()
+                func_map = incremental_service.previous_func_maps(changed | removed)
+                func_map += func_map_service.analyze_file(changed)
+            else:
+                func_map = func_map_service.analyze_file()
             func_map_service.save_cache(func_map)
+            flush_all()
             
         if not dependency_service.has_cache():
             print(f"--- Analyzing dependencies ---")
-            deps = dependency_service.analyze_dependencies()
-            dependency_service.save_cache(deps)
+            implementations = dependency_service.analyze_implementations()
+            deps = dependency_service.analyze_dependencies(implementations)
+            print(f" > {len(deps)} dependencies, {len(implementations)} interface implementations")
+            dependency_service.save_cache(deps, implementations)
+            flush_all()
             
         # Step 3: Entry point extraction
+        if not entry_point_service.has_cache() and incremental_service:
+            # 沿用先前 run 的入口點，未受影響的入口點一併複製各階段的結果
+            incremental_service.carry_forward()
+            # 只對新增 / 修改的檔案偵測入口點，合併先前 run 沒有的入口點
+            changed, _ = incremental_service.diff()
+            if changed:
+                print(f"--- Analyzing entry points in {len(changed)} changed files ---")
+                detected = await entry_point_service.extract_entry_points(appoint_entries, file_ids=changed)
+                incremental_service.merge_entry_points(detected)
+            flush_all()
+        
         if not entry_point_service.has_cache():
             print(f"--- Analyzing entry points ---")
             entry_points = await entry_point_service.extract_entry_points(appoint_entries)
@@ -102,95 +202,120 @@ class Pipeline:
                 return
             
             entry_point_service.save_cache(entry_points)
+            flush_all()
 
-        # Reset feature status for all entry points
-        feature_status_model.truncate()
-        feature_statuses = [
-            FeatureStatusEntity(
-                id=ep.entry_id,
-                component=ep.component,
-                name=ep.name,
-                state="pending",
-                retry_count=0
-            )
-            for ep in entry_point_model.all()
-        ]
-        feature_status_model.batch_insert(feature_statuses)
+        # 預設延續上次的進度：保留狀態與 retry 次數，只重新排程未完成的階段
+        if restart:
+            statuses = feature_status_service.reset()
+        else:
+            statuses = feature_status_service.reconcile()
+            done = sum(1 for status in statuses if status.state == "done")
+            print(f"--- Resuming: {done}/{len(statuses)} entry points already done ---")
+        flush_all()
+        
+        # 所有 agent 共用同一份已載入記憶體的 func map / 相依關係 / 原始碼索引
+        tool_context.warm()
+        dependency_graph.load()
+        dependency_graph.print_cycles()
         
-        # Step 4: Analysis feature - 重複執行直到全部完成
+        # Step 4: Analysis feature
+        # call chain → feature → chart → doc 各自有獨立的佇列與 worker 數量，
+        # 失敗的入口點帶著延遲放回失敗的階段，feat_status 只作為進度紀錄
         retry_max_time = 3
-        while feature_status_model.has_pending_work(retry_max_time):
-            pending_entries = feature_status_model.get_pending_or_failed_entries(retry_max_time)
-            
-            for status_entry in pending_entries:
-                # 從 entry_point_model 找到對應的完整 entry point 資訊
-                ep = next((ep for ep in entry_point_model.all() if ep.entry_id == status_entry.id), None)
-                if not ep:
-                    continue
-
-                print(f"--- Analyzing {ep.component}.{ep.name} (attempt {status_entry.retry_count + 1}) ---")
-                
-                try:
-                    feature_status_model.to_running(ep.entry_id)
-                    
-                    # Call chain analysis
-                    if not analysis_service.has_analyze_call_chain_cache(ep):
-                        await analysis_service.analyze_call_chain(ep)
-                    else:
-                        print(f" > HIT CACHE: Call chain analysis for {ep.component}.{ep.name}")
-                        
-                    # Feature analysis
-                    #  todo: 分析後 component name 有機會出錯 要調整
-                    if not analysis_service.has_analyze_feature_cache(ep):
-                        await analysis_service.analyze_feature(ep)
-                    else:
-                        print(f" > HIT CACHE: Feature analysis for {ep.component}.{ep.name}")
-                        
-                    # generate chart 
-                    if not chart_service.has_cache(ep.entry_id):
-                        chart = await chart_service.generate_chart(ep)
-                        chart_service.save_cache(chart)
-                    else:
-                        print(f" > HIT CACHE: Chart for {ep.component}.{ep.name}")
-                        
-                    # generate documentation
-                    if not documentation_service.has_cache(ep):
-                        await documentation_service.generate_and_save(ep)
-                    else:
-                        print(f" > HIT CACHE: Documentation for {ep.component}.{ep.name}")
-                        
-                    feature_status_model.to_done(ep.entry_id)
-                    print(f"Completed {ep.component}.{ep.name}")
-
-                except (RateLimitError, Exception) as e:
-                    # Check if it's a rate limit error (could be wrapped)
-                    if "429" in str(e) or "rate limit" in str(e).lower() or "quota" in str(e).lower():
-                        delay = self._parse_retry_delay_seconds(e)
-                        if delay is not None:
-                            delay += 5
-                            print(f" > Rate limit exceeded, will retry after {delay} seconds")
-                            await asyncio.sleep(delay)
-                        else:
-                            print(f" > Rate limit exceeded, will retry after 60 seconds")
-                            await asyncio.sleep(60)
-                        feature_status_model.inc_retry(ep.entry_id)
-                        feature_status_model.to_failed(ep.entry_id)  # Mark as failed to be picked up in next iteration
-                    else:
-                        # Other exceptions - increment retry and mark as failed
-                        feature_status_model.inc_retry(ep.entry_id)
-                        feature_status_model.to_failed(ep.entry_id)
-                        print(f"{ep.component}.{ep.name} failed with error: {str(e)}")
+        
+        def track(stage: str, handler):
+            async def run_stage(ep: EntryPointEntity):
+                feature_status_model.to_running(ep.entry_id)
+                await handler(ep)
+                feature_status_model.complete_stage(ep.entry_id, stage)
+                # 每個階段的結果立即落地，中斷後 reconcile 才看得到
+                flush_all()
+            return run_stage
+        
+        async def call_chain_stage(ep: EntryPointEntity):
+            print(f"--- Analyzing {ep.component}.{ep.name} ---")
+            if not analysis_service.has_analyze_call_chain_cache(ep):
+                await analysis_service.analyze_call_chain(ep)
+            else:
+                print(f" > HIT CACHE: Call chain analysis for {ep.component}.{ep.name}")
+        
+        async def feature_stage(ep: EntryPointEntity):
+            #  todo: 分析後 component name 有機會出錯 要調整
+            if not analysis_service.has_analyze_feature_cache(ep):
+                await analysis_service.analyze_feature(ep)
+            else:
+                print(f" > HIT CACHE: Feature analysis for {ep.component}.{ep.name}")
+        
+        async def chart_stage(ep: EntryPointEntity):
+            if not chart_service.has_cache(ep.entry_id):
+                chart = await chart_service.generate_chart(ep)
+                chart_service.save_cache(chart)
+            else:
+                print(f" > HIT CACHE: Chart for {ep.component}.{ep.name}")
+        
+        async def doc_stage(ep: EntryPointEntity):
+            if not documentation_service.has_cache(ep):
+                await documentation_service.generate_and_save(ep)
+            else:
+                print(f" > HIT CACHE: Documentation for {ep.component}.{ep.name}")
+        
+        async def on_done(ep: EntryPointEntity):
+            feature_status_model.to_done(ep.entry_id)
+            flush_all()
+            print(f"Completed {ep.component}.{ep.name}")
+        
+        async def on_failed(ep: EntryPointEntity, stage: str, e: Exception) -> Optional[float]:
+            attempt = feature_status_model.get_retry_count(ep.entry_id) + 1
+            delay = None
+            if attempt < retry_max_time:
+                delay = self._retry_delay_seconds(e, attempt)
+            feature_status_model.record_failure(ep.entry_id, stage, e, delay)
+            flush_all()
             
-            # Small delay between iterations to avoid tight loop
-            if feature_status_model.has_pending_work(retry_max_time):
-                await asyncio.sleep(1)
+            if delay is None:
+                print(f"{ep.component}.{ep.name} failed at {stage} after {attempt} attempts with error: {str(e)}")
+            elif is_rate_limit_error(e):
+                print(f" > Rate limit exceeded on {ep.component}.{ep.name} ({stage}), will retry after {delay:.0f} seconds")
+            else:
+                print(f"{ep.component}.{ep.name} failed at {stage} with error: {str(e)}, will retry after {delay:.0f} seconds")
+            return delay
+        
+        entry_points = {ep.entry_id: ep for ep in entry_point_model.all()}
+        pending = {
+            status.id: status
+            for status in feature_status_model.get_pending_or_failed_entries(retry_max_time)
+            if status.id in entry_points
+        }
+        # 呼叫深度淺的入口點先分析：它們經過的共用方法（repository、client）先完成摘要，之後的入口點直接使用
+        entries = sorted(
+            (entry_points[entry_id] for entry_id in pending),
+            key=lambda ep: dependency_graph.order_key((ep.file_id, ep.component, ep.name))
+        )
+        
+        scheduler = StageScheduler(
+            [
+                Stage("call_chain", track("call_chain", call_chain_stage), self.config.get_stage_workers("call_chain")),
+                Stage("feature", track("feature", feature_stage), self.config.get_stage_workers("feature")),
+                Stage("chart", track("chart", chart_stage), self.config.get_stage_workers("chart")),
+                Stage("doc", track("doc", doc_stage), self.config.get_stage_workers("doc")),
+            ],
+            on_done=on_done,
+            on_failed=on_failed,
+            max_in_flight=max_concurrency,
+            report_interval=self.config.stage_report_interval
+        )
+        # 上次失敗後排定的重試時間尚未到的入口點，延遲到該時間才進入佇列
+        await scheduler.run(
+            entries,
+            start_stage=lambda ep: FeatureStatusService.next_stage(pending[ep.entry_id]),
+            start_delay=lambda ep: FeatureStatusService.start_delay(pending[ep.entry_id]))
+        if method_summary_service is not None:
+            method_summary_service.method_summary_cache.print_stats()
+        get_api_key_pool(self.config).print_usage()
 
-            
-    def _parse_retry_delay_seconds(self, e: Exception) -> Optional[int]:
-        """從 Gemini/Google 風格錯誤物件中抓 retryDelay（形如 '36s'）"""
-        s = str(e)
-        match = re.search(r'"retryDelay":\s*"(\d+)s"', s)
-        if match:
-            return int(match.group(1))
-        return None
-        
\ No newline at end of file
+    def _retry_delay_seconds(self, e: Exception, attempt: int) -> float:
+        """Rate limit 依伺服器提供的 retryDelay（沒有則 60 秒），其他錯誤以指數退避"""
+        if is_rate_limit_error(e):
+            delay = parse_retry_delay_seconds(e)
+            return delay + 5 if delay is not None else 60
+        return float(2 ** attempt)
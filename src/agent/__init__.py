@@ -1,15 +1,19 @@
 from .call_chain_analyzer_agent import CallChainAnalyzerAgent
 from .call_chain_finisher_agent import CallChainFinisherAgent
+from .call_disambiguator_agent import CallDisambiguatorAgent
 from .entry_point_detect_agent import EntryPointDetectorAgent
 from .feature_analyzer_agent import FeatureAnalyzerAgent
 from .generate_chart_agent import GenerateChartAgent
 from .generate_documentation_agent import GenerateDocumentationAgent
+from .method_summary_agent import MethodSummaryAgent
 
 __all__ = [
     'CallChainAnalyzerAgent',
     'CallChainFinisherAgent',
+    'CallDisambiguatorAgent',
     'EntryPointDetectorAgent', 
     'FeatureAnalyzerAgent',
     'GenerateChartAgent',
-    'GenerateDocumentationAgent'
+    'GenerateDocumentationAgent',
+    'MethodSummaryAgent'
 ]
\ No newline at end of file
@@ -1,21 +1,19 @@
 from autogen_agentchat.agents import AssistantAgent
 from autogen_core.models import ChatCompletionClient
-from autogen_ext.models.openai import OpenAIChatCompletionClient
 from autogen_core.models._model_client import ModelInfo
-from src.agent.function_tool.dependency_tools import create_dependency_tools
-from src.agent.function_tool.source_code_tools import create_source_code_tools
+from src.agent.function_tool.tool_context import ToolContext
 from src.core.config import Config
+from src.llm import ModelClientFactory
 
 class CallChainAnalyzerAgent:
-    def __init__(self, config: Config, run_id: str):
+    def __init__(self, config: Config, client_factory: ModelClientFactory, tool_context: ToolContext):
         self.config = config
-        self.run_id = run_id
+        self.client_factory = client_factory
+        self.tool_context = tool_context
         
     def _get_client(self) -> ChatCompletionClient:
-        return OpenAIChatCompletionClient(
-            model=self.config.default_model,
-            api_key=self.config.api_key_map["gemini"],
-            base_url=self.config.base_url_map["gemini"],
+        return self.client_factory.get_client(
+            self.config.default_model,
             model_info=ModelInfo(
                 vision=False,
                 function_calling=True,
@@ -31,13 +29,14 @@ class CallChainAnalyzerAgent:
         if not func_name:
             raise ValueError("Function name is required to create CallChainAnalyzerAgent")
         
-        dependency_tools = await create_dependency_tools(self.run_id)
-        source_code_tools = await create_source_code_tools(self.run_id)
+        shared_tools = await self.tool_context.get_tools()
         
         tools = [
-            dependency_tools["get_func_map"],
-            dependency_tools["find_caller_by_dep"],
-            source_code_tools["get_file_content"]
+            shared_tools["get_func_map"],
+            shared_tools["find_caller_by_dep"],
+            shared_tools["find_implementations"],
+            shared_tools["get_method_source"],
+            shared_tools["get_file_content"]
         ]
         
         return AssistantAgent(
@@ -59,13 +58,15 @@ Your mission: **discover the complete function call chain for a given entry poin
     "name": "<function_name>",
     "component": "<class_or_component>",
     "file_id": <file_id>
-  }
+  },
+  "known_cycles": ["<Component.Method -> Component.Method -> ...>"]
 }
 ````
 
 * **name**: the entry function to analyze
 * **component**: the class/component containing the entry function
 * **file_id**: ID of the file containing the entry function
+* **known_cycles** (optional): call cycles reachable from the entry point, found by static analysis. Trace each method in a cycle only once; when a call leads back to a method already in the call_chain, do not query it again.
 
 ---
 
@@ -105,7 +106,8 @@ b. For each `expr` in the calls returned:
 ### 3. **Edge Cases**
 
 * **Self-recursion (`this.xxx` or same file_id)**: Skip to avoid infinite loops.
-* **Interfaces**: Skip interfaces (type="interface") since we need actual call chains, not interface definitions.
+* **Interfaces**: Never add interfaces (type="interface") to the call_chain. When a call goes through an interface (e.g. an injected `IUserService`), use `find_implementations(interface)` to get the implementing components and continue with those.
+* **Reading source**: When the func map is not enough to decide whether an `expr` matches a candidate, read just that method with `get_method_source(file_id, component, method)`. Use `get_file_content` only when the whole file is really needed.
 * **Empty Results**: Always respond with empty structure and explain reason in `stop_reason` (e.g., no calls found, all calls self-recursive, etc.)
 ---
 ## DRAFT OUTPUT (must-do)
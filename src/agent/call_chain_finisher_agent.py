@@ -1,19 +1,19 @@
 from autogen_agentchat.agents import AssistantAgent
 from autogen_core.models import ChatCompletionClient
-from autogen_ext.models.openai import OpenAIChatCompletionClient
 from autogen_core.models._model_client import ModelInfo
 from src.core.config import Config
+from src.llm import ModelClientFactory
 from src.entity import CallChainResultEntity
 
 class CallChainFinisherAgent:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, client_factory: ModelClientFactory):
         self.config = config
+        self.client_factory = client_factory
         
     def _get_client(self) -> ChatCompletionClient:
-        return OpenAIChatCompletionClient(
-            model="gemini-2.5-flash-lite",
-            api_key=self.config.api_key_map["gemini"],
-            base_url=self.config.base_url_map["gemini"],
+        return self.client_factory.get_client(
+            self.config.finisher_model,
+            cached=True,
             model_info=ModelInfo(
                 vision=False,
                 function_calling=False,
@@ -0,0 +1,57 @@
+from autogen_agentchat.agents import AssistantAgent
+from autogen_core.models import ChatCompletionClient
+from autogen_core.models._model_client import ModelInfo
+from src.core.config import Config
+from src.llm import ModelClientFactory
+from src.entity import CallDisambiguationEntity
+
+class CallDisambiguatorAgent:
+    def __init__(self, config: Config, client_factory: ModelClientFactory):
+        self.config = config
+        self.client_factory = client_factory
+        
+    def _get_client(self) -> ChatCompletionClient:
+        return self.client_factory.get_client(
+            self.config.default_model,
+            cached=True,
+            model_info=ModelInfo(
+                vision=False,
+                function_calling=False,
+                json_output=True,
+                family=None,
+                structured_output=True
+            ),
+            parallel_tool_calls=False,
+        )
+    
+    def get_agent(self, func_name: str) -> AssistantAgent:
+        if not func_name:
+            raise ValueError("Function name is required to create CallDisambiguatorAgent")
+        
+        return AssistantAgent(
+            name=f"{func_name[:50]}_disambiguator",
+            model_client=self._get_client(),
+            output_content_type=CallDisambiguationEntity,
+            system_message="""You are the Call Disambiguator.
+
+A static call-chain tracer found a call expression that may resolve to several components.
+Decide which candidates the expression actually calls.
+
+## INPUT
+```json
+{
+  "caller": {"component": "<class>", "method": "<method>", "path": "<file path>"},
+  "expr": "<call expression, whitespace removed>",
+  "source": "<source code around the caller method>",
+  "candidates": [
+    {"index": 0, "component": "<class>", "method": "<method>", "path": "<file path>"}
+  ]
+}
+```
+
+## RULES
+- Use the receiver of `expr` (field, property, parameter or local variable) and its declared type in `source` to decide.
+- An interface-typed receiver may resolve to every implementation of that interface; select all of them.
+- Select nothing if the call clearly targets framework or third-party code.
+- Output ONLY via structured output: `selected` (candidate indexes) and a short `reason`.
+""")
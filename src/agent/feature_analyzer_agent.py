@@ -1,20 +1,20 @@
 from autogen_agentchat.agents import AssistantAgent
 from autogen_core.models import ChatCompletionClient
-from autogen_ext.models.openai import OpenAIChatCompletionClient
 from autogen_core.models._model_client import ModelInfo
 from src.core.config import Config
+from src.llm import ModelClientFactory
 from src.entity import FeatureAnalysisEntity
 
 class FeatureAnalyzerAgent:
-    def __init__(self, config: Config, lang: str):
+    def __init__(self, config: Config, client_factory: ModelClientFactory, lang: str):
         self.config = config
+        self.client_factory = client_factory
         self.lang = lang
         
     def _get_client(self) -> ChatCompletionClient:
-        return OpenAIChatCompletionClient(
-            model=self.config.default_model,
-            api_key=self.config.api_key_map["gemini"],
-            base_url=self.config.base_url_map["gemini"],
+        return self.client_factory.get_client(
+            self.config.default_model,
+            cached=True,
             model_info=ModelInfo(
                 vision=False,
                 function_calling=False,
@@ -52,6 +52,27 @@ You will receive a JSON object containing function name and source code files:
 }}
 ```
 
+Each "content" is an excerpt of the file, not the whole file: it contains only the classes on the call chain, with their
+fields, properties, constructors and the traced methods in full. Methods that are not on the call chain are replaced by a
+`// <Name>(...) omitted` comment. Files without span information are sent in full.
+
+The input may also contain "method_summaries": pre-computed summaries of the call-chain methods whose source is NOT in
+"contents" (the entry point file is always included as source):
+```json
+"method_summaries": [
+    {{
+        "file_id": <int>, "path": "<string>", "component": "<class>", "method": "<method>",
+        "calls": ["<call expressions made by this method>"],
+        "role": "<role>", "desc": "<what the method does>",
+        "data_access": {{"r": ["<table>"], "w": ["<table>"]}},
+        "external_api": [{{"endpoint": "<url>", "method": "<HTTP method>"}}],
+        "confidence": <float>
+    }}
+]
+```
+Treat each summary as the analysis of that method: use its role, data_access and external_api for the call chain step,
+merge them into table_read / table_write / external_api, include its file_id in include_file_id, and use "calls" to order the chain.
+
 ## Analysis Requirements
 
 Analyze the target function specified in the "func" field and all related code to extract:
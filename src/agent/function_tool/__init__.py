@@ -1,3 +1,5 @@
+from .tool_context import ToolContext
 from .source_code_tools import create_source_code_tools
+from .dependency_tools import create_dependency_tools
 
-__all__ = ["create_source_code_tools"]
\ No newline at end of file
+__all__ = ["ToolContext", "create_source_code_tools", "create_dependency_tools"]
\ No newline at end of file
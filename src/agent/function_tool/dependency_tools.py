@@ -2,23 +2,24 @@ from typing import Any
 from typing_extensions import Annotated
 from autogen_core.tools import FunctionTool
 
-from src.model import DependencyModel, FuncMapModel
+from src.agent.function_tool.tool_context import ToolContext
 
 async def create_dependency_tools(
-    run_id: str
+    context: ToolContext
     ) -> dict[str, FunctionTool]:
     """
     Create closure-based dependency tools using DependencyModel and FileFunctionsMapModel
     
     Args:
-        run_id: The run_id to use for model queries (hidden from LLM)
+        context: Run-scoped tool context whose warm models are shared by every agent (hidden from LLM)
         
     Returns:
-        Dictionary of dependency tool functions with run_id pre-bound
+        Dictionary of dependency tool functions with the context pre-bound
     """
     
-    dependency_model = DependencyModel(run_id)
-    func_map_model = FuncMapModel(run_id)
+    dependency_model = context.dependency_model
+    func_map_model = context.func_map_model
+    implementation_model = context.implementation_model
         
     async def find_caller_by_dep(
         file_id: Annotated[int, "The ID of the file to get dependencies from"],
@@ -138,6 +139,32 @@ async def create_dependency_tools(
         except Exception as e:
             return {}
     
+    async def find_implementations(
+        interface: Annotated[str, "The name of the interface, e.g. IUserService"]
+        ) -> list[dict[str, Any]]:
+        """取得實作指定 interface 的組件
+        
+        依 base_list 建立的 interface → 實作索引（含間接實作）直接查詢，
+        用於把透過 interface 的呼叫（例如 DI 注入的 IUserService）對應到實際的實作類別。
+        
+        參數：
+        - interface: interface 名稱（不含泛型參數與命名空間）
+        
+        返回：
+        - List[Dict[str, Any]]: 實作組件列表，每筆包含 file_id、path、component
+        
+        範例：
+        input: interface="IUserService"
+        output: [{"file_id": 527, "path": "src/Services/UserService.cs", "component": "UserService"}]
+        """
+        try:
+            return [
+                {"file_id": impl.file_id, "path": impl.path, "component": impl.component}
+                for impl in implementation_model.find_implementations(interface)
+            ]
+        except Exception as e:
+            return []
+    
     get_func_map_tool = FunctionTool(
         get_func_map,
         description="取得指定檔案中特定函數的呼叫片段，用於分析函數內部的方法呼叫",
@@ -150,9 +177,16 @@ async def create_dependency_tools(
         strict=True
     )
     
+    find_implementations_tool = FunctionTool(
+        find_implementations,
+        description="根據 interface 名稱查詢實作該 interface 的組件",
+        strict=True
+    )
+    
     tools = {
         "get_func_map": get_func_map_tool,
         "find_caller_by_dep": find_caller_by_dep_tool,
+        "find_implementations": find_implementations_tool,
     }
     
     return tools
\ No newline at end of file
@@ -1,22 +1,25 @@
+from typing import Any
 from typing_extensions import Annotated
 from autogen_core.tools import FunctionTool
-from src.model import SourceCodeModel
+from src.agent.function_tool.tool_context import ToolContext
+from src.utils import slice_span
 
 
 async def create_source_code_tools(
-    run_id: str
+    context: ToolContext
     ) -> dict[str, FunctionTool]:
     """
     Create closure-based tools that hide run_id from LLM while providing SourceCodeModel access
     
     Args:
-        run_id: The run_id to use for SourceCodeModel queries (hidden from LLM)
+        context: Run-scoped tool context whose warm models are shared by every agent (hidden from LLM)
         
     Returns:
-        Dictionary of tool functions with run_id pre-bound
+        Dictionary of tool functions with the context pre-bound
     """
     
-    source_code_model = SourceCodeModel(run_id)
+    source_code_model = context.source_code_model
+    func_map_model = context.func_map_model
     
     async def get_file_content(file_id: Annotated[int, "The ID of the file to retrieve"]) -> str:
         """Get content of a specific file by file_id"""
@@ -25,6 +28,30 @@ async def create_source_code_tools(
         except Exception as e:
             return f"Error retrieving file {file_id}: {str(e)}"
 
+    async def get_method_source(
+        file_id: Annotated[int, "The ID of the file containing the method"],
+        component: Annotated[str, "The class/component containing the method"],
+        method: Annotated[str, "The name of the method"]
+        ) -> dict[str, Any]:
+        """取得單一方法的原始碼與行號範圍（同名多載一起回傳），比 get_file_content 小很多"""
+        try:
+            entity = next(
+                (e for e in func_map_model.list_by_file(file_id) if e.ciname == component and method in e.methods), None)
+            if entity is None:
+                return {"error": f"Method {component}.{method} not found in file {file_id}"}
+            info = entity.methods[method]
+            return {
+                "file_id": file_id,
+                "path": entity.path,
+                "component": component,
+                "method": method,
+                "start_line": info.start_line,
+                "end_line": info.end_line,
+                "source": slice_span(source_code_model.get_content_by_id(file_id), info)
+            }
+        except Exception as e:
+            return {"error": f"Error retrieving {component}.{method} in file {file_id}: {str(e)}"}
+
     # Create FunctionTool instances with strict=True
     get_file_content_tool = FunctionTool(
         get_file_content, 
@@ -32,8 +59,15 @@ async def create_source_code_tools(
         strict=True
     )
 
+    get_method_source_tool = FunctionTool(
+        get_method_source,
+        description="Get the source code and line range of a single method by file ID, component and method name",
+        strict=True
+    )
+
     tools = {
         "get_file_content": get_file_content_tool,
+        "get_method_source": get_method_source_tool,
     }
     
     return tools
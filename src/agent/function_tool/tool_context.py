@@ -0,0 +1,40 @@
+from typing import Optional
+from autogen_core.tools import FunctionTool
+
+from src.model import DependencyModel, FuncMapModel, ImplementationModel, SourceCodeModel
+
+
+class ToolContext:
+    """
+    Run-scoped models and function tools shared by every agent of a pipeline run
+    
+    Models are opened once, warm() loads their tables and lookup indexes into memory, and the
+    FunctionTool instances are built on first use and handed to every agent afterwards.
+    """
+    
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.dependency_model = DependencyModel(run_id)
+        self.func_map_model = FuncMapModel(run_id)
+        self.implementation_model = ImplementationModel(run_id)
+        self.source_code_model = SourceCodeModel(run_id)
+        self._tools: Optional[dict[str, FunctionTool]] = None
+    
+    def warm(self) -> None:
+        """Load the func map, dependency graph, implementation index and source index before the first agent is created"""
+        self.dependency_model.load_index()
+        self.func_map_model.load_index()
+        self.implementation_model.load_index()
+        self.source_code_model.load_index()
+    
+    async def get_tools(self) -> dict[str, FunctionTool]:
+        if self._tools is None:
+            # 避免循環引用：tools 模組依賴 ToolContext 型別
+            from src.agent.function_tool.dependency_tools import create_dependency_tools
+            from src.agent.function_tool.source_code_tools import create_source_code_tools
+            
+            self._tools = {
+                **await create_dependency_tools(self),
+                **await create_source_code_tools(self),
+            }
+        return self._tools
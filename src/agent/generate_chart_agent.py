@@ -1,20 +1,20 @@
 from autogen_agentchat.agents import AssistantAgent
 from autogen_core.models import ChatCompletionClient
-from autogen_ext.models.openai import OpenAIChatCompletionClient
 from autogen_core.models._model_client import ModelInfo
 from src.core.config import Config
+from src.llm import ModelClientFactory
 from src.entity import ChartEntity
 
 class GenerateChartAgent:
-    def __init__(self, config: Config, lang: str):
+    def __init__(self, config: Config, client_factory: ModelClientFactory, lang: str):
         self.config = config
+        self.client_factory = client_factory
         self.lang = lang
         
     def _get_client(self) -> ChatCompletionClient:
-        return OpenAIChatCompletionClient(
-            model=self.config.default_model,
-            api_key=self.config.api_key_map["gemini"],
-            base_url=self.config.base_url_map["gemini"],
+        return self.client_factory.get_client(
+            self.config.default_model,
+            cached=True,
             model_info=ModelInfo(
                 vision=False,
                 function_calling=False,
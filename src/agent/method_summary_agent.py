@@ -0,0 +1,56 @@
+from autogen_agentchat.agents import AssistantAgent
+from autogen_core.models import ChatCompletionClient
+from autogen_core.models._model_client import ModelInfo
+from src.core.config import Config
+from src.llm import ModelClientFactory
+from src.entity import MethodSummary
+
+class MethodSummaryAgent:
+    def __init__(self, config: Config, client_factory: ModelClientFactory, lang: str):
+        self.config = config
+        self.client_factory = client_factory
+        self.lang = lang
+        
+    def _get_client(self) -> ChatCompletionClient:
+        return self.client_factory.get_client(
+            self.config.default_model,
+            cached=True,
+            model_info=ModelInfo(
+                vision=False,
+                function_calling=False,
+                json_output=True,
+                family=None,
+                structured_output=True
+            ),
+            parallel_tool_calls=False,
+        )
+    
+    def get_agent(self, func_name: str) -> AssistantAgent:
+        if not func_name:
+            raise ValueError("Function name is required to create MethodSummaryAgent")
+        
+        return AssistantAgent(
+            name=f"{func_name[:50]}_method_summary",
+            model_client=self._get_client(),
+            output_content_type=MethodSummary,
+            system_message=f"""You are the **Method Summary Agent**. Summarize ONE method so the summary can be reused by every feature whose call chain passes through it. Write `desc` in {self.lang}.
+
+## INPUT
+```json
+{{
+  "component": "<class>",
+  "method": "<method>",
+  "path": "<file path>",
+  "source": "<the class with its fields, properties, constructors and this method; other methods are omitted>",
+  "calls": ["<call expressions made by this method>"]
+}}
+```
+
+## RULES
+- Describe only what THIS method does. Do not guess what the methods it calls do; they are summarized separately.
+- **role**: controller, service, repository, domain, infrastructure, or external.
+- **data_access**: tables or data sources this method reads (`r`) or writes (`w`) directly, e.g. via Entity Framework DbSets, SQL, or stored procedures.
+- **external_api**: HTTP or third-party APIs this method calls directly (HttpClient, SDK clients).
+- **confidence**: 0.0-1.0.
+- Output ONLY via structured output matching the MethodSummary schema.
+""")
@@ -8,6 +8,9 @@ from src.entity.source_code_entity import SourceCodeEntity
 class BaseLanguageAnalyzer(ABC):
     """語言分析器基類"""
     
+    # 分析結果（FuncMapEntity）的內容或格式改變時遞增，讓跨 run 的 func map 快取失效
+    version: int = 1
+    
     def __init__(self, programming_language: str):
         self.programming_language = programming_language
         self.lang = get_language(programming_language)
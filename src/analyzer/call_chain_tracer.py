@@ -0,0 +1,217 @@
+import re
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from pydantic import BaseModel
+
+from src.entity import CallChainResultEntity, EntryPointEntity, FuncCallEntity, FuncMapEntity
+from src.entity.call_chain_result_entity import CallNode
+from src.model import DependencyModel, FuncMapModel
+
+
+class CallCandidate(BaseModel):
+    file_id: int
+    component: str
+    method: str
+    type: str
+    path: str
+
+
+class CallSite(BaseModel):
+    """一個有多個可能被呼叫者的呼叫點"""
+    file_id: int
+    component: str
+    method: str
+    call: FuncCallEntity
+
+
+# 從多個候選中選出實際被呼叫者，回傳選中的候選（可為空）
+Disambiguator = Callable[[CallSite, list[CallCandidate]], Awaitable[list[CallCandidate]]]
+
+
+def with_local_calls(nodes: set[tuple[int, str]], func_maps: dict[int, list[FuncMapEntity]]) -> set[tuple[int, str]]:
+    """加上同組件內被呼叫的方法：呼叫鏈不把同組件呼叫列為節點，但它們同樣屬於入口點的執行路徑"""
+    result = set(nodes)
+    queue = list(nodes)
+    while queue:
+        file_id, method = queue.pop()
+        for entity in func_maps.get(file_id, []):
+            for call in entity.fcalls.get(method, []):
+                node = (file_id, call.method)
+                if call.method in entity.methods and call.receiver_type in (None, entity.ciname) and node not in result:
+                    result.add(node)
+                    queue.append(node)
+    return result
+
+
+class CallChainTracer:
+    """
+    以 FuncMapModel / DependencyModel 靜態追蹤入口點的完整呼叫鏈
+
+    從入口點方法開始 BFS：取出方法內的呼叫 → 以相依表找出被呼叫的組件 → 加入佇列，直到沒有新的呼叫。
+    - 已走訪過的 (file_id, component, method) 不重複處理（避免循環）
+    - interface 不列入呼叫鏈
+    - 同一組件內的呼叫（含 this.xxx）不列為節點，但仍會追蹤其內部呼叫
+    - 同一個呼叫點有多個候選時先以接收者名稱比對，仍無法決定時才交給 disambiguator（通常是 LLM）
+
+    Args:
+        func_map_model: 組件與方法內呼叫資訊
+        dependency_model: 呼叫點到被呼叫組件的相依表
+        disambiguator: 多個候選時的判斷方式，None 表示保留全部候選
+        max_nodes: 呼叫鏈節點上限，避免在大型專案中無限制擴張
+    """
+
+    def __init__(
+        self,
+        func_map_model: FuncMapModel,
+        dependency_model: DependencyModel,
+        disambiguator: Optional[Disambiguator] = None,
+        max_nodes: int = 500
+    ):
+        self.func_map_model = func_map_model
+        self.dependency_model = dependency_model
+        self.disambiguator = disambiguator
+        self.max_nodes = max_nodes
+
+    async def trace(
+        self, entry_point: EntryPointEntity, disambiguator: Optional[Disambiguator] = None
+    ) -> CallChainResultEntity:
+        """Trace one entry point; `disambiguator` overrides the one given to the constructor"""
+        disambiguator = disambiguator or self.disambiguator
+        start = (entry_point.file_id, entry_point.component, entry_point.name)
+        queue = deque([start])
+        visited = {start}
+        call_chain: list[CallNode] = []
+        ambiguous = 0
+        truncated = False
+
+        while queue:
+            file_id, component, method = queue.popleft()
+            for call in self._calls_in(file_id, component, method):
+                candidates = self._candidates(file_id, component, call)
+                if len(candidates) > 1:
+                    ambiguous += 1
+                    candidates = await self._disambiguate(CallSite(
+                        file_id=file_id, component=component, method=method, call=call
+                    ), candidates, disambiguator)
+
+                for candidate in candidates:
+                    node = (candidate.file_id, candidate.component, candidate.method)
+                    if node in visited:
+                        continue
+                    visited.add(node)
+                    queue.append(node)
+                    if (candidate.file_id, candidate.component) == (file_id, component):
+                        continue
+                    if len(call_chain) >= self.max_nodes:
+                        truncated = True
+                        continue
+                    call_chain.append(CallNode(
+                        file_id=candidate.file_id,
+                        method=candidate.method,
+                        reason=f"{component}.{method} calls {call.expr} → {candidate.component}"
+                    ))
+
+        return CallChainResultEntity(
+            file_id=entry_point.file_id,
+            name=entry_point.name,
+            component=entry_point.component,
+            call_chain=call_chain,
+            stop_reason=self._stop_reason(call_chain, ambiguous, truncated)
+        )
+
+    def _calls_in(self, file_id: int, component: str, method: str) -> list[FuncCallEntity]:
+        entity = self.func_map_model.get_by_component_and_function(component, method, file_id)
+        if not entity or not entity.fcalls:
+            return []
+        return entity.fcalls.get(method, [])
+
+    def _candidates(self, file_id: int, component: str, call: FuncCallEntity) -> list[CallCandidate]:
+        candidates = {}
+        for dep in self.dependency_model.find_callee_by_caller(file_id, component, call.expr):
+            func_map = self.func_map_model.get_by_component_and_function(
+                dep.callee_entity, dep.call.method, dep.callee_file_if)
+            if not func_map or func_map.type == "interface":
+                continue
+            key = (func_map.file_id, func_map.ciname, dep.call.method)
+            candidates.setdefault(key, CallCandidate(
+                file_id=func_map.file_id,
+                component=func_map.ciname,
+                method=dep.call.method,
+                type=func_map.type,
+                path=func_map.path
+            ))
+        return list(candidates.values())
+
+    async def _disambiguate(
+        self, site: CallSite, candidates: list[CallCandidate], disambiguator: Optional[Disambiguator]
+    ) -> list[CallCandidate]:
+        receiver = self._receiver(site.call.expr)
+        if receiver == "base":
+            return await self._disambiguate_base(site, candidates, disambiguator)
+
+        # 同組件的呼叫（沒有接收者或 this.xxx）一定是呼叫自己
+        if receiver in ("", "this"):
+            own = [c for c in candidates if (c.file_id, c.component) == (site.file_id, site.component)]
+            if own:
+                return own
+
+        matched = [c for c in candidates if self._receiver_matches(receiver, c.component)]
+        if len(matched) == 1:
+            return matched
+
+        if disambiguator is None:
+            return candidates
+        return await disambiguator(site, matched or candidates)
+
+    async def _disambiguate_base(
+        self, site: CallSite, candidates: list[CallCandidate], disambiguator: Optional[Disambiguator]
+    ) -> list[CallCandidate]:
+        """`base.Foo()` 呼叫的是最近的基底類別中的實作，不是自己的覆寫；基底類別不在候選中時才交給 disambiguator"""
+        others = [c for c in candidates if c.component != site.component]
+        for ancestor in self._ancestors(site.file_id, site.component):
+            inherited = [c for c in others if c.component == ancestor]
+            if inherited:
+                return inherited
+        if disambiguator is None or len(others) <= 1:
+            return others
+        return await disambiguator(site, others)
+
+    def _ancestors(self, file_id: int, component: str) -> list[str]:
+        """沿著 func map 的 base_list 往上找出基底型別名稱，最近的在前"""
+        queue = [base for entity in self.func_map_model.list_by_file(file_id) if entity.ciname == component
+                 for base in entity.bases]
+        ancestors = []
+        while queue:
+            name = queue.pop(0)
+            if name in ancestors or name == component:
+                continue
+            ancestors.append(name)
+            for entity in self.func_map_model.list_by_component(name):
+                queue.extend(entity.bases)
+        return ancestors
+
+    def _receiver(self, expr: str) -> str:
+        """`_userService.GetUser(id)` → `_userService`；沒有接收者時回傳空字串"""
+        callee = expr.split("(", 1)[0]
+        if "." not in callee:
+            return ""
+        return callee.rsplit(".", 1)[0].split(".")[-1]
+
+    def _receiver_matches(self, receiver: str, component: str) -> bool:
+        """以名稱判斷接收者是否指向該組件，例如 `_userService` / `userService` 對應 `UserService`"""
+        name = re.sub(r"^_+", "", receiver).lower()
+        if not name:
+            return False
+        component = component.lower()
+        return name == component or component.endswith(name) or name.endswith(component)
+
+    def _stop_reason(self, call_chain: list[CallNode], ambiguous: int, truncated: bool) -> str:
+        if truncated:
+            return f"Stopped at the {self.max_nodes} node limit"
+        if not call_chain:
+            return "No outgoing calls to other components were found"
+        reason = f"Static trace complete: {len(call_chain)} nodes, no further calls"
+        if ambiguous:
+            reason += f", {ambiguous} ambiguous call sites resolved"
+        return reason
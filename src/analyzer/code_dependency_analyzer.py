@@ -1,10 +1,28 @@
+from typing import Optional
+
 from src.entity.dependency_entity import DependencyEntity
+from src.entity.func_call_entity import FuncCallEntity
 from src.entity.func_map_entity import FuncMapEntity
+from src.entity.implementation_entity import ImplementationEntity
 
 class CodeDependencyAnalyzer:
-    def analyze_project(self, function_analysis_entities:  list[FuncMapEntity]) -> list[DependencyEntity]:
-        """建立實體間的依賴關係"""
+    def analyze_project(
+        self,
+        function_analysis_entities: list[FuncMapEntity],
+        implementations: Optional[list[ImplementationEntity]] = None
+    ) -> list[DependencyEntity]:
+        """建立實體間的依賴關係，implementations 未提供時由 base_list 重新建立"""
         method_to_entities = self.build_method_index(function_analysis_entities)
+        type_index = self.build_type_index(function_analysis_entities)
+        if implementations is None:
+            implementations = self.build_implementation_index(function_analysis_entities)
+        # partial class 的 base_list 只寫在其中一個檔案，因此以名稱展開到所有部分
+        implementation_index = {}
+        for impl in implementations:
+            parts = implementation_index.setdefault(impl.interface, [])
+            for component in type_index.get(impl.component, []):
+                if component.type != "interface" and component not in parts:
+                    parts.append(component)
 
         dependencies = []
         seen = set()
@@ -16,18 +34,17 @@ class CodeDependencyAnalyzer:
             # 分析此實體的所有方法調用
             for func_name, calls in entity.fcalls.items():
                 for call in calls:
-                    call_method = call.method
-                    
-                    # 查找被調用方法屬於哪些實體（可能有多個同名方法）
-                    target_entities = method_to_entities.get(call_method, [])
+                    # 已知接收者型別時以 (型別, 方法) 比對，否則依方法名查找所有同名方法的實體
+                    target_entities = self.resolve_targets(
+                        call, method_to_entities, type_index, implementation_index, entity)
                     
                     # 為每個匹配的 class 實體建立依賴關係
                     for target_entity in target_entities:
                         callee_file_id = target_entity.file_id
                         callee_name = target_entity.ciname
                         
-                        # 避免重複記錄
-                        key = (caller_file_id, f"{caller_name}.{func_name}", callee_file_id)
+                        # 避免重複記錄；同一方法內對同一檔案的不同呼叫各自保留
+                        key = (caller_file_id, f"{caller_name}.{func_name}", callee_file_id, callee_name, call.expr)
                         if key not in seen:
                             seen.add(key)
                             dependencies.append(DependencyEntity(
@@ -53,4 +70,118 @@ class CodeDependencyAnalyzer:
                         method_to_entities[func_name] = []
                     method_to_entities[func_name].append(entity)
         
-        return method_to_entities    
\ No newline at end of file
+        return method_to_entities
+    
+    def build_type_index(self, entities: list[FuncMapEntity]) -> dict[str, list[FuncMapEntity]]:
+        """建立型別名稱到實體列表的映射索引（含 interface，partial class 會有多筆）"""
+        type_index = {}
+        for entity in entities:
+            type_index.setdefault(entity.ciname, []).append(entity)
+        return type_index
+    
+    def build_implementation_index(self, entities: list[FuncMapEntity]) -> list[ImplementationEntity]:
+        """
+        由 base_list 建立 interface → 實作組件的索引
+
+        間接實作也會列入：class Foo : BaseService（BaseService : IService）與 interface IFoo : IBar 都會展開。
+        只保留專案內宣告的 interface（IDisposable 等外部介面不列入）。
+        """
+        type_index = self.build_type_index(entities)
+        implementations = []
+        for entity in entities:
+            if entity.type == "interface":
+                continue
+            for ancestor in self._ancestors(entity, type_index):
+                if any(e.type == "interface" for e in type_index.get(ancestor, [])):
+                    implementations.append(ImplementationEntity(
+                        interface=ancestor,
+                        file_id=entity.file_id,
+                        component=entity.ciname,
+                        path=entity.path
+                    ))
+        return implementations
+    
+    def _ancestors(self, entity: FuncMapEntity, type_index: dict[str, list[FuncMapEntity]]) -> list[str]:
+        """沿著 base_list 往上找出所有基底型別名稱（依 BFS 順序，不重複）"""
+        ancestors = []
+        queue = list(entity.bases)
+        while queue:
+            name = queue.pop(0)
+            if name in ancestors or name == entity.ciname:
+                continue
+            ancestors.append(name)
+            for base in type_index.get(name, []):
+                queue.extend(base.bases)
+        return ancestors
+    
+    def resolve_targets(
+        self,
+        call: FuncCallEntity,
+        method_to_entities: dict[str, list[FuncMapEntity]],
+        type_index: dict[str, list[FuncMapEntity]],
+        implementation_index: Optional[dict[str, list[FuncMapEntity]]] = None,
+        caller: Optional[FuncMapEntity] = None
+    ) -> list[FuncMapEntity]:
+        """找出呼叫可能指向的 class 實體"""
+        if call.receiver_type:
+            targets = self._typed_targets(call.receiver_type, call.method, type_index, implementation_index or {})
+            # 猜測的型別不在專案中時，只有呼叫端繼承了專案外的型別才可能是繼承來的屬性，
+            # 否則是 Console、Task 等專案外的靜態呼叫，不建立相依
+            if targets == [] and call.receiver_inferred and caller is not None \
+                    and self._has_external_base(caller, type_index):
+                targets = None
+            if targets is not None:
+                return targets
+        return method_to_entities.get(call.method, [])
+    
+    def _has_external_base(self, entity: FuncMapEntity, type_index: dict[str, list[FuncMapEntity]]) -> bool:
+        """entity（含 partial class 的其他部分）的基底型別中是否有專案外的型別"""
+        parts = type_index.get(entity.ciname) or [entity]
+        return any(
+            ancestor not in type_index
+            for part in parts for ancestor in self._ancestors(part, type_index)
+        )
+    
+    def _typed_targets(
+        self,
+        receiver_type: str,
+        method: str,
+        type_index: dict[str, list[FuncMapEntity]],
+        implementation_index: dict[str, list[FuncMapEntity]]
+    ) -> Optional[list[FuncMapEntity]]:
+        """
+        依接收者型別找被呼叫的實體
+
+        - 專案外的型別（ILogger、Dictionary 等）：不建立相依，回傳空列表
+        - class 且有該方法：只連到該 class；方法來自基底類別時連到宣告該方法的基底類別
+        - interface：以實作索引找有該方法的實作，索引中沒有時才以命名慣例猜（IUserService → UserService，其次是 *UserService）
+        - 其餘情況回傳 None，交由呼叫端退回方法名比對
+        """
+        entities = type_index.get(receiver_type)
+        if not entities:
+            return []
+
+        classes = [e for e in entities if e.type == "class" and method in e.funcs]
+        if classes:
+            return classes
+
+        if any(e.type == "interface" for e in entities):
+            implemented = [e for e in implementation_index.get(receiver_type, []) if method in e.funcs]
+            if implemented:
+                return implemented
+            implementation = receiver_type[1:] if receiver_type.startswith("I") else receiver_type
+            candidates = [
+                e for name, group in type_index.items() if name.endswith(implementation)
+                for e in group if e.type == "class" and method in e.funcs
+            ]
+            exact = [e for e in candidates if e.ciname == implementation]
+            if exact or candidates:
+                return exact or candidates
+            return None
+
+        for entity in entities:
+            for ancestor in self._ancestors(entity, type_index):
+                inherited = [e for e in type_index.get(ancestor, []) if e.type == "class" and method in e.funcs]
+                if inherited:
+                    return inherited
+        return None
@@ -1,13 +1,19 @@
-from typing import List, Dict
+import hashlib
+from bisect import bisect_right
+from typing import List, Dict, Optional
 from tree_sitter import Query, QueryCursor
 from src.analyzer.base_language_analyzer import BaseLanguageAnalyzer
 from src.entity.func_map_entity import FuncMapEntity
 from src.entity.func_call_entity import FuncCallEntity
+from src.entity.method_info_entity import MethodInfoEntity
 from src.entity.source_code_entity import SourceCodeEntity
+from src.entity.source_span_entity import SourceSpanEntity
 
 class CSharpAnalyzer(BaseLanguageAnalyzer):
     """C# 語言分析器"""
     
+    version = 5
+    
     def __init__(self):
         super().__init__("csharp")
         self.common_methods = [
@@ -17,80 +23,95 @@ class CSharpAnalyzer(BaseLanguageAnalyzer):
             "Ok", "nameof", "NotFound", "BadRequest"
         ]
         
+        # 整個檔案只跑一次合併查詢：實體、方法、呼叫與區域變數宣告一起收集，之後再依 byte 範圍歸屬
         self.queries = {
-            "entities": """
+            "file": """
                 [
                     (class_declaration 
                         name: (identifier) @entity_name
                         body: (declaration_list) @entity_body
                     ) @entity
+                    (record_declaration
+                        name: (identifier) @entity_name
+                        body: (declaration_list) @entity_body
+                    ) @entity
+                    (struct_declaration
+                        name: (identifier) @entity_name
+                        body: (declaration_list) @entity_body
+                    ) @entity
                     (interface_declaration
                         name: (identifier) @entity_name  
                         body: (declaration_list) @entity_body
                     ) @entity
                 ]
-            """,
-            "methods_in_entity": """
                 (method_declaration 
                     name: (identifier) @method_name
-                    body: (block)? @method_body
-                )
-            """,
-            "member_calls": """
+                ) @method
                 (invocation_expression
                     function: (member_access_expression
                         expression: (_) @receiver
-                        name: (identifier) @method
+                        name: (identifier) @member
                     )
-                ) @full_expression
-            """,
-            "direct_calls": """
+                ) @member_call
                 (invocation_expression
                     function: (identifier) @function
-                ) @full_expression
+                ) @direct_call
+                (variable_declaration) @declaration
+                (foreach_statement) @foreach
             """
         }
+        # 查詢在建構時編譯一次，cursor 也重複使用
+        self.cursors = {name: QueryCursor(Query(self.lang, query)) for name, query in self.queries.items()}
+    
+    def _cursor(self, name: str) -> QueryCursor:
+        return self.cursors[name]
     
     def analyze_file(self, source_code_entity: SourceCodeEntity) -> List[FuncMapEntity]:
         code_bytes = source_code_entity.content.encode("utf-8")
         tree = self.parser.parse(code_bytes)
+        found = self._scan(tree.root_node)
         
-        entities = []
+        entity_matches = found["entity"]
+        method_matches = found["method"]
+        entity_nodes = [match["entity"][0] for match in entity_matches]
+        method_nodes = [match["method"][0] for match in method_matches]
         
-        entity_query = Query(self.lang, self.queries["entities"])
-        entity_cursor = QueryCursor(entity_query)
-        entity_matches = entity_cursor.matches(tree.root_node)
+        # 方法歸屬到最內層的實體；呼叫與區域變數歸屬到所在的方法
+        methods_of = self._group(entity_nodes, method_matches, "method")
+        member_calls_of = self._group(method_nodes, found["member_call"], "member_call")
+        direct_calls_of = self._group(method_nodes, found["direct_call"], "direct_call")
+        declarations_of = self._group(method_nodes, found["declaration"], "declaration")
+        foreach_of = self._group(method_nodes, found["foreach"], "foreach")
         
-        for match in entity_matches:
-            captures = match[1]
-            
-            entity_name = None
-            entity_body = None
-            entity_node = None
-            
-            for capture_name, nodes in captures.items():
-                for node in nodes:
-                    if capture_name == "entity_name":
-                        entity_name = self.extract_text(node, code_bytes)
-                    elif capture_name == "entity_body":
-                        entity_body = node
-                    elif capture_name == "entity":
-                        entity_node = node
-            
-            if not entity_name or not entity_body:
+        entities = []
+        for i, match in enumerate(entity_matches):
+            entity_node = match["entity"][0]
+            entity_body = match["entity_body"][0]
+            entity_name = self.extract_text(match["entity_name"][0], code_bytes)
+            if not entity_name:
                 continue
             
-            # 判斷實體類型
+            # 判斷實體類型：record / struct 與 class 一樣是具體實作
             entity_type = "interface" if "interface_declaration" in entity_node.type else "class"
             
-            # 分析這個實體內的方法
             if entity_type == "interface":
                 # Interface 只提取方法聲明
-                method_names = self._extract_interface_methods(entity_body, code_bytes)
+                method_names = [
+                    self.extract_text(method_matches[j]["method_name"][0], code_bytes) for j in methods_of.get(i, [])
+                ]
                 methods = {}  # Interface 沒有實現，fcalls 為空
             else:
-                # Class 分析方法實現和調用
-                methods = self._analyze_methods_in_entity(entity_body, code_bytes)
+                # Class 分析方法實現和調用，欄位 / 屬性 / 建構子參數的型別用來解析呼叫的接收者
+                member_types = self._collect_member_types(entity_node, entity_body, code_bytes)
+                methods = {}
+                for j in methods_of.get(i, []):
+                    local_types = self._collect_local_types(
+                        method_nodes[j], declarations_of.get(j, []), foreach_of.get(j, []), code_bytes)
+                    calls = self._analyze_calls_in_method(
+                        member_calls_of.get(j, []), direct_calls_of.get(j, []), code_bytes,
+                        entity_name, member_types, local_types)
+                    if calls:  # 只記錄有調用的方法
+                        methods[self.extract_text(method_matches[j]["method_name"][0], code_bytes)] = calls
                 method_names = list(methods.keys())
             
             entities.append(FuncMapEntity(
@@ -99,121 +120,244 @@ class CSharpAnalyzer(BaseLanguageAnalyzer):
                 path=source_code_entity.path,
                 type=entity_type,
                 funcs=method_names,
-                fcalls=methods
+                fcalls=methods,
+                bases=self._extract_bases(entity_node, code_bytes),
+                methods=self._method_infos([method_matches[j] for j in methods_of.get(i, [])], code_bytes),
+                member_hash=self._member_hash(entity_node, [method_nodes[j] for j in methods_of.get(i, [])], code_bytes),
+                span=SourceSpanEntity(
+                    start_byte=entity_node.start_byte,
+                    end_byte=entity_node.end_byte,
+                    start_line=entity_node.start_point.row + 1,
+                    end_line=entity_node.end_point.row + 1
+                )
             ))
         
         return entities
     
-    def _extract_interface_methods(self, interface_body, source_code: bytes) -> List[str]:
-        """提取接口中的方法聲明"""
-        method_query = Query(self.lang, """
-            (method_declaration 
-                name: (identifier) @method_name
-            )
-        """)
-        method_cursor = QueryCursor(method_query)
-        method_matches = method_cursor.matches(interface_body)
+    def _method_infos(self, method_matches: List[dict], source_code: bytes) -> Dict[str, MethodInfoEntity]:
+        """每個方法的 byte / 行號範圍與內容雜湊；只有空白差異時雜湊相同"""
+        overloads = {}
+        for captures in method_matches:
+            name = self.extract_text(captures["method_name"][0], source_code)
+            overloads.setdefault(name, []).append(captures["method"][0])
         
-        method_names = []
-        for match in method_matches:
-            captures = match[1]
-            for capture_name, nodes in captures.items():
-                if capture_name == "method_name":
-                    for node in nodes:
-                        method_name = self.extract_text(node, source_code)
-                        method_names.append(method_name)
-        
-        return method_names
+        infos = {}
+        for name, nodes in overloads.items():
+            digest = hashlib.sha256()
+            for node in nodes:
+                digest.update(" ".join(self.extract_text(node, source_code).split()).encode("utf-8"))
+                digest.update(b"\0")
+            infos[name] = MethodInfoEntity(
+                start_byte=nodes[0].start_byte,
+                end_byte=nodes[-1].end_byte,
+                start_line=nodes[0].start_point.row + 1,
+                end_line=nodes[-1].end_point.row + 1,
+                body_hash=digest.hexdigest()[:16]
+            )
+        return infos
     
-    def _analyze_methods_in_entity(self, entity_body, source_code: bytes) -> Dict[str, List[FuncCallEntity]]:
-        """分析實體內的方法及其調用"""
-        method_query = Query(self.lang, self.queries["methods_in_entity"])
-        method_cursor = QueryCursor(method_query)
-        method_matches = method_cursor.matches(entity_body)
-        
-        methods = {}
+    def _member_hash(self, entity_node, method_nodes: list, source_code: bytes) -> str:
+        """
+        類別中方法以外內容（attribute、base_list、欄位、常數、屬性、建構子、巢狀類別）的雜湊；只有空白差異時雜湊相同
+
+        這些內容會隨 class_outline 放進功能分析與方法摘要的 prompt，變動時同組件的方法都要重新分析。
+        """
+        parts = []
+        pos = entity_node.start_byte
+        for node in method_nodes:
+            parts.append(source_code[pos:node.start_byte])
+            pos = node.end_byte
+        parts.append(source_code[pos:entity_node.end_byte])
+        text = b"\0".join(parts).decode("utf-8", errors="replace")
+        return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+    
+    def _scan(self, root) -> Dict[str, List[dict]]:
+        """單次查詢收集整個檔案的 match，依種類分組並以起始位置排序"""
+        found = {kind: [] for kind in ("entity", "method", "member_call", "direct_call", "declaration", "foreach")}
+        for _, captures in self._cursor("file").matches(root):
+            for kind, matches in found.items():
+                if kind in captures:
+                    matches.append(captures)
+                    break
+        for kind, matches in found.items():
+            matches.sort(key=lambda captures: captures[kind][0].start_byte)
+        return found
+    
+    def _group(self, containers: list, matches: List[dict], kind: str) -> Dict[int, list]:
+        """
+        依 byte 範圍把 matches 分配給最內層包住它的 container（containers 依 start_byte 排序）
+
+        containers 為實體時回傳 {實體索引: [方法索引]}，其餘回傳 {方法索引: [match]}；不在任何 container 內的丟棄
+        """
+        starts = [node.start_byte for node in containers]
+        grouped = {}
+        for j, captures in enumerate(matches):
+            node = captures[kind][0]
+            i = bisect_right(starts, node.start_byte) - 1
+            # 往前找第一個結束位置涵蓋 node 的 container（巢狀 class 時跳過已結束的兄弟節點）
+            while i >= 0 and containers[i].end_byte < node.end_byte:
+                i -= 1
+            if i >= 0:
+                grouped.setdefault(i, []).append(j if kind == "method" else captures)
+        return grouped
+    
+    def _extract_bases(self, entity_node, source_code: bytes) -> List[str]:
+        """`class Foo : Base<T>, IFoo` → ["Base", "IFoo"]"""
+        base_list = next((c for c in entity_node.children if c.type == "base_list"), None)
+        if base_list is None:
+            return []
+        bases = []
+        for base in base_list.named_children:
+            # record 的 `: Base(Id)` 是 primary_constructor_base_type
+            name = self._type_name(base, source_code)
+            if name is None and base.named_children:
+                name = self._type_name(base.named_children[0], source_code)
+            if name:
+                bases.append(name)
+        return bases
+    
+    def _type_name(self, type_node, source_code: bytes) -> Optional[str]:
+        """`IRepository<User>` → `IRepository`，`Foo?` → `Foo`，`A.B.Foo` → `Foo`；內建型別、var 與陣列回傳 None"""
+        if type_node is None:
+            return None
+        if type_node.type == "identifier":
+            return self.extract_text(type_node, source_code)
+        if type_node.type == "generic_name":
+            name = next((child for child in type_node.children if child.type == "identifier"), None)
+            return self.extract_text(name, source_code) if name else None
+        if type_node.type == "nullable_type":
+            return self._type_name(type_node.child_by_field_name("type") or type_node.children[0], source_code)
+        if type_node.type == "qualified_name":
+            return self._type_name(type_node.child_by_field_name("name"), source_code)
+        return None
+    
+    def _declared_variables(self, declaration, source_code: bytes) -> Dict[str, str]:
+        """variable_declaration 宣告的變數名稱 → 型別；`var x = new Foo()` 取 new 的型別"""
+        declared_type = self._type_name(declaration.child_by_field_name("type"), source_code)
+        variables = {}
+        for declarator in declaration.children:
+            if declarator.type != "variable_declarator":
+                continue
+            name = declarator.child_by_field_name("name")
+            if name is None:
+                continue
+            var_type = declared_type
+            if var_type is None:
+                creation = next((c for c in declarator.children if c.type == "object_creation_expression"), None)
+                if creation is not None:
+                    var_type = self._type_name(creation.child_by_field_name("type"), source_code)
+            if var_type:
+                variables[self.extract_text(name, source_code)] = var_type
+        return variables
+    
+    def _parameter_types(self, parameter_list, source_code: bytes) -> Dict[str, str]:
+        params = {}
+        if parameter_list is None:
+            return params
+        for parameter in parameter_list.children:
+            if parameter.type != "parameter":
+                continue
+            name = parameter.child_by_field_name("name")
+            param_type = self._type_name(parameter.child_by_field_name("type"), source_code)
+            if name is not None and param_type:
+                params[self.extract_text(name, source_code)] = param_type
+        return params
+    
+    def _collect_member_types(self, entity_node, entity_body, source_code: bytes) -> Dict[str, str]:
+        """欄位、屬性與建構子（含 primary constructor）參數的名稱 → 型別，DI 注入的介面也在其中"""
+        members = {}
+        # primary constructor: class Foo(IBar bar)
+        primary = next((c for c in entity_node.children if c.type == "parameter_list"), None)
+        members.update(self._parameter_types(primary, source_code))
         
-        for match in method_matches:
-            captures = match[1]
-            
-            method_name = None
-            method_body = None
-            
-            for capture_name, nodes in captures.items():
-                for node in nodes:
-                    if capture_name == "method_name":
-                        method_name = self.extract_text(node, source_code)
-                    elif capture_name == "method_body":
-                        method_body = node
-            
-            if method_name and method_body:
-                # 分析方法內的調用
-                calls = self._analyze_calls_in_method(method_body, source_code)
-                if calls:  # 只記錄有調用的方法
-                    methods[method_name] = calls
+        for member in entity_body.children:
+            if member.type == "constructor_declaration":
+                for name, param_type in self._parameter_types(
+                        member.child_by_field_name("parameters"), source_code).items():
+                    members.setdefault(name, param_type)
         
-        return methods
+        for member in entity_body.children:
+            if member.type in ("field_declaration", "event_field_declaration"):
+                declaration = next((c for c in member.children if c.type == "variable_declaration"), None)
+                if declaration is not None:
+                    members.update(self._declared_variables(declaration, source_code))
+            elif member.type == "property_declaration":
+                name = member.child_by_field_name("name")
+                prop_type = self._type_name(member.child_by_field_name("type"), source_code)
+                if name is not None and prop_type:
+                    members[self.extract_text(name, source_code)] = prop_type
+        return members
+    
+    def _collect_local_types(self, method_node, declarations: List[dict], foreach_statements: List[dict],
+            source_code: bytes) -> Dict[str, str]:
+        """方法參數與方法內區域變數（含 foreach 變數）的名稱 → 型別"""
+        local_types = self._parameter_types(method_node.child_by_field_name("parameters"), source_code)
+        for captures in declarations:
+            local_types.update(self._declared_variables(captures["declaration"][0], source_code))
+        for captures in foreach_statements:
+            node = captures["foreach"][0]
+            name = node.child_by_field_name("left")
+            var_type = self._type_name(node.child_by_field_name("type"), source_code)
+            if name is not None and var_type:
+                local_types[self.extract_text(name, source_code)] = var_type
+        return local_types
     
-    def _analyze_calls_in_method(self, method_body, source_code: bytes) -> List[FuncCallEntity]:
-        """分析方法內的調用"""
+    def _resolve_receiver_type(self, receiver, source_code: bytes,
+            local_types: Dict[str, str], member_types: Dict[str, str]) -> tuple[Optional[str], bool]:
+        """
+        依區域變數 → 成員的順序解析接收者型別，回傳 (型別, 是否為猜測)
+
+        大寫開頭且不在範圍內的識別字猜為靜態呼叫的型別名稱；也可能是繼承來的屬性，
+        因此標記為猜測，相依分析時不在專案型別中就退回方法名比對。
+        """
+        if receiver.type == "identifier":
+            name = self.extract_text(receiver, source_code)
+            if name in local_types:
+                return local_types[name], False
+            if name in member_types:
+                return member_types[name], False
+            return (name, True) if name[:1].isupper() else (None, False)
+        if receiver.type == "member_access_expression":
+            owner = receiver.child_by_field_name("expression")
+            name = receiver.child_by_field_name("name")
+            if owner is not None and owner.type == "this" and name is not None:
+                return member_types.get(self.extract_text(name, source_code)), False
+        return None, False
+    
+    def _analyze_calls_in_method(self, member_calls: List[dict], direct_calls: List[dict], source_code: bytes,
+            entity_name: str, member_types: Dict[str, str], local_types: Dict[str, str]) -> List[FuncCallEntity]:
+        """由方法內的成員調用與直接調用建立 FuncCallEntity"""
         calls = []
-        seen_methods = set()
         
         # 分析成員調用
-        member_calls = self._find_calls_in_node(method_body, source_code, "member_calls")
-        calls.extend(member_calls)
+        for captures in member_calls:
+            receiver_type, inferred = self._resolve_receiver_type(
+                captures["receiver"][0], source_code, local_types, member_types)
+            calls.append(FuncCallEntity(
+                method=self.extract_text(captures["member"][0], source_code),
+                expr=self._expression(captures["member_call"][0], source_code),
+                receiver_type=receiver_type,
+                receiver_inferred=inferred or None
+            ))
         
-        # 分析直接調用  
-        direct_calls = self._find_calls_in_node(method_body, source_code, "direct_calls")
-        calls.extend(direct_calls)
+        # 分析直接調用：沒有接收者時呼叫的是自己的方法
+        for captures in direct_calls:
+            calls.append(FuncCallEntity(
+                method=self.extract_text(captures["function"][0], source_code),
+                expr=self._expression(captures["direct_call"][0], source_code),
+                receiver_type=entity_name
+            ))
         
-        # 去重
+        # 去重：同名方法但接收者型別不同時視為不同的呼叫
         unique_calls = []
+        seen_methods = set()
         for call in calls:
-            if call.method not in seen_methods:
-                seen_methods.add(call.method)
+            key = (call.method, call.receiver_type)
+            if call.method not in self.common_methods and key not in seen_methods:
+                seen_methods.add(key)
                 unique_calls.append(call)
         
         return unique_calls
     
-    def _find_calls_in_node(self, node, source_code: bytes, call_type: str) -> List[FuncCallEntity]:
-        """在指定節點內查找調用"""
-        query = Query(self.lang, self.queries[call_type])
-        cursor = QueryCursor(query)
-        matches = cursor.matches(node)
-        
-        calls = []
-        
-        for match in matches:
-            captures = match[1]
-            
-            method = None
-            full_expr = None
-            
-            if call_type == "member_calls":
-                for capture_name, nodes in captures.items():
-                    for node_item in nodes:
-                        if capture_name == "method":
-                            method = self.extract_text(node_item, source_code)
-                        elif capture_name == "full_expression":
-                            full_expr = self.extract_text(node_item, source_code)
-                            full_expr = "".join(full_expr.split())
-                            
-            elif call_type == "direct_calls":
-                for capture_name, nodes in captures.items():
-                    for node_item in nodes:
-                        if capture_name == "function":
-                            method = self.extract_text(node_item, source_code)
-                        elif capture_name == "full_expression":
-                            full_expr = self.extract_text(node_item, source_code)
-                            full_expr = "".join(full_expr.split())
-            
-            if method and method not in self.common_methods:
-                calls.append(FuncCallEntity(
-                    method=method,
-                    expr=full_expr
-                ))
-        
-        return calls
-    
-
+    def _expression(self, node, source_code: bytes) -> str:
+        return "".join(self.extract_text(node, source_code).split())
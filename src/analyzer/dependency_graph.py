@@ -0,0 +1,179 @@
+from collections import deque
+from typing import Iterable, Optional
+
+from src.entity import DependencyEntity
+from src.model import DependencyModel
+
+# (file_id, component, method)
+MethodNode = tuple[int, str, str]
+
+
+class DependencyGraph:
+    """
+    方法層級的呼叫圖（caller → callee），由 DependencyModel 的相依表建立
+
+    - strongly_connected_components(): 迭代版 Tarjan，依「被呼叫者在前」的順序回傳強連通元件
+    - topological_order(): 由葉節點（repository、client 等不再呼叫其他組件的方法）往上到 controller 的順序
+    - cycles(): 互相呼叫的方法（含遞迴），通常是靜態解析錯誤或需要特別注意的流程
+
+    Args:
+        dependency_model: load() 時讀取的相依表；測試可直接以 add_dependencies() 加入
+    """
+
+    def __init__(self, dependency_model: Optional[DependencyModel] = None):
+        self.dependency_model = dependency_model
+        self.edges: dict[MethodNode, list[MethodNode]] = {}
+        self._components: Optional[list[list[MethodNode]]] = None
+        self._component_of: dict[MethodNode, int] = {}
+        self._heights: list[int] = []
+
+    def load(self) -> None:
+        """從 dependency_model 重新建立整張圖"""
+        self.edges = {}
+        self.add_dependencies(self.dependency_model.all())
+
+    def add_dependencies(self, dependencies: Iterable[DependencyEntity]) -> None:
+        for dep in dependencies:
+            caller = (dep.caller_file_id, dep.caller_entity, dep.caller_func)
+            callee = (dep.callee_file_if, dep.callee_entity, dep.call.method)
+            callees = self.edges.setdefault(caller, [])
+            if callee not in callees:
+                callees.append(callee)
+            self.edges.setdefault(callee, [])
+        self._components = None
+
+    def strongly_connected_components(self) -> list[list[MethodNode]]:
+        """
+        以迭代版 Tarjan 演算法找出強連通元件（大型專案的呼叫深度會超過 Python 的遞迴上限）
+
+        Tarjan 在一個元件可到達的元件都輸出之後才輸出該元件，因此回傳順序即為「被呼叫者在前」的拓撲順序。
+        """
+        if self._components is not None:
+            return self._components
+
+        index: dict[MethodNode, int] = {}
+        low: dict[MethodNode, int] = {}
+        stack: list[MethodNode] = []
+        on_stack: set[MethodNode] = set()
+        components = []
+
+        for root in sorted(self.edges):
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.edges[root]))]
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = low[child] = len(index)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.edges[child])))
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                else:
+                    # node 的子節點都處理完：回報 low 給父節點，若 node 是元件的根則彈出整個元件
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(sorted(component))
+
+        self._components = components
+        self._component_of = {node: i for i, component in enumerate(components) for node in component}
+        # 元件的高度：到葉節點的最長路徑（以元件計），被呼叫者一定先算好
+        self._heights = []
+        for i, component in enumerate(components):
+            callees = {self._component_of[c] for node in component for c in self.edges[node]} - {i}
+            self._heights.append(max((self._heights[c] + 1 for c in callees), default=0))
+        return components
+
+    def topological_order(self) -> list[MethodNode]:
+        """所有方法由葉節點往上排序；同一個循環中的方法相鄰"""
+        return [node for component in self.strongly_connected_components() for node in component]
+
+    def order_key(self, node: MethodNode) -> tuple[int, int]:
+        """
+        排序用的 key：(高度, 拓撲位置)，葉節點與呼叫深度淺的方法在前
+
+        不在圖中的方法（沒有任何專案內呼叫）視為葉節點。
+        """
+        self.strongly_connected_components()
+        component = self._component_of.get(node)
+        if component is None:
+            return 0, -1
+        return self._heights[component], component
+
+    def cycles(self) -> list[list[MethodNode]]:
+        """互相呼叫的方法組（含呼叫自己的遞迴方法）"""
+        return [
+            component for component in self.strongly_connected_components()
+            if len(component) > 1 or component[0] in self.edges[component[0]]
+        ]
+
+    def reachable_cycles(self, node: MethodNode) -> list[list[MethodNode]]:
+        """從 node 出發可到達的循環，供呼叫鏈分析時提醒不要重複追蹤"""
+        cyclic = {i for i, component in enumerate(self.strongly_connected_components())
+                  if len(component) > 1 or component[0] in self.edges[component[0]]}
+        found = []
+        seen = {node}
+        queue = deque([node])
+        while queue:
+            current = queue.popleft()
+            component = self._component_of.get(current)
+            if component in cyclic and component not in found:
+                found.append(component)
+            for callee in self.edges.get(current, []):
+                if callee not in seen:
+                    seen.add(callee)
+                    queue.append(callee)
+        return [self._components[i] for i in found]
+
+    def cycle_path(self, component: list[MethodNode]) -> list[MethodNode]:
+        """元件中經過第一個方法的最短循環，首尾為同一個方法"""
+        start = component[0]
+        members = set(component)
+        previous = {}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            for callee in self.edges[current]:
+                if callee == start:
+                    path = [current]
+                    while path[-1] != start:
+                        path.append(previous[path[-1]])
+                    return path[::-1] + [start]
+                if callee in members and callee not in previous:
+                    previous[callee] = current
+                    queue.append(callee)
+        return [start, start]
+
+    def format_cycle(self, component: list[MethodNode]) -> str:
+        """以 "A.Run -> B.Load -> A.Run" 的形式表示一個循環，元件中還有其他方法時附上數量"""
+        path = self.cycle_path(component)
+        text = " -> ".join(f"{c}.{m}" for _, c, m in path)
+        if len(component) > len(path) - 1:
+            text += f" ({len(component)} methods)"
+        return text
+
+    def print_cycles(self, limit: int = 10) -> None:
+        cycles = self.cycles()
+        if not cycles:
+            return
+        print(f"--- {len(cycles)} dependency cycles ---")
+        for component in cycles[:limit]:
+            print(f" > {self.format_cycle(component)}")
+        if len(cycles) > limit:
+            print(f" > ... {len(cycles) - limit} more")
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+from src.analyzer.base_language_analyzer import BaseLanguageAnalyzer
+from src.entity import FuncMapEntity, SourceCodeEntity
+from src.storage.sqlite_storage import get_connection
+
+FUNC_MAP_CACHE_FILE_NAME = "func_map_cache.db"
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class FuncMapCache:
+    """
+    以「檔案內容雜湊 + 分析器版本」為 key、跨 run 共用的 func map 快取
+
+    FuncMapEntity 中的 file_id / path 屬於各 run，存入時移除、取出時換成目前檔案的值；
+    分析器的輸出格式改變時遞增其 version，舊的快取自然不再命中。超過 ttl_days 未使用的紀錄在 prune() 時刪除。
+    """
+
+    def __init__(self, db_path: str, ttl_days: float = 30):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_days * 24 * 60 * 60
+        self.hits = 0
+        self.misses = 0
+        self.conn = get_connection(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS func_map_cache ("
+            "key TEXT PRIMARY KEY, entities TEXT NOT NULL, created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+        )
+
+    def key(self, analyzer: BaseLanguageAnalyzer, content: str) -> str:
+        return f"{analyzer.programming_language}:{analyzer.version}:{content_hash(content)}"
+
+    def get_many(self, keys: list[str]) -> dict[str, list[dict]]:
+        """Look up many keys at once; returns the stored entity dicts (without file_id / path) for every hit"""
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        # SQLite 預設最多 999 個參數
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT key, entities FROM func_map_cache WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            found.update((key, json.loads(entities)) for key, entities in rows)
+        now = time.time()
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "UPDATE func_map_cache SET last_used_at = ? WHERE key = ?", [(now, key) for key in found]
+            )
+        self.hits += sum(1 for key in keys if key in found)
+        self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, results: dict[str, list[FuncMapEntity]]) -> None:
+        now = time.time()
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO func_map_cache (key, entities, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                [
+                    (key, json.dumps([entity.model_dump(exclude={"file_id", "path"}) for entity in entities]), now, now)
+                    for key, entities in results.items()
+                ]
+            )
+
+    def restore(self, entities: list[dict], source: SourceCodeEntity) -> list[FuncMapEntity]:
+        return [FuncMapEntity(**entity, file_id=source.file_id, path=source.path) for entity in entities]
+
+    def prune(self) -> int:
+        cursor = self.conn.execute(
+            "DELETE FROM func_map_cache WHERE last_used_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM func_map_cache").fetchone()[0]
+
+    def print_stats(self) -> None:
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0.0
+        print(f"--- Func map cache: hits={self.hits} misses={self.misses} ({hit_rate:.1f}% hit) entries={len(self)} ---")
+
+
+def open_func_map_cache(cache_path: str, ttl_days: float = 30) -> FuncMapCache:
+    """快取放在 cache 目錄根部，所有 run_id 共用"""
+    return FuncMapCache(os.path.join(cache_path, FUNC_MAP_CACHE_FILE_NAME), ttl_days)
@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+from unittest import IsolatedAsyncioTestCase, main
+
+from src.analyzer.call_chain_tracer import CallChainTracer
+from src.analyzer.code_dependency_analyzer import CodeDependencyAnalyzer
+from src.entity import EntryPointEntity, FuncCallEntity, FuncMapEntity
+from src.model import DependencyModel, FuncMapModel
+from src.storage import close_all
+
+
+def entity(file_id, name, funcs, fcalls=None, type="class", bases=()):
+    return FuncMapEntity(
+        ciname=name, file_id=file_id, path=f"src/{name}.cs", type=type, funcs=funcs, bases=list(bases),
+        fcalls={func: [FuncCallEntity(method=m, expr=e) for m, e in calls] for func, calls in (fcalls or {}).items()}
+    )
+
+
+FUNC_MAPS = [
+    entity(1, "UserController", ["Get"], {"Get": [("GetUser", "_userService.GetUser(id)"), ("Audit", "Audit(id)")]}),
+    entity(2, "UserService", ["GetUser", "Load"], {
+        "GetUser": [("Load", "this.Load(id)")],
+        "Load": [("Find", "_repo.Find(id)")]
+    }),
+    entity(3, "IUserService", ["GetUser"], type="interface"),
+    entity(4, "UserRepository", ["Find"], {"Find": [("GetUser", "_userService.GetUser(id)")]}),
+    entity(5, "OrderRepository", ["Find"]),
+    entity(6, "AuditLog", ["Audit"]),
+    entity(7, "SecurityAudit", ["Audit"]),
+]
+
+
+class TestCallChainTracer(IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        os.environ["CACHE_PATH"] = self.test_dir
+        self.func_map_model = FuncMapModel("trace")
+        self.dependency_model = DependencyModel("trace")
+        self.func_map_model.batch_insert(FUNC_MAPS)
+        self.dependency_model.batch_insert(CodeDependencyAnalyzer().analyze_project(FUNC_MAPS))
+        self.entry = EntryPointEntity(entry_id=1, file_id=1, component="UserController", name="Get")
+        self.asked = []
+    
+    def tearDown(self):
+        close_all()
+        os.environ.pop("CACHE_PATH", None)
+        shutil.rmtree(self.test_dir)
+    
+    async def pick_first(self, site, candidates):
+        self.asked.append((site.call.expr, [c.component for c in candidates]))
+        return candidates[:1]
+    
+    async def test_traces_across_components_and_skips_cycles(self):
+        tracer = CallChainTracer(self.func_map_model, self.dependency_model)
+        result = await tracer.trace(self.entry, self.pick_first)
+        
+        nodes = [(node.file_id, node.method) for node in result.call_chain]
+        # UserService.Load 是同組件呼叫，不列為節點但會繼續追蹤到 UserRepository.Find；
+        # UserRepository 回呼 UserService.GetUser 已走訪過
+        self.assertEqual(nodes, [(2, "GetUser"), (6, "Audit"), (4, "Find")])
+        self.assertEqual((result.file_id, result.name, result.component), (1, "Get", "UserController"))
+    
+    async def test_receiver_name_resolves_without_asking(self):
+        tracer = CallChainTracer(self.func_map_model, self.dependency_model)
+        await tracer.trace(self.entry, self.pick_first)
+        
+        # `_repo.Find` 對應多個 Repository 無法以名稱判斷，`Audit(id)` 沒有接收者，只有這兩處交給 disambiguator
+        self.assertEqual(self.asked, [
+            ("Audit(id)", ["AuditLog", "SecurityAudit"]),
+            ("_repo.Find(id)", ["UserRepository", "OrderRepository"]),
+        ])
+    
+    async def test_keeps_every_candidate_without_disambiguator(self):
+        tracer = CallChainTracer(self.func_map_model, self.dependency_model)
+        result = await tracer.trace(self.entry)
+        
+        self.assertEqual(
+            sorted((node.file_id, node.method) for node in result.call_chain),
+            [(2, "GetUser"), (4, "Find"), (5, "Find"), (6, "Audit"), (7, "Audit")]
+        )
+    
+    async def test_base_call_resolves_to_nearest_ancestor(self):
+        func_maps = [
+            entity(1, "CachedStore", ["Load"], {"Load": [("Load", "base.Load(id)")]}, bases=["SqlStore"]),
+            entity(2, "SqlStore", [], bases=["StoreBase", "IStore"]),
+            entity(3, "StoreBase", ["Load"], {"Load": [("Query", "_db.Query(id)")]}),
+            entity(4, "MemoryStore", ["Load"]),
+            entity(5, "Db", ["Query"]),
+        ]
+        func_map_model = FuncMapModel("base")
+        dependency_model = DependencyModel("base")
+        func_map_model.batch_insert(func_maps)
+        dependency_model.batch_insert(CodeDependencyAnalyzer().analyze_project(func_maps))
+        
+        tracer = CallChainTracer(func_map_model, dependency_model)
+        result = await tracer.trace(
+            EntryPointEntity(entry_id=1, file_id=1, component="CachedStore", name="Load"), self.pick_first)
+        
+        # 覆寫的方法呼叫 base.Load：跳過自己與兄弟類別，經由 SqlStore 找到 StoreBase 的實作
+        self.assertEqual([(node.file_id, node.method) for node in result.call_chain], [(3, "Load"), (5, "Query")])
+        self.assertEqual(self.asked, [])
+    
+    async def test_unknown_entry_point(self):
+        tracer = CallChainTracer(self.func_map_model, self.dependency_model)
+        result = await tracer.trace(EntryPointEntity(entry_id=2, file_id=9, component="Missing", name="Run"))
+        self.assertEqual(result.call_chain, [])
+        self.assertIn("No outgoing calls", result.stop_reason)
+
+
+if __name__ == '__main__':
+    main()
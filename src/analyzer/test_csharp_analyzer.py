@@ -0,0 +1,203 @@
+from unittest import TestCase, main
+
+from src.analyzer.code_dependency_analyzer import CodeDependencyAnalyzer
+from src.analyzer.csharp_analyzer import CSharpAnalyzer
+from src.entity import FuncCallEntity, FuncMapEntity, SourceCodeEntity
+from src.utils import class_outline, slice_span
+
+SOURCE = """
+namespace App {
+public class UserController : ControllerBase {
+    private readonly IUserService _userService;
+    protected ILogger<UserController> Logger { get; set; }
+    public UserController(IUserService userService) { _userService = userService; }
+    public async Task<IActionResult> Get(int id, UserQuery query) {
+        var repo = new UserRepository();
+        UserDto? dto = await _userService.GetUser(id);
+        repo.Find(id);
+        this._userService.Save(dto);
+        Logger.LogInformation("x");
+        query.Validate();
+        Helper(id);
+        StaticThing.Run();
+        return Ok(dto);
+    }
+}
+public class Svc(IOrderRepository repo) { public void A() { repo.Find(1); } }
+}
+"""
+
+
+class TestCSharpAnalyzer(TestCase):
+    
+    def setUp(self):
+        entities = CSharpAnalyzer().analyze_file(SourceCodeEntity(file_id=1, path="a.cs", content=SOURCE))
+        self.entities = {entity.ciname: entity for entity in entities}
+    
+    def receiver_types(self, component, method):
+        return {call.expr: call.receiver_type for call in self.entities[component].fcalls[method]}
+    
+    def test_only_guessed_receiver_types_are_marked_inferred(self):
+        inferred = {call.expr for call in self.entities["UserController"].fcalls["Get"] if call.receiver_inferred}
+        self.assertEqual(inferred, {"StaticThing.Run()"})
+    
+    def test_resolves_receiver_types_from_members_locals_and_parameters(self):
+        self.assertEqual(self.receiver_types("UserController", "Get"), {
+            "_userService.GetUser(id)": "IUserService",
+            "repo.Find(id)": "UserRepository",
+            "this._userService.Save(dto)": "IUserService",
+            "Logger.LogInformation(\"x\")": "ILogger",
+            "query.Validate()": "UserQuery",
+            "StaticThing.Run()": "StaticThing",
+            "Helper(id)": "UserController",
+        })
+    
+    def test_primary_constructor_parameters(self):
+        self.assertEqual(self.receiver_types("Svc", "A"), {"repo.Find(1)": "IOrderRepository"})
+    
+    def test_calls_belong_to_enclosing_method_and_innermost_class(self):
+        source = """
+        public class Outer {
+            public void A() { _x.First(); }
+            public class Inner { public void B() { _y.Second(); } }
+            public void C() { _z.Third(); }
+        }
+        """
+        entities = CSharpAnalyzer().analyze_file(SourceCodeEntity(file_id=3, path="c.cs", content=source))
+        self.assertEqual({e.ciname: {m: [c.method for c in calls] for m, calls in e.fcalls.items()} for e in entities}, {
+            "Outer": {"A": ["First"], "C": ["Third"]},
+            "Inner": {"B": ["Second"]},
+        })
+    
+    def test_member_hash_covers_fields_and_constructors_only(self):
+        def member_hash(source):
+            return CSharpAnalyzer().analyze_file(SourceCodeEntity(file_id=4, path="d.cs", content=source))[0].member_hash
+        
+        base = member_hash("class A { const decimal Rate = 0.05m; A() { } decimal Fee() { return Rate; } }")
+        self.assertEqual(member_hash("class A {\n  const decimal Rate = 0.05m;\n  A() { }\n  decimal Fee() { return 1; } }"), base)
+        self.assertNotEqual(member_hash("class A { const decimal Rate = 0.10m; A() { } decimal Fee() { return Rate; } }"), base)
+        self.assertNotEqual(member_hash("class A { const decimal Rate = 0.05m; A() { Init(); } decimal Fee() { return Rate; } }"), base)
+    
+    def test_method_hashes_ignore_whitespace_and_change_per_method(self):
+        def infos(source):
+            entity = CSharpAnalyzer().analyze_file(SourceCodeEntity(file_id=4, path="d.cs", content=source))[0]
+            return entity.methods
+        
+        base = infos("class A { void B() { x.Run(); } void C() { } }")
+        self.assertEqual(set(base), {"B", "C"})
+        self.assertEqual(base["C"].start_byte, 32)
+        reformatted = infos("class A {\n  void B()\n  {\n    x.Run();\n  }\n  void C() { } }")
+        self.assertEqual({m: i.body_hash for m, i in reformatted.items()}, {m: i.body_hash for m, i in base.items()})
+        edited = infos("class A { void B() { x.Stop(); } void C() { } }")
+        self.assertNotEqual(edited["B"].body_hash, base["B"].body_hash)
+        self.assertEqual(edited["C"].body_hash, base["C"].body_hash)
+    
+    def test_spans_slice_classes_and_methods_with_multibyte_comments(self):
+        source = "// 使用者\npublic class A {\n  // 取得\n  [HttpGet]\n  public void B() { x.Run(); }\n  void C() { }\n}"
+        entity = CSharpAnalyzer().analyze_file(SourceCodeEntity(file_id=5, path="e.cs", content=source))[0]
+        self.assertEqual((entity.span.start_line, entity.span.end_line), (2, 7))
+        self.assertTrue(slice_span(source, entity.span).startswith("public class A {"))
+        self.assertEqual(slice_span(source, entity.methods["B"]), "[HttpGet]\n  public void B() { x.Run(); }")
+        self.assertEqual((entity.methods["B"].start_line, entity.methods["B"].end_line), (4, 5))
+        self.assertEqual(
+            class_outline(source, entity, {"B"}),
+            "public class A {\n  // 取得\n  [HttpGet]\n  public void B() { x.Run(); }\n  // C(...) omitted\n}"
+        )
+    
+    def test_base_lists_of_classes_records_and_structs(self):
+        source = """
+        public interface IStore : IReader<User> { void Save(); }
+        public record UserDto(int Id) : BaseDto(Id), IStore { public void Save() { Write(); } }
+        public struct Point : IStore, System.IDisposable { public void Save() { Write(); } }
+        """
+        entities = CSharpAnalyzer().analyze_file(SourceCodeEntity(file_id=2, path="b.cs", content=source))
+        self.assertEqual({e.ciname: (e.type, e.bases) for e in entities}, {
+            "IStore": ("interface", ["IReader"]),
+            "UserDto": ("class", ["BaseDto", "IStore"]),
+            "Point": ("class", ["IStore", "IDisposable"]),
+        })
+
+
+def entity(file_id, name, funcs, fcalls=None, type="class", bases=()):
+    return FuncMapEntity(
+        ciname=name, file_id=file_id, path=f"src/{name}.cs", type=type, funcs=funcs, bases=list(bases),
+        fcalls={func: [FuncCallEntity(method=m, expr=e, receiver_type=t, receiver_inferred=inferred[0] if inferred else None)
+                       for m, e, t, *inferred in calls]
+                for func, calls in (fcalls or {}).items()}
+    )
+
+
+class TestTypedDependencies(TestCase):
+    
+    def callees(self, calls, bases=()):
+        func_maps = [
+            entity(1, "UserController", ["Get"], {"Get": calls}, bases=bases),
+            entity(2, "IUserRepository", ["Find"], type="interface"),
+            entity(3, "UserRepository", ["Find"], {"Find": [("Query", "_db.Query()", "Db")]}),
+            entity(4, "CachedUserRepository", ["Find"], {"Find": [("Query", "_db.Query()", "Db")]}),
+            entity(5, "OrderRepository", ["Find"], {"Find": [("Query", "_db.Query()", "Db")]}),
+            entity(6, "IUserStore", ["Load"], type="interface", bases=["IStore"]),
+            entity(7, "IStore", ["Load"], type="interface"),
+            entity(8, "StoreBase", ["Load"], {"Load": [("Query", "_db.Query()", "Db")]}, bases=["IUserStore"]),
+            entity(9, "SqlUsers", ["Save"], {"Save": [("Query", "_db.Query()", "Db")]}, bases=["StoreBase"]),
+        ]
+        return sorted((dep.call.expr, dep.callee_entity) for dep in CodeDependencyAnalyzer().analyze_project(func_maps)
+                      if dep.caller_entity == "UserController")
+    
+    def test_known_class_links_only_that_class(self):
+        self.assertEqual(self.callees([("Find", "orders.Find(1)", "OrderRepository")]),
+                         [("orders.Find(1)", "OrderRepository")])
+    
+    def test_interface_prefers_conventional_implementation(self):
+        self.assertEqual(self.callees([("Find", "_users.Find(1)", "IUserRepository")]),
+                         [("_users.Find(1)", "UserRepository")])
+    
+    def test_external_type_has_no_edges_and_unknown_falls_back_to_name(self):
+        self.assertEqual(self.callees([("Find", "list.Find(1)", "List")]), [])
+        self.assertEqual(len(self.callees([("Find", "x.Find(1)", None)])), 3)
+    
+    def test_inferred_receiver_falls_back_to_name_only_with_external_base(self):
+        # 繼承 ControllerBase 時 Users 可能是基底類別的屬性：猜出的型別不在專案中仍以方法名連到候選實體
+        self.assertEqual(len(self.callees([("Find", "Users.Find(1)", "Users", True)], bases=["ControllerBase"])), 3)
+        self.assertEqual(self.callees([("Find", "Users.Find(1)", "Users", True)]), [])
+        self.assertEqual(self.callees([("Find", "OrderRepository.Find(1)", "OrderRepository", True)]),
+                         [("OrderRepository.Find(1)", "OrderRepository")])
+    
+    def test_static_call_without_bases_has_no_edge(self):
+        func_maps = [
+            entity(1, "Worker", ["Run"], {"Run": [
+                ("WriteLine", 'Console.WriteLine("x")', "Console", True),
+                ("Delay", "Task.Delay(5)", "Task", True),
+            ]}),
+            entity(2, "Logger", ["WriteLine", "Delay"]),
+        ]
+        self.assertEqual(CodeDependencyAnalyzer().analyze_project(func_maps), [])
+    
+    def test_interface_resolves_through_implementation_index(self):
+        self.assertEqual(self.callees([("Load", "_store.Load()", "IStore")]), [("_store.Load()", "StoreBase")])
+    
+    def test_inherited_method_resolves_to_base_class(self):
+        self.assertEqual(self.callees([("Load", "users.Load()", "SqlUsers")]), [("users.Load()", "StoreBase")])
+    
+    def test_implementation_index_includes_indirect_interfaces(self):
+        func_maps = [
+            entity(1, "IStore", [], type="interface"),
+            entity(2, "IUserStore", [], type="interface", bases=["IStore"]),
+            entity(3, "StoreBase", [], bases=["IUserStore", "IDisposable"]),
+            entity(4, "SqlUsers", [], bases=["StoreBase"]),
+        ]
+        implementations = CodeDependencyAnalyzer().build_implementation_index(func_maps)
+        self.assertEqual(sorted((impl.interface, impl.component) for impl in implementations), [
+            ("IStore", "SqlUsers"), ("IStore", "StoreBase"),
+            ("IUserStore", "SqlUsers"), ("IUserStore", "StoreBase"),
+        ])
+    
+    def test_distinct_calls_to_same_file_are_kept(self):
+        self.assertEqual(self.callees([
+            ("Find", "orders.Find(1)", "OrderRepository"),
+            ("Find", "orders.Find(2)", "OrderRepository"),
+        ]), [("orders.Find(1)", "OrderRepository"), ("orders.Find(2)", "OrderRepository")])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from unittest import TestCase, main
+
+from src.analyzer.dependency_graph import DependencyGraph
+from src.entity import DependencyEntity, FuncCallEntity
+
+
+def dep(caller, callee):
+    (caller_file, caller_entity, caller_func), (callee_file, callee_entity, method) = caller, callee
+    return DependencyEntity(
+        caller_file_id=caller_file, caller_entity=caller_entity, caller_func=caller_func,
+        callee_file_if=callee_file, callee_entity=callee_entity,
+        call=FuncCallEntity(method=method, expr=f"x.{method}()")
+    )
+
+
+GET = (1, "UserController", "Get")
+LIST = (1, "UserController", "List")
+GET_USER = (2, "UserService", "GetUser")
+NOTIFY = (2, "UserService", "Notify")
+SEND = (3, "Mailer", "Send")
+FIND = (4, "UserRepository", "Find")
+LOAD = (4, "UserRepository", "Load")
+
+
+class TestDependencyGraph(TestCase):
+    
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.add_dependencies([
+            dep(GET, GET_USER), dep(GET_USER, FIND), dep(GET_USER, NOTIFY),
+            dep(NOTIFY, SEND), dep(SEND, NOTIFY),  # 循環
+            dep(LIST, FIND), dep(FIND, FIND),  # 遞迴
+            dep(FIND, LOAD),
+        ])
+    
+    def test_topological_order_puts_callees_first(self):
+        order = self.graph.topological_order()
+        position = {node: i for i, node in enumerate(order)}
+        for caller, callees in self.graph.edges.items():
+            for callee in callees:
+                if callee != caller and {caller, callee} != {NOTIFY, SEND}:
+                    self.assertLess(position[callee], position[caller], (caller, callee))
+        self.assertEqual(abs(position[NOTIFY] - position[SEND]), 1)
+    
+    def test_cycles_and_reachable_cycles(self):
+        self.assertEqual(sorted(self.graph.cycles()), [[NOTIFY, SEND], [FIND]])
+        self.assertEqual([self.graph.format_cycle(c) for c in self.graph.reachable_cycles(LIST)],
+                         ["UserRepository.Find -> UserRepository.Find"])
+        self.assertEqual(sorted(self.graph.format_cycle(c) for c in self.graph.reachable_cycles(GET)), [
+            "UserRepository.Find -> UserRepository.Find",
+            "UserService.Notify -> Mailer.Send -> UserService.Notify",
+        ])
+    
+    def test_order_key_sorts_shallow_entries_first(self):
+        self.assertEqual(self.graph.order_key(LOAD)[0], 0)
+        self.assertEqual(self.graph.order_key((9, "Unknown", "Run")), (0, -1))
+        self.assertEqual(sorted([GET, LIST, FIND], key=self.graph.order_key), [FIND, LIST, GET])
+    
+    def test_deep_chain_does_not_hit_recursion_limit(self):
+        graph = DependencyGraph()
+        nodes = [(1, f"C{i}", "Run") for i in range(5000)]
+        graph.add_dependencies(dep(a, b) for a, b in zip(nodes, nodes[1:]))
+        self.assertEqual(graph.topological_order(), nodes[::-1])
+        self.assertEqual(graph.order_key(nodes[0])[0], 4999)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,17 +5,88 @@ load_dotenv()
 class Config():
     def __init__(self):
         self.default_model = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+        # CallChainFinisherAgent 只做格式轉換，使用較便宜的模型
+        self.finisher_model = os.getenv("FINISHER_MODEL", "gemini-2.5-flash-lite")
         self.cache_path = os.getenv("CACHE_PATH", "cache")
+        # tinydb | sqlite
+        self.storage_backend = os.getenv("STORAGE_BACKEND", "tinydb")
+        # 同時處理的入口點數量上限
+        self.max_concurrency = int(os.getenv("MAX_CONCURRENCY", "1"))
+        # 各階段 worker 數量，例如 "call_chain=4,feature=2"；未指定的階段使用 max_concurrency
+        self.stage_workers = self.parse_stage_workers(os.getenv("STAGE_WORKERS", "").split(","))
+        self.stage_report_interval = float(os.getenv("STAGE_REPORT_INTERVAL", "60"))
+        # 原始碼解析（tree-sitter）的 process 數，1 為序列處理，0 為使用所有 CPU
+        self.analyzer_jobs = int(os.getenv("ANALYZER_JOBS", "1"))
+        # 跨 run 共用的 func map 快取（cache/func_map_cache.db），以檔案內容雜湊 + 分析器版本為 key
+        self.func_map_cache_enabled = os.getenv("FUNC_MAP_CACHE", "true").lower() not in ("0", "false", "no")
+        self.func_map_cache_ttl_days = float(os.getenv("FUNC_MAP_CACHE_TTL_DAYS", "30"))
+        # 每個模型的請求/token 上限，例如 "gemini-2.5-flash=10:250000"（rpm:tpm），0 表示不限制
+        self.default_rate_limit = (float(os.getenv("RATE_LIMIT_RPM", "0")), float(os.getenv("RATE_LIMIT_TPM", "0")))
+        self.model_rate_limits = self.parse_rate_limits(os.getenv("MODEL_RATE_LIMITS", "").split(","))
+        # 單一請求遇到 429 時自動重試的次數
+        self.rate_limit_max_retries = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "6"))
+        # 跨 run 共用的 LLM 回應快取（cache/llm_cache.db），超過上限時淘汰最久未使用的回應
+        self.llm_cache_enabled = os.getenv("LLM_CACHE", "true").lower() not in ("0", "false", "no")
+        self.llm_cache_max_mb = float(os.getenv("LLM_CACHE_MAX_MB", "512"))
+        # 功能分析 prompt 的估計 token 上限，超過時依優先順序縮減內容；0 表示不限制
+        self.feature_prompt_token_budget = int(os.getenv("FEATURE_PROMPT_TOKEN_BUDGET", "60000"))
+        # 功能分析採 map-reduce：呼叫鏈上的方法先各自摘要並快取（以方法內容雜湊為 key），再組合成功能分析
+        self.method_summary_enabled = os.getenv("METHOD_SUMMARY", "true").lower() not in ("0", "false", "no")
+        # 方法摘要存在 cache/method_summary_cache.db，所有 run 共用；超過天數未使用的摘要刪除
+        self.method_summary_cache_ttl_days = float(os.getenv("METHOD_SUMMARY_CACHE_TTL_DAYS", "30"))
+        # static: 以相依表靜態追蹤呼叫鏈，只在多個候選時詢問 LLM；llm: 由 agent 以工具逐步追蹤
+        self.call_chain_mode = os.getenv("CALL_CHAIN_MODE", "static")
         self.cache_file_name_map = {
             "source_code": "src",
             "dependence": "dep",
             "entry_point": "entries",
         }
         
+        # GEMINI_API_KEYS 以逗號分隔多把 key，輪流使用；未設定時使用 GEMINI_API_KEY
+        self.api_keys = {
+            "gemini": self.parse_api_keys(os.getenv("GEMINI_API_KEYS", "")) or [os.getenv("GEMINI_API_KEY", "")]
+        }
         self.api_key_map = {
-            "gemini": os.getenv("GEMINI_API_KEY", "")
+            provider: keys[0] for provider, keys in self.api_keys.items()
         }
         
         self.base_url_map = {
             "gemini": "https://generativelanguage.googleapis.com/v1beta/openai/"
-        }
\ No newline at end of file
+        }
+    
+    def parse_api_keys(self, value: str) -> list[str]:
+        return [key.strip() for key in value.split(",") if key.strip()]
+    
+    def parse_stage_workers(self, specs: list[str]) -> dict[str, int]:
+        """Parse ["call_chain=4", "feature=2"] into {"call_chain": 4, "feature": 2}"""
+        workers = {}
+        for spec in specs:
+            spec = spec.strip()
+            if not spec:
+                continue
+            name, _, count = spec.partition("=")
+            if not count.isdigit():
+                raise ValueError(f"Invalid stage worker spec '{spec}', expected <stage>=<workers>")
+            workers[name.strip()] = int(count)
+        return workers
+    
+    def get_stage_workers(self, stage: str) -> int:
+        return max(self.stage_workers.get(stage, self.max_concurrency), 1)
+    
+    def parse_rate_limits(self, specs: list[str]) -> dict[str, tuple[float, float]]:
+        """Parse ["gemini-2.5-flash=10:250000"] into {"gemini-2.5-flash": (10, 250000)}"""
+        limits = {}
+        for spec in specs:
+            spec = spec.strip()
+            if not spec:
+                continue
+            model, _, limit = spec.partition("=")
+            rpm, _, tpm = limit.partition(":")
+            try:
+                limits[model.strip()] = (float(rpm), float(tpm or 0))
+            except ValueError:
+                raise ValueError(f"Invalid rate limit spec '{spec}', expected <model>=<rpm>[:<tpm>]")
+        return limits
+    
+    def get_rate_limit(self, model: str) -> tuple[float, float]:
+        return self.model_rate_limits.get(model, self.default_rate_limit)
@@ -0,0 +1,47 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Optional
+
+
+class DelayQueue:
+    """
+    依可執行時間排序的 asyncio 佇列
+
+    put_nowait(item, delay) 讓項目在 delay 秒之後才能被 get() 取出；delay 相同時依放入順序（FIFO）。
+    等待中的 get() 會在有更早的項目放入時重新計算等待時間，不會輪詢。
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, Any]] = []
+        self._counter = itertools.count()
+        self._changed = asyncio.Event()
+
+    def put_nowait(self, item: Any, delay: float = 0.0) -> None:
+        not_before = time.monotonic() + max(delay, 0.0)
+        heapq.heappush(self._heap, (not_before, next(self._counter), item))
+        self._changed.set()
+
+    async def get(self) -> Any:
+        while True:
+            timeout: Optional[float] = None
+            if self._heap:
+                timeout = self._heap[0][0] - time.monotonic()
+                if timeout <= 0:
+                    return heapq.heappop(self._heap)[2]
+
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def qsize(self) -> int:
+        """Number of queued items, including those still waiting for their delay"""
+        return len(self._heap)
+
+    def ready_size(self) -> int:
+        """Number of queued items that can be taken right now"""
+        now = time.monotonic()
+        return sum(1 for not_before, _, _ in self._heap if not_before <= now)
@@ -0,0 +1,178 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from src.core.delay_queue import DelayQueue
+
+
+class Stage:
+    """Pipeline 中的一個處理階段，擁有自己的工作佇列與 worker 數量"""
+
+    def __init__(self, name: str, handler: Callable[[Any], Awaitable[None]], workers: int = 1):
+        self.name = name
+        self.handler = handler
+        self.workers = max(workers, 1)
+        self.queue = DelayQueue()
+        self.running = 0
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+
+    def stats(self, elapsed: float) -> str:
+        throughput = self.processed / elapsed * 60 if elapsed > 0 else 0.0
+        avg = self.busy_seconds / (self.processed + self.failed) if (self.processed + self.failed) else 0.0
+        return (
+            f"[{self.name}] queued={self.queue.qsize()} (max {self.max_depth}) "
+            f"running={self.running}/{self.workers} done={self.processed} failed={self.failed} retried={self.retried} "
+            f"throughput={throughput:.2f}/min avg={avg:.1f}s"
+        )
+
+
+class StageScheduler:
+    """
+    將每個項目依序送過多個 Stage 的排程器
+
+    每個 Stage 以獨立的 DelayQueue 與 worker 數量運作，項目完成一個階段後立即進入下一個階段的佇列，
+    不必等待其他項目。max_in_flight 限制同時在 pipeline 內的項目數。
+    項目失敗時由 on_failed 決定是否重試：回傳秒數則在該秒數後重新放回失敗的階段，
+    等待期間不佔用 worker，其他項目照常執行。
+
+    Args:
+        stages: 依處理順序排列的階段
+        on_done: 項目通過所有階段後呼叫
+        on_failed: 項目在某個階段拋出例外時呼叫 (item, stage_name, error)，
+            回傳延遲秒數表示重試，回傳 None 表示放棄，項目不再往下傳遞
+        max_in_flight: 同時在 pipeline 內的項目上限，None 表示不限制
+        report_interval: 定期輸出各階段統計的間隔秒數，0 表示只在結束時輸出
+    """
+
+    def __init__(
+        self,
+        stages: list[Stage],
+        on_done: Callable[[Any], Awaitable[None]],
+        on_failed: Callable[[Any, str, Exception], Awaitable[Optional[float]]],
+        max_in_flight: Optional[int] = None,
+        report_interval: float = 60
+    ):
+        if not stages:
+            raise ValueError("StageScheduler requires at least one stage")
+        self.stages = stages
+        self.on_done = on_done
+        self.on_failed = on_failed
+        self.max_in_flight = max_in_flight
+        self.report_interval = report_interval
+        self._admission: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._started_at = 0.0
+
+    async def run(self, items: list[Any], start_stage: Optional[Callable[[Any], str]] = None,
+                  start_delay: Optional[Callable[[Any], float]] = None) -> None:
+        """
+        Push every item through all stages and return when each one is done or gave up.
+
+        start_stage 回傳項目要從哪個階段開始（例如 resume 時跳過已完成的階段），未指定時從第一個階段開始。
+        start_delay 回傳項目第一次進入佇列前的等待秒數（例如 resume 時沿用上次排定的重試時間）。
+        """
+        if not items:
+            return
+
+        self._started_at = time.perf_counter()
+        self._admission = asyncio.Semaphore(self.max_in_flight) if self.max_in_flight else None
+        self._in_flight = len(items)
+        self._idle.clear()
+
+        workers = [
+            asyncio.create_task(self._worker(index))
+            for index, stage in enumerate(self.stages)
+            for _ in range(stage.workers)
+        ]
+        feeder = asyncio.create_task(self._feed(items, start_stage, start_delay))
+        reporter = asyncio.create_task(self._report()) if self.report_interval > 0 else None
+
+        try:
+            await self._idle.wait()
+        finally:
+            for task in workers + [feeder] + ([reporter] if reporter else []):
+                task.cancel()
+            await asyncio.gather(*workers, feeder, *([reporter] if reporter else []), return_exceptions=True)
+            self.print_report()
+
+    async def _feed(self, items: list[Any], start_stage: Optional[Callable[[Any], str]],
+                    start_delay: Optional[Callable[[Any], float]]) -> None:
+        stages = {stage.name: stage for stage in self.stages}
+        for item in items:
+            if self._admission:
+                await self._admission.acquire()
+            stage = stages.get(start_stage(item)) if start_stage else None
+            self._enqueue(stage or self.stages[0], item, max(start_delay(item), 0.0) if start_delay else 0.0)
+
+    def _enqueue(self, stage: Stage, item: Any, delay: float = 0.0) -> None:
+        stage.queue.put_nowait(item, delay)
+        stage.max_depth = max(stage.max_depth, stage.queue.qsize())
+
+    async def _worker(self, index: int) -> None:
+        stage = self.stages[index]
+        while True:
+            item = await stage.queue.get()
+            stage.running += 1
+            started = time.perf_counter()
+            error: Optional[Exception] = None
+            try:
+                await stage.handler(item)
+            except Exception as e:
+                error = e
+            finally:
+                stage.busy_seconds += time.perf_counter() - started
+                stage.running -= 1
+
+            # callback 的例外不可中止 worker，否則該階段少一個 worker，只有一個時後面的項目永遠不會被處理
+            try:
+                if error is not None:
+                    await self._fail(stage, item, error)
+                    continue
+                stage.processed += 1
+                if index + 1 < len(self.stages):
+                    self._enqueue(self.stages[index + 1], item)
+                else:
+                    await self._finish(self.on_done(item))
+            except Exception as e:
+                print(f" > [{stage.name}] callback failed for {item}: {e!r}")
+
+    async def _fail(self, stage: Stage, item: Any, error: Exception) -> None:
+        delay = None
+        try:
+            delay = await self.on_failed(item, stage.name, error)
+        finally:
+            if delay is None:
+                stage.failed += 1
+                self._release()
+        if delay is not None:
+            stage.retried += 1
+            self._enqueue(stage, item, delay)
+
+    async def _finish(self, callback: Awaitable[None]) -> None:
+        try:
+            await callback
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        if self._admission:
+            self._admission.release()
+        self._in_flight -= 1
+        if self._in_flight == 0:
+            self._idle.set()
+
+    async def _report(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.print_report()
+
+    def print_report(self) -> None:
+        elapsed = time.perf_counter() - self._started_at
+        print(f"--- Stage report ({elapsed:.0f}s elapsed) ---")
+        for stage in self.stages:
+            print(f" > {stage.stats(elapsed)}")
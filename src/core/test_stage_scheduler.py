@@ -0,0 +1,190 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase, main
+
+from src.core.delay_queue import DelayQueue
+from src.core.stage_scheduler import Stage, StageScheduler
+
+
+class TestStageScheduler(IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        self.events = []
+        self.done = []
+        self.failed = []
+    
+    def make_stage(self, name, delay=0.0, workers=1, fail_on=()):
+        async def handler(item):
+            self.events.append((name, item))
+            await asyncio.sleep(delay)
+            if item in fail_on:
+                raise RuntimeError(f"{name} failed on {item}")
+        return Stage(name, handler, workers)
+    
+    async def on_done(self, item):
+        self.done.append(item)
+    
+    async def on_failed(self, item, stage, error):
+        self.failed.append((item, stage))
+    
+    async def test_items_flow_through_every_stage(self):
+        scheduler = StageScheduler(
+            [self.make_stage("a", workers=2), self.make_stage("b")],
+            self.on_done, self.on_failed, report_interval=0
+        )
+        await scheduler.run([1, 2, 3])
+        
+        self.assertEqual(sorted(self.done), [1, 2, 3])
+        for item in [1, 2, 3]:
+            self.assertLess(self.events.index(("a", item)), self.events.index(("b", item)))
+    
+    async def test_finished_items_do_not_wait_for_slow_ones(self):
+        async def slow_first(item):
+            await asyncio.sleep(0.2 if item == 1 else 0)
+        
+        scheduler = StageScheduler(
+            [Stage("trace", slow_first, workers=2), self.make_stage("doc")],
+            self.on_done, self.on_failed, report_interval=0
+        )
+        await scheduler.run([1, 2])
+        
+        # item 2 通過後續階段時 item 1 仍在第一階段
+        self.assertEqual(self.done, [2, 1])
+    
+    async def test_failed_item_stops_at_failing_stage(self):
+        scheduler = StageScheduler(
+            [self.make_stage("a", fail_on={2}), self.make_stage("b")],
+            self.on_done, self.on_failed, report_interval=0
+        )
+        await scheduler.run([1, 2])
+        
+        self.assertEqual(self.done, [1])
+        self.assertEqual(self.failed, [(2, "a")])
+        self.assertNotIn(("b", 2), self.events)
+    
+    async def test_start_stage_skips_completed_stages(self):
+        scheduler = StageScheduler(
+            [self.make_stage("a"), self.make_stage("b")],
+            self.on_done, self.on_failed, report_interval=0
+        )
+        await scheduler.run([1, 2], start_stage=lambda item: "b" if item == 2 else "a")
+        
+        self.assertEqual(sorted(self.done), [1, 2])
+        self.assertNotIn(("a", 2), self.events)
+        self.assertIn(("b", 2), self.events)
+    
+    async def test_start_delay_postpones_item(self):
+        scheduler = StageScheduler(
+            [self.make_stage("a")],
+            self.on_done, self.on_failed, report_interval=0
+        )
+        await scheduler.run([1, 2], start_delay=lambda item: 0.1 if item == 1 else -5)
+        
+        # 排定稍後重試的項目不佔用 worker，其他項目先處理
+        self.assertEqual(self.done, [2, 1])
+    
+    async def test_max_in_flight(self):
+        in_flight = []
+        peak = []
+        
+        async def enter(item):
+            in_flight.append(item)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+        
+        async def leave(item):
+            in_flight.remove(item)
+        
+        scheduler = StageScheduler(
+            [Stage("a", enter, workers=4), Stage("b", leave, workers=4)],
+            self.on_done, self.on_failed, max_in_flight=2, report_interval=0
+        )
+        await scheduler.run(list(range(6)))
+        
+        self.assertEqual(len(self.done), 6)
+        self.assertLessEqual(max(peak), 2)
+    
+    async def test_retry_is_delayed_without_blocking_others(self):
+        attempts = {}
+        
+        async def flaky(item):
+            attempts[item] = attempts.get(item, 0) + 1
+            self.events.append(("a", item))
+            if item == 1 and attempts[item] == 1:
+                raise RuntimeError("rate limit")
+        
+        async def retry_once(item, stage, error):
+            self.failed.append((item, stage))
+            return 0.1 if attempts[item] < 2 else None
+        
+        scheduler = StageScheduler(
+            [Stage("a", flaky), self.make_stage("b")],
+            self.on_done, retry_once, report_interval=0
+        )
+        await scheduler.run([1, 2])
+        
+        # item 1 退避期間 item 2 已經完成；重試從失敗的階段開始
+        self.assertEqual(self.done, [2, 1])
+        self.assertEqual(self.failed, [(1, "a")])
+        self.assertEqual(attempts, {1: 2, 2: 1})
+        self.assertEqual(scheduler.stages[0].retried, 1)
+    
+    async def test_retry_gives_up_when_on_failed_returns_none(self):
+        async def retry_twice(item, stage, error):
+            self.failed.append((item, stage))
+            return 0 if len(self.failed) < 3 else None
+        
+        scheduler = StageScheduler(
+            [self.make_stage("a", fail_on={1})],
+            self.on_done, retry_twice, report_interval=0
+        )
+        await scheduler.run([1])
+        
+        self.assertEqual(self.done, [])
+        self.assertEqual(self.failed, [(1, "a")] * 3)
+        self.assertEqual(scheduler.stages[0].failed, 1)
+    
+    async def test_worker_survives_raising_callbacks(self):
+        async def raising_on_failed(item, stage, error):
+            self.failed.append((item, stage))
+            raise RuntimeError("status store unavailable")
+        
+        async def raising_on_done(item):
+            self.done.append(item)
+            raise RuntimeError("flush failed")
+        
+        scheduler = StageScheduler(
+            [self.make_stage("a", fail_on={1, 2})],
+            raising_on_done, raising_on_failed, report_interval=0
+        )
+        # 單一 worker：callback 的例外若中止 worker，之後的項目不會被處理而卡住
+        await asyncio.wait_for(scheduler.run([1, 2, 3, 4]), timeout=2)
+        
+        self.assertEqual(self.failed, [(1, "a"), (2, "a")])
+        self.assertEqual(self.done, [3, 4])
+        self.assertEqual(scheduler.stages[0].failed, 2)
+
+
+class TestDelayQueue(IsolatedAsyncioTestCase):
+    
+    async def test_orders_by_not_before_then_fifo(self):
+        queue = DelayQueue()
+        queue.put_nowait("late", delay=0.05)
+        queue.put_nowait("first")
+        queue.put_nowait("second")
+        
+        self.assertEqual(queue.ready_size(), 2)
+        self.assertEqual([await queue.get() for _ in range(3)], ["first", "second", "late"])
+    
+    async def test_waiting_get_wakes_for_earlier_item(self):
+        queue = DelayQueue()
+        queue.put_nowait("slow", delay=10)
+        getter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0.01)
+        queue.put_nowait("fast")
+        
+        self.assertEqual(await asyncio.wait_for(getter, 1), "fast")
+        self.assertEqual(queue.qsize(), 1)
+
+
+if __name__ == '__main__':
+    main()
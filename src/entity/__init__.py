@@ -7,6 +7,11 @@ from .func_call_entity import FuncCallEntity
 from .source_code_entity import SourceCodeEntity
 from .feature_status_entity import FeatureStatusEntity
 from .chart_entity import ChartEntity
+from .call_disambiguation_entity import CallDisambiguationEntity
+from .implementation_entity import ImplementationEntity
+from .method_info_entity import MethodInfoEntity
+from .source_span_entity import SourceSpanEntity
+from .method_summary_entity import MethodSummary, MethodSummaryEntity
 
 __all__ = [
     'CallChainResultEntity',
@@ -17,5 +22,11 @@ __all__ = [
     'FuncCallEntity',
     'SourceCodeEntity',
     'FeatureStatusEntity',
-    'ChartEntity'
+    'ChartEntity',
+    'CallDisambiguationEntity',
+    'ImplementationEntity',
+    'MethodInfoEntity',
+    'SourceSpanEntity',
+    'MethodSummary',
+    'MethodSummaryEntity'
 ]
\ No newline at end of file
@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class CallDisambiguationEntity(BaseModel):
+    selected: list[int] = Field(default_factory=list, description="Indexes of the candidates that are actually called")
+    reason: str = Field(..., description="Why these candidates were selected (<= 30 words)")
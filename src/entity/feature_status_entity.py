@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Literal
+from typing import Literal, Optional
 
 
 class FeatureStatusEntity(BaseModel):
@@ -7,4 +7,12 @@ class FeatureStatusEntity(BaseModel):
     component: str
     name: str
     state: Literal['pending', 'running', 'done', 'failed']
-    retry_count: int = 0
\ No newline at end of file
+    retry_count: int = 0
+    # 已完成的 pipeline 階段，resume 時從第一個未完成的階段開始
+    completed_stages: list[str] = []
+    # 最近一次失敗的階段與錯誤訊息，以及預計重試時間（ISO 格式）
+    failed_stage: Optional[str] = None
+    last_error: Optional[str] = None
+    next_attempt_at: Optional[str] = None
+    # 功能分析 prompt 送出前估計的 token 數（縮減後）
+    feature_prompt_tokens: Optional[int] = None
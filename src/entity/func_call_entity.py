@@ -1,5 +1,10 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class FuncCallEntity(BaseModel):
     method: str
-    expr: str
\ No newline at end of file
+    expr: str
+    # 解析出的接收者型別（去除泛型參數），無法判斷時為 None
+    receiver_type: Optional[str] = None
+    # receiver_type 只是由大寫開頭的識別字猜出的型別名稱（靜態呼叫或繼承來的屬性）時為 True
+    receiver_inferred: Optional[bool] = None
\ No newline at end of file
@@ -1,7 +1,9 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from src.entity.func_call_entity import FuncCallEntity
+from src.entity.method_info_entity import MethodInfoEntity
+from src.entity.source_span_entity import SourceSpanEntity
 
 
 class FuncMapEntity(BaseModel):
@@ -10,4 +12,12 @@ class FuncMapEntity(BaseModel):
     path: str
     type: str
     funcs: List[str]
-    fcalls: Dict[str, List[FuncCallEntity]]
\ No newline at end of file
+    fcalls: Dict[str, List[FuncCallEntity]]
+    # base_list 中的基底類別與實作的介面（去除泛型參數與命名空間）
+    bases: List[str] = []
+    # 所有方法（含沒有呼叫的方法）的範圍與內容雜湊，用於方法層級的變動偵測
+    methods: Dict[str, MethodInfoEntity] = {}
+    # 方法以外內容（欄位、常數、屬性、建構子等）的雜湊；舊版分析器產生的資料為 None
+    member_hash: Optional[str] = None
+    # 類別 / interface 宣告本身的範圍；舊版分析器產生的資料為 None
+    span: Optional[SourceSpanEntity] = None
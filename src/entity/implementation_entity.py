@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class ImplementationEntity(BaseModel):
+    """interface → 實作組件（經由 base_list 直接或間接實作）"""
+    interface: str
+    file_id: int
+    component: str
+    path: str
@@ -0,0 +1,7 @@
+from src.entity.source_span_entity import SourceSpanEntity
+
+
+class MethodInfoEntity(SourceSpanEntity):
+    # 範圍含 attribute 與簽章；同名多載時涵蓋第一個到最後一個
+    # 去除空白差異後的方法內容雜湊（含簽章），多載依出現順序一起計算
+    body_hash: str
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from src.entity.feature_analysis_entity import DataAccess, ExternalApi
+
+
+class MethodSummary(BaseModel):
+    role: str = Field(..., description="controller, service, repository, domain, infrastructure or external")
+    desc: str = Field(..., description="What the method does (<= 40 words)")
+    data_access: DataAccess = Field(default_factory=DataAccess, description="Tables or data sources the method itself reads/writes")
+    external_api: list[ExternalApi] = Field(default_factory=list, description="External APIs the method itself calls")
+    confidence: float = Field(default=0.0, description="Confidence score")
+
+
+class MethodSummaryEntity(BaseModel):
+    file_id: int
+    component: str
+    method: str
+    # 對應 MethodInfoEntity.body_hash，方法內容變動後舊的摘要不再被使用
+    body_hash: str
+    # 對應 FuncMapEntity.member_hash，欄位或建構子變動後同組件的摘要不再被使用
+    member_hash: Optional[str] = None
+    summary: MethodSummary
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class SourceSpanEntity(BaseModel):
+    # 在（壓縮後）原始碼中的 byte 範圍，切片時以 UTF-8 編碼後的內容計算
+    start_byte: int
+    end_byte: int
+    # 1-based 行號範圍；舊版分析器產生的資料沒有行號時為 0
+    start_line: int = 0
+    end_line: int = 0
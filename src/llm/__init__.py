@@ -0,0 +1,26 @@
+from .api_key_pool import ApiKeyPool, ApiKeyUsage, get_api_key_pool
+from .rate_limiter import RateLimiter, TokenBucket, get_rate_limiter, is_rate_limit_error, parse_retry_delay_seconds
+from .rate_limited_client import RateLimitedChatCompletionClient, estimate_tokens
+from .model_client import create_model_client
+from .model_client_factory import ModelClientFactory
+from .response_cache import LLMResponseCache, cache_key, open_response_cache
+from .cached_client import CachedChatCompletionClient
+
+__all__ = [
+    'ApiKeyPool',
+    'ApiKeyUsage',
+    'get_api_key_pool',
+    'RateLimiter',
+    'TokenBucket',
+    'get_rate_limiter',
+    'is_rate_limit_error',
+    'parse_retry_delay_seconds',
+    'RateLimitedChatCompletionClient',
+    'estimate_tokens',
+    'create_model_client',
+    'ModelClientFactory',
+    'LLMResponseCache',
+    'cache_key',
+    'open_response_cache',
+    'CachedChatCompletionClient'
+]
@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from src.core.config import Config
+
+
+class ApiKeyUsage:
+    """單一 API key 的使用統計"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+
+    def stats(self) -> str:
+        cooldown = max(self.cooldown_until - time.monotonic(), 0)
+        return (
+            f"[{self.label}] requests={self.requests} rate_limited={self.rate_limited} "
+            f"in_flight={self.in_flight} cooldown={cooldown:.0f}s"
+        )
+
+
+class ApiKeyPool:
+    """
+    多個 API key 輪流使用的 key pool
+
+    acquire() 以 round-robin 從未冷卻的 key 中挑選；某個 key 回傳 429 / quota 錯誤時以 cooldown() 暫停該 key，
+    其他 key 照常使用，全部冷卻中時等待最早結束冷卻的 key。
+    """
+
+    def __init__(self, keys: list[str]):
+        if not keys:
+            raise ValueError("ApiKeyPool requires at least one API key")
+        self.keys = list(keys)
+        self.usage = {key: ApiKeyUsage(f"key#{i + 1}") for i, key in enumerate(self.keys)}
+        self._next = 0
+
+    def label(self, key: str) -> str:
+        """Printable name for a key that never exposes the key itself"""
+        return self.usage[key].label
+
+    async def acquire(self) -> str:
+        while True:
+            now = time.monotonic()
+            for offset in range(len(self.keys)):
+                key = self.keys[(self._next + offset) % len(self.keys)]
+                usage = self.usage[key]
+                if usage.cooldown_until <= now:
+                    self._next = (self._next + offset + 1) % len(self.keys)
+                    usage.requests += 1
+                    usage.in_flight += 1
+                    return key
+            await asyncio.sleep(min(usage.cooldown_until for usage in self.usage.values()) - now)
+
+    def release(self, key: str) -> None:
+        self.usage[key].in_flight -= 1
+
+    def cooldown(self, key: str, seconds: float) -> None:
+        usage = self.usage[key]
+        usage.rate_limited += 1
+        usage.cooldown_until = max(usage.cooldown_until, time.monotonic() + seconds)
+
+    def print_usage(self) -> None:
+        print("--- API key usage ---")
+        for usage in self.usage.values():
+            print(f" > {usage.stats()}")
+
+
+# 每個 provider 在 process 內只有一個 key pool
+_pools: dict[str, ApiKeyPool] = {}
+
+
+def get_api_key_pool(config: Config, provider: str = "gemini") -> ApiKeyPool:
+    pool = _pools.get(provider)
+    if pool is None:
+        pool = ApiKeyPool(config.api_keys[provider])
+        _pools[provider] = pool
+    return pool
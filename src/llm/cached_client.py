@@ -0,0 +1,97 @@
+from typing import Any, AsyncGenerator, Literal, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, ModelCapabilities, RequestUsage
+from autogen_core.models._model_client import ModelInfo
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from src.llm.response_cache import LLMResponseCache, cache_key
+
+# 只快取正常結束的回應，被截斷或過濾的結果下次重新請求
+CACHEABLE_FINISH_REASONS = ("stop", "function_calls")
+
+
+class CachedChatCompletionClient(ChatCompletionClient):
+    """命中 LLMResponseCache 時直接回傳快取結果，否則呼叫底層 client 並寫入快取"""
+
+    def __init__(self, client: ChatCompletionClient, cache: LLMResponseCache, model: str):
+        self._client = client
+        self._cache = cache
+        self._model = model
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        key = cache_key(self._model, messages, tools, tool_choice, json_output, extra_create_args)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        result = await self._client.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+        if result.finish_reason in CACHEABLE_FINISH_REASONS:
+            self._cache.put(key, self._model, result)
+        return result
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        key = cache_key(self._model, messages, tools, tool_choice, json_output, extra_create_args)
+        cached = self._cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        async for chunk in self._client.create_stream(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        ):
+            if isinstance(chunk, CreateResult) and chunk.finish_reason in CACHEABLE_FINISH_REASONS:
+                self._cache.put(key, self._model, chunk)
+            yield chunk
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self._client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._client.model_info
@@ -0,0 +1,27 @@
+from typing import Any
+
+from autogen_core.models import ChatCompletionClient
+from autogen_core.models._model_client import ModelInfo
+from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+from src.core.config import Config
+from src.llm.api_key_pool import get_api_key_pool
+from src.llm.rate_limited_client import RateLimitedChatCompletionClient
+from src.llm.rate_limiter import get_rate_limiter
+
+
+def create_model_client(config: Config, model: str, model_info: ModelInfo, **kwargs: Any) -> ChatCompletionClient:
+    """建立 Gemini（OpenAI 相容）client：每把 API key 一個底層 client，並套上各 key 共用的限流器"""
+    key_pool = get_api_key_pool(config)
+    clients = {
+        key: OpenAIChatCompletionClient(
+            model=model,
+            api_key=key,
+            base_url=config.base_url_map["gemini"],
+            model_info=model_info,
+            **kwargs
+        )
+        for key in key_pool.keys
+    }
+    limiters = {key: get_rate_limiter(model, config, key_pool.label(key)) for key in key_pool.keys}
+    return RateLimitedChatCompletionClient(clients, limiters, key_pool, config.rate_limit_max_retries)
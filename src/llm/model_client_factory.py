@@ -0,0 +1,59 @@
+from typing import Any, Optional
+
+from autogen_core.models import ChatCompletionClient
+from autogen_core.models._model_client import ModelInfo
+
+from src.core.config import Config
+from src.llm.cached_client import CachedChatCompletionClient
+from src.llm.model_client import create_model_client
+from src.llm.response_cache import LLMResponseCache, open_response_cache
+
+
+class ModelClientFactory:
+    """
+    run 範圍共用的 model client 工廠
+
+    相同模型、ModelInfo 與參數的 agent 共用同一個長期存在的 client（與其 HTTP 連線池），
+    不必每次 get_agent 都重新建立連線；run 結束時以 close() 統一關閉。
+    cached=True 的 client 會先查詢跨 run 共用的 LLMResponseCache（config.llm_cache_enabled 關閉時略過）。
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self._clients: dict[tuple, ChatCompletionClient] = {}
+        self.response_cache: Optional[LLMResponseCache] = None
+
+    def _key(self, model: str, model_info: ModelInfo, kwargs: dict[str, Any]) -> tuple:
+        return (
+            model,
+            tuple(sorted((name, repr(value)) for name, value in model_info.items())),
+            tuple(sorted((name, repr(value)) for name, value in kwargs.items()))
+        )
+
+    def _get_response_cache(self) -> LLMResponseCache:
+        if self.response_cache is None:
+            max_bytes = int(self.config.llm_cache_max_mb * 1024 * 1024)
+            self.response_cache = open_response_cache(self.config.cache_path, max_bytes)
+        return self.response_cache
+
+    def get_client(self, model: str, model_info: ModelInfo, cached: bool = False, **kwargs: Any) -> ChatCompletionClient:
+        cached = cached and self.config.llm_cache_enabled
+        key = self._key(model, model_info, kwargs) + (cached,)
+        client = self._clients.get(key)
+        if client is None:
+            client = create_model_client(self.config, model, model_info, **kwargs)
+            if cached:
+                # 快取包在限流外層，命中時不佔用配額
+                client = CachedChatCompletionClient(client, self._get_response_cache(), model)
+            self._clients[key] = client
+        return client
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.close()
+        self._clients.clear()
+        if self.response_cache is not None:
+            self.response_cache.print_stats()
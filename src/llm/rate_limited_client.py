@@ -0,0 +1,171 @@
+import json
+from typing import Any, AsyncGenerator, Literal, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, ModelCapabilities, RequestUsage
+from autogen_core.models._model_client import ModelInfo
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from src.llm.api_key_pool import ApiKeyPool
+from src.llm.rate_limiter import RateLimiter, is_rate_limit_error, parse_retry_delay_seconds
+from src.utils.token_estimator import estimate_text_tokens
+
+
+def estimate_tokens(messages: Sequence[LLMMessage], tools: Sequence[Tool | ToolSchema] = ()) -> int:
+    """粗估 prompt token 數（訊息內容加上 tool schema），只用於限流"""
+    parts = [str(getattr(message, "content", "")) for message in messages]
+    for tool in tools:
+        schema = tool.schema if isinstance(tool, Tool) else tool
+        parts.append(json.dumps(schema, ensure_ascii=False, default=str))
+    return estimate_text_tokens("".join(parts))
+
+
+class RateLimitedChatCompletionClient(ChatCompletionClient):
+    """
+    在送出請求前向 key pool 取得 API key、再向該 key 的 RateLimiter 取得額度的 ChatCompletionClient
+
+    每把 key 對應一個底層 client 與限流器。收到 429 / quota 錯誤時讓該 key 冷卻並降速，
+    改用下一把可用的 key 自動重試，最多 max_retries 次，不會把節流錯誤丟回 pipeline 消耗入口點的重試次數。
+
+    Args:
+        clients: API key → 使用該 key 的底層 client
+        limiters: API key → 該 key 的限流器
+        key_pool: 挑選 key 的 ApiKeyPool，clients 的 key 必須都在 pool 中
+    """
+
+    def __init__(
+        self,
+        clients: dict[str, ChatCompletionClient],
+        limiters: dict[str, RateLimiter],
+        key_pool: ApiKeyPool,
+        max_retries: int = 6
+    ):
+        self._clients = clients
+        self._limiters = limiters
+        self._key_pool = key_pool
+        self._max_retries = max_retries
+
+    def _backoff_seconds(self, e: Exception, attempt: int) -> float:
+        delay = parse_retry_delay_seconds(e)
+        if delay is not None:
+            return delay + 1
+        return min(5 * 2 ** attempt, 60)
+
+    def _on_rate_limited(self, key: str, e: Exception, attempt: int) -> None:
+        delay = self._backoff_seconds(e, attempt)
+        self._key_pool.cooldown(key, delay)
+        self._limiters[key].on_rate_limited(delay)
+
+    def _on_success(self, key: str, estimated: int, result: CreateResult) -> None:
+        limiter = self._limiters[key]
+        limiter.on_success()
+        limiter.record_usage(estimated, result.usage.prompt_tokens + result.usage.completion_tokens)
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        estimated = estimate_tokens(messages, tools)
+        attempt = 0
+        while True:
+            key = await self._key_pool.acquire()
+            try:
+                await self._limiters[key].acquire(estimated)
+                result = await self._clients[key].create(
+                    messages,
+                    tools=tools,
+                    tool_choice=tool_choice,
+                    json_output=json_output,
+                    extra_create_args=extra_create_args,
+                    cancellation_token=cancellation_token,
+                )
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self._max_retries:
+                    raise
+                self._on_rate_limited(key, e, attempt)
+                attempt += 1
+                continue
+            finally:
+                self._key_pool.release(key)
+            self._on_success(key, estimated, result)
+            return result
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        estimated = estimate_tokens(messages, tools)
+        attempt = 0
+        while True:
+            key = await self._key_pool.acquire()
+            started = False
+            try:
+                await self._limiters[key].acquire(estimated)
+                async for chunk in self._clients[key].create_stream(
+                    messages,
+                    tools=tools,
+                    tool_choice=tool_choice,
+                    json_output=json_output,
+                    extra_create_args=extra_create_args,
+                    cancellation_token=cancellation_token,
+                ):
+                    started = True
+                    if isinstance(chunk, CreateResult):
+                        self._on_success(key, estimated, chunk)
+                    yield chunk
+                return
+            except Exception as e:
+                # 已經輸出部分內容時無法透明重試
+                if started or not is_rate_limit_error(e) or attempt >= self._max_retries:
+                    raise
+                self._on_rate_limited(key, e, attempt)
+                attempt += 1
+            finally:
+                self._key_pool.release(key)
+
+    @property
+    def _first(self) -> ChatCompletionClient:
+        return next(iter(self._clients.values()))
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.close()
+
+    def _sum_usage(self, usages: list[RequestUsage]) -> RequestUsage:
+        return RequestUsage(
+            prompt_tokens=sum(usage.prompt_tokens for usage in usages),
+            completion_tokens=sum(usage.completion_tokens for usage in usages)
+        )
+
+    def actual_usage(self) -> RequestUsage:
+        return self._sum_usage([client.actual_usage() for client in self._clients.values()])
+
+    def total_usage(self) -> RequestUsage:
+        return self._sum_usage([client.total_usage() for client in self._clients.values()])
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._first.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._first.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self._first.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._first.model_info
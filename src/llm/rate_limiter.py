@@ -0,0 +1,148 @@
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Optional
+
+from openai import RateLimitError
+
+from src.core.config import Config
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    # Check if it's a rate limit error (could be wrapped)
+    if isinstance(e, RateLimitError):
+        return True
+    message = str(e).lower()
+    return "429" in message or "rate limit" in message or "quota" in message
+
+
+def parse_retry_delay_seconds(e: Exception) -> Optional[int]:
+    """從 Gemini/Google 風格錯誤物件中抓 retryDelay（形如 '36s'）"""
+    match = re.search(r'"retryDelay":\s*"(\d+)s"', str(e))
+    if match:
+        return int(match.group(1))
+    return None
+
+
+class TokenBucket:
+    """每分鐘補充 rate 個單位的 token bucket，rate 為 0 表示不限制"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if self.rate > 0:
+            self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate / 60)
+        self.updated_at = now
+
+    def set_rate(self, rate: float) -> None:
+        self._refill(time.monotonic())
+        self.rate = rate
+        self.tokens = min(self.tokens, rate)
+
+    def wait_seconds(self, amount: float) -> float:
+        """Seconds until `amount` units are available; requests larger than the bucket only wait for a full bucket"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(time.monotonic())
+        missing = min(amount, self.rate) - self.tokens
+        return max(missing, 0.0) * 60 / self.rate
+
+    def consume(self, amount: float) -> None:
+        if self.rate > 0:
+            self.tokens -= amount
+
+
+class RateLimiter:
+    """
+    單一模型（單一 API key）的 RPM / TPM 限流器，所有使用同一模型的 client 共用
+
+    - acquire() 依估計的 token 數等待兩個 bucket 都有額度，呼叫端依序取得，不會互相搶
+    - 收到 429 時 on_rate_limited() 讓所有請求暫停到 retryDelay 結束，並把速率降到目前觀察值的 80%
+      （未設定 RPM 時以最近一分鐘實際送出的請求數作為起點，至少 MIN_LEARNED_RPM）
+    - 之後每連續成功一輪（約等於一分鐘的請求數）回升 10%，最高回到設定值
+    """
+
+    BACKOFF_FACTOR = 0.8
+    RECOVERY_FACTOR = 1.1
+    MIN_LEARNED_RPM = 5
+
+    def __init__(self, model: str, rpm: float = 0, tpm: float = 0):
+        self.model = model
+        self.max_rpm = rpm
+        self.max_tpm = tpm
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self.successes = 0
+        self.rate_limited = 0
+        self._sent: deque[float] = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    self.paused_until - now,
+                    self.requests.wait_seconds(1),
+                    self.tokens.wait_seconds(tokens)
+                )
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self._sent.append(now)
+            self._observed_rpm()
+
+    def record_usage(self, estimated: int, actual: int) -> None:
+        """以實際用量修正 acquire() 時的估計值"""
+        self.tokens.consume(actual - estimated)
+
+    def on_success(self) -> None:
+        self.successes += 1
+        rpm = self.requests.rate
+        if rpm > 0 and self.successes >= rpm:
+            self.successes = 0
+            self._scale(self.RECOVERY_FACTOR)
+
+    def on_rate_limited(self, retry_delay: float) -> None:
+        self.rate_limited += 1
+        self.successes = 0
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_delay)
+        if self.requests.rate <= 0:
+            # 未設定 RPM：以最近一分鐘實際送出的請求數作為新的上限，暫停結束後即可繼續送出
+            self.requests = TokenBucket(max(self._observed_rpm(), self.MIN_LEARNED_RPM))
+        self._scale(self.BACKOFF_FACTOR)
+        print(f" > Rate limit on {self.model}: pausing {retry_delay:.0f}s, rpm={self.requests.rate:.1f} tpm={self.tokens.rate:.0f}")
+
+    def _observed_rpm(self) -> int:
+        cutoff = time.monotonic() - 60
+        while self._sent and self._sent[0] < cutoff:
+            self._sent.popleft()
+        return len(self._sent)
+
+    def _scale(self, factor: float) -> None:
+        rpm = max(self.requests.rate * factor, 1)
+        if self.max_rpm > 0:
+            rpm = min(rpm, self.max_rpm)
+        self.requests.set_rate(rpm)
+        if self.tokens.rate > 0:
+            self.tokens.set_rate(min(self.tokens.rate * factor, self.max_tpm))
+
+
+# 同一個 process 內每個模型、每把 API key 只有一個限流器（各 key 的配額互相獨立）
+_limiters: dict[tuple[str, str], RateLimiter] = {}
+
+
+def get_rate_limiter(model: str, config: Config, key_label: str = "default") -> RateLimiter:
+    limiter = _limiters.get((model, key_label))
+    if limiter is None:
+        rpm, tpm = config.get_rate_limit(model)
+        limiter = RateLimiter(f"{model} ({key_label})", rpm, tpm)
+        _limiters[(model, key_label)] = limiter
+    return limiter
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any, Mapping, Optional, Sequence
+
+from autogen_core.models import CreateResult, LLMMessage
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from src.storage.sqlite_storage import get_connection
+
+LLM_CACHE_FILE_NAME = "llm_cache.db"
+
+
+def cache_key(
+    model: str,
+    messages: Sequence[LLMMessage],
+    tools: Sequence[Tool | ToolSchema] = (),
+    tool_choice: Any = "auto",
+    json_output: Optional[bool | type[BaseModel]] = None,
+    extra_create_args: Mapping[str, Any] = {}
+) -> str:
+    """以模型、完整訊息（含 system message 與 task prompt）、工具與輸出 schema 計算內容雜湊"""
+    if isinstance(json_output, type) and issubclass(json_output, BaseModel):
+        output = json_output.model_json_schema()
+    else:
+        output = json_output
+    payload = {
+        "model": model,
+        # source 是 agent 名稱，不影響模型輸出
+        "messages": [message.model_dump(mode="json", exclude={"source"}) for message in messages],
+        "tools": [tool.schema if isinstance(tool, Tool) else tool for tool in tools],
+        "tool_choice": tool_choice.name if isinstance(tool_choice, Tool) else tool_choice,
+        "output": output,
+        "extra": dict(extra_create_args)
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    以 SQLite 持久化、跨 run 共用的 LLM 回應快取
+
+    相同的請求內容直接回傳上次的 CreateResult。總大小超過 max_bytes 時依最後使用時間淘汰（LRU）。
+    """
+
+    def __init__(self, db_path: str, max_bytes: int):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.conn = get_connection(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL, "
+            "size INTEGER NOT NULL, created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS llm_cache__last_used_at ON llm_cache (last_used_at)")
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[CreateResult]:
+        row = self.conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (time.time(), key))
+        result = CreateResult.model_validate_json(row[0])
+        result.cached = True
+        return result
+
+    def put(self, key: str, model: str, result: CreateResult) -> None:
+        response = result.model_dump_json()
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        previous = self.conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, model, response, size, created_at, last_used_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, model, response, size, now, now)
+        )
+        self.total_bytes += size - (previous[0] if previous else 0)
+        self._evict()
+
+    def _evict(self) -> None:
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute(
+                "SELECT key, size FROM llm_cache ORDER BY last_used_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self.total_bytes = 0
+                return
+            with self.conn:
+                self.conn.execute("BEGIN")
+                for key, size in rows:
+                    if self.total_bytes <= self.max_bytes:
+                        break
+                    self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self.total_bytes -= size
+                    self.evictions += 1
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def print_stats(self) -> None:
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0.0
+        print(
+            f"--- LLM cache: hits={self.hits} misses={self.misses} ({hit_rate:.1f}% hit) "
+            f"entries={len(self)} size={self.total_bytes / 1024 / 1024:.1f}MB evicted={self.evictions} ---"
+        )
+
+
+def open_response_cache(cache_path: str, max_bytes: int) -> LLMResponseCache:
+    """快取放在 cache 目錄根部，所有 run_id 共用"""
+    return LLMResponseCache(os.path.join(cache_path, LLM_CACHE_FILE_NAME), max_bytes)
@@ -0,0 +1,49 @@
+from unittest import IsolatedAsyncioTestCase, main
+
+from autogen_core.models._model_client import ModelInfo
+
+from src.core.config import Config
+from src.llm.model_client_factory import ModelClientFactory
+
+
+def model_info(structured_output: bool) -> ModelInfo:
+    return ModelInfo(
+        vision=False,
+        function_calling=not structured_output,
+        json_output=True,
+        family=None,
+        structured_output=structured_output
+    )
+
+
+class TestModelClientFactory(IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        config = Config()
+        config.api_keys = {"gemini": ["test-key"]}
+        self.factory = ModelClientFactory(config)
+    
+    async def asyncTearDown(self):
+        await self.factory.close()
+    
+    async def test_reuses_client_for_same_model_and_info(self):
+        first = self.factory.get_client("m", model_info(True), parallel_tool_calls=False)
+        second = self.factory.get_client("m", model_info(True), parallel_tool_calls=False)
+        self.assertIs(first, second)
+        self.assertEqual(len(self.factory), 1)
+    
+    async def test_separate_clients_per_capabilities_and_options(self):
+        base = self.factory.get_client("m", model_info(True), parallel_tool_calls=False)
+        self.assertIsNot(base, self.factory.get_client("m", model_info(False), parallel_tool_calls=False))
+        self.assertIsNot(base, self.factory.get_client("m", model_info(True), parallel_tool_calls=False, max_retries=3))
+        self.assertIsNot(base, self.factory.get_client("other", model_info(True), parallel_tool_calls=False))
+        self.assertEqual(len(self.factory), 4)
+    
+    async def test_close_releases_clients(self):
+        self.factory.get_client("m", model_info(True))
+        await self.factory.close()
+        self.assertEqual(len(self.factory), 0)
+
+
+if __name__ == '__main__':
+    main()
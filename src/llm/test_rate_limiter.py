@@ -0,0 +1,135 @@
+import time
+from unittest import IsolatedAsyncioTestCase, TestCase, main
+
+from autogen_core.models import CreateResult, RequestUsage, UserMessage
+
+from src.llm.api_key_pool import ApiKeyPool
+from src.llm.rate_limited_client import RateLimitedChatCompletionClient, estimate_tokens
+from src.llm.rate_limiter import RateLimiter, TokenBucket, parse_retry_delay_seconds
+
+
+class FakeClient:
+    """只實作 create() 的假 client，前 failures 次回傳 429"""
+    
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.calls = 0
+    
+    async def create(self, messages, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError('Error code: 429 - {"retryDelay": "0s"}')
+        return CreateResult(
+            finish_reason="stop", content="ok", cached=False,
+            usage=RequestUsage(prompt_tokens=10, completion_tokens=5)
+        )
+
+
+class TestTokenBucket(TestCase):
+    
+    def test_unlimited_never_waits(self):
+        bucket = TokenBucket(0)
+        bucket.consume(1000)
+        self.assertEqual(bucket.wait_seconds(1000), 0)
+    
+    def test_waits_for_refill(self):
+        bucket = TokenBucket(60)
+        bucket.consume(60)
+        # 每秒補 1 個
+        self.assertAlmostEqual(bucket.wait_seconds(2), 2, delta=0.1)
+    
+    def test_oversized_request_waits_for_full_bucket_only(self):
+        bucket = TokenBucket(60)
+        self.assertEqual(bucket.wait_seconds(500), 0)
+
+
+class TestRateLimiter(IsolatedAsyncioTestCase):
+    
+    def test_parse_retry_delay(self):
+        self.assertEqual(parse_retry_delay_seconds(RuntimeError('{"retryDelay": "36s"}')), 36)
+        self.assertIsNone(parse_retry_delay_seconds(RuntimeError("boom")))
+    
+    async def test_rate_limited_pauses_and_slows_down(self):
+        limiter = RateLimiter("m", rpm=100)
+        limiter.on_rate_limited(0.2)
+        self.assertEqual(limiter.requests.rate, 80)
+        
+        started = time.monotonic()
+        await limiter.acquire(1)
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+    
+    async def test_learns_rpm_when_unconfigured(self):
+        limiter = RateLimiter("m")
+        for _ in range(10):
+            await limiter.acquire(1)
+        limiter.on_rate_limited(0)
+        self.assertEqual(limiter.requests.rate, 8)
+    
+    async def test_recovers_towards_configured_rate(self):
+        limiter = RateLimiter("m", rpm=10)
+        limiter.on_rate_limited(0)
+        for _ in range(10):
+            limiter.on_success()
+        self.assertAlmostEqual(limiter.requests.rate, 8.8)
+    
+    async def test_client_retries_rate_limit_transparently(self):
+        limiter = RateLimiter("m")
+        inner = FakeClient(failures=1)
+        client = RateLimitedChatCompletionClient({"k": inner}, {"k": limiter}, ApiKeyPool(["k"]), max_retries=2)
+        
+        result = await client.create([UserMessage(content="hi", source="user")])
+        
+        self.assertEqual(result.content, "ok")
+        self.assertEqual(inner.calls, 2)
+        self.assertEqual(limiter.rate_limited, 1)
+    
+    async def test_client_gives_up_after_max_retries(self):
+        client = RateLimitedChatCompletionClient(
+            {"k": FakeClient(failures=5)}, {"k": RateLimiter("m")}, ApiKeyPool(["k"]), max_retries=0)
+        with self.assertRaises(RuntimeError):
+            await client.create([UserMessage(content="hi", source="user")])
+    
+    async def test_client_fails_over_to_next_key(self):
+        pool = ApiKeyPool(["a", "b"])
+        clients = {"a": FakeClient(failures=1), "b": FakeClient()}
+        limiters = {"a": RateLimiter("m"), "b": RateLimiter("m")}
+        client = RateLimitedChatCompletionClient(clients, limiters, pool, max_retries=2)
+        
+        started = time.monotonic()
+        await client.create([UserMessage(content="hi", source="user")])
+        
+        # 不必等待 key a 冷卻結束
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual((clients["a"].calls, clients["b"].calls), (1, 1))
+        self.assertEqual(pool.usage["a"].rate_limited, 1)
+        self.assertEqual(pool.usage["a"].in_flight + pool.usage["b"].in_flight, 0)
+    
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens([UserMessage(content="x" * 400, source="user")]), 101)
+        # 中文字元各以 1 個 token 計
+        self.assertEqual(estimate_tokens([UserMessage(content="取得使用者 " + "x" * 40, source="user")]), 16)
+
+
+class TestApiKeyPool(IsolatedAsyncioTestCase):
+    
+    async def test_round_robin(self):
+        pool = ApiKeyPool(["a", "b", "c"])
+        self.assertEqual([await pool.acquire() for _ in range(4)], ["a", "b", "c", "a"])
+        self.assertEqual(pool.usage["a"].requests, 2)
+        self.assertEqual(pool.label("b"), "key#2")
+    
+    async def test_skips_cooling_key(self):
+        pool = ApiKeyPool(["a", "b"])
+        pool.cooldown("a", 60)
+        self.assertEqual([await pool.acquire() for _ in range(2)], ["b", "b"])
+    
+    async def test_waits_when_every_key_is_cooling(self):
+        pool = ApiKeyPool(["a"])
+        pool.cooldown("a", 0.1)
+        started = time.monotonic()
+        self.assertEqual(await pool.acquire(), "a")
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+from unittest import IsolatedAsyncioTestCase, main
+
+from autogen_core.models import CreateResult, RequestUsage, SystemMessage, UserMessage
+from pydantic import BaseModel
+
+from src.llm.cached_client import CachedChatCompletionClient
+from src.llm.response_cache import LLMResponseCache, cache_key
+from src.storage.sqlite_storage import close_connections
+
+
+class Answer(BaseModel):
+    text: str
+
+
+class CountingClient:
+    """回傳固定內容並計算呼叫次數的假 client"""
+    
+    def __init__(self, finish_reason="stop"):
+        self.calls = 0
+        self.finish_reason = finish_reason
+    
+    async def create(self, messages, **kwargs):
+        self.calls += 1
+        return CreateResult(
+            finish_reason=self.finish_reason, content=f"answer {self.calls}", cached=False,
+            usage=RequestUsage(prompt_tokens=10, completion_tokens=5)
+        )
+
+
+def messages(task: str, system: str = "sys"):
+    return [SystemMessage(content=system), UserMessage(content=task, source="agent_a")]
+
+
+class TestResponseCache(IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = LLMResponseCache(os.path.join(self.tmp, "llm_cache.db"), max_bytes=10 * 1024 * 1024)
+    
+    def tearDown(self):
+        close_connections()
+        shutil.rmtree(self.tmp)
+    
+    def test_key_covers_prompt_and_output_schema_but_not_agent_name(self):
+        base = cache_key("m", messages("task"), json_output=Answer)
+        self.assertEqual(base, cache_key("m", [SystemMessage(content="sys"), UserMessage(content="task", source="agent_b")], json_output=Answer))
+        self.assertNotEqual(base, cache_key("m", messages("task", system="other"), json_output=Answer))
+        self.assertNotEqual(base, cache_key("m", messages("other"), json_output=Answer))
+        self.assertNotEqual(base, cache_key("m2", messages("task"), json_output=Answer))
+        self.assertNotEqual(base, cache_key("m", messages("task")))
+    
+    async def test_client_reuses_cached_response(self):
+        inner = CountingClient()
+        client = CachedChatCompletionClient(inner, self.cache, "m")
+        
+        first = await client.create(messages("task"))
+        second = await client.create(messages("task"))
+        
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual(second.content, first.content)
+        self.assertTrue(second.cached)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+    
+    async def test_truncated_responses_are_not_cached(self):
+        inner = CountingClient(finish_reason="length")
+        client = CachedChatCompletionClient(inner, self.cache, "m")
+        await client.create(messages("task"))
+        await client.create(messages("task"))
+        self.assertEqual(inner.calls, 2)
+    
+    def test_persists_across_instances(self):
+        result = CreateResult(finish_reason="stop", content="x", cached=False, usage=RequestUsage(prompt_tokens=1, completion_tokens=1))
+        self.cache.put("k", "m", result)
+        reopened = LLMResponseCache(self.cache.db_path, max_bytes=self.cache.max_bytes)
+        self.assertEqual(reopened.get("k").content, "x")
+    
+    def test_evicts_least_recently_used(self):
+        def result(content):
+            return CreateResult(finish_reason="stop", content=content, cached=False, usage=RequestUsage(prompt_tokens=1, completion_tokens=1))
+        
+        size = len(result("a" * 100).model_dump_json())
+        cache = LLMResponseCache(os.path.join(self.tmp, "small.db"), max_bytes=size * 2)
+        cache.put("a", "m", result("a" * 100))
+        cache.put("b", "m", result("b" * 100))
+        cache.get("a")
+        cache.put("c", "m", result("c" * 100))
+        
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.evictions, 1)
+
+
+if __name__ == '__main__':
+    main()
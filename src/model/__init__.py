@@ -6,6 +6,7 @@ from .func_map_model import FuncMapModel
 from .source_code_model import SourceCodeModel
 from .feature_status_model import FeatureStatusModel
 from .chart_model import ChartModel
+from .implementation_model import ImplementationModel
 
 __all__ = [
     'CallChainAnalysisModel',
@@ -15,5 +16,6 @@ __all__ = [
     'FuncMapModel',
     'SourceCodeModel',
     'FeatureStatusModel',
-    'ChartModel'
+    'ChartModel',
+    'ImplementationModel'
 ]
\ No newline at end of file
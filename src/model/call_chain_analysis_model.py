@@ -1,15 +1,12 @@
-import os
 from typing import Optional
-from tinydb import TinyDB, Query
 
 from src.entity import CallChainResultEntity
+from src.storage import open_table
 
 
 class CallChainAnalysisModel:
     def __init__(self, run_id: str, table: str = "call_chain"):
-        db_dir = f"cache/{run_id}"
-        os.makedirs(db_dir, exist_ok=True)
-        self.db = TinyDB(f"{db_dir}/{table}.json")
+        self.db = open_table(run_id, table, indexes=[("component", "name")])
 
     def has_data(self) -> bool:
         return len(self.db) > 0
@@ -18,17 +15,18 @@ class CallChainAnalysisModel:
         """Get all call chain analysis records"""
         return self.db.all()
     
+    def keys(self) -> set[tuple[str, str]]:
+        """All analyzed (component, entry name) pairs"""
+        return {(row["component"], row["name"]) for row in self.db.all()}
+    
     def insert(self, call_chain_result: CallChainResultEntity):
         """Insert a single call chain analysis result"""
         self.db.insert(call_chain_result.model_dump())
     
     def find_by_component_and_entry(self, component: str, entry_name: str) -> Optional[CallChainResultEntity]:
         """Find call chain analysis by component and entry name"""
-        CallChain = Query()
-        results = self.db.search(
-            (CallChain.component == component) & (CallChain.name == entry_name)
-        )
+        result = self.db.get({"component": component, "name": entry_name})
         
-        if results:
-            return CallChainResultEntity(**results[0])
-        return None
\ No newline at end of file
+        if result:
+            return CallChainResultEntity(**result)
+        return None
@@ -1,26 +1,25 @@
-import os
 from typing import Optional
-from tinydb import TinyDB, Query
 
 from src.entity import ChartEntity
+from src.storage import open_table
 
 
 class ChartModel:
     def __init__(self, run_id: str, table: str = "chart"):
-        db_dir = f"cache/{run_id}"
-        os.makedirs(db_dir, exist_ok=True)
-        self.db = TinyDB(f"{db_dir}/{table}.json")
-        self.q = Query()
+        self.db = open_table(run_id, table, indexes=[("entry_id",)])
 
     def get(self, id: int) -> Optional[ChartEntity]:
-        row = self.db.search(self.q['entry_id'] == id )
+        row = self.db.get({"entry_id": id})
         if row:
-            return ChartEntity(**row[0])
+            return ChartEntity(**row)
         return None
     
     def is_exist(self, id: int) -> bool:
-        return self.db.contains(self.q['entry_id'] == id)
+        return self.db.contains({"entry_id": id})
+
+    def entry_ids(self) -> set[int]:
+        return {row["entry_id"] for row in self.db.all()}
 
     def insert(self, entity: ChartEntity) -> None:
         self.db.insert(entity.model_dump())
-    
\ No newline at end of file
+    
@@ -1,30 +1,37 @@
-import os
-from tinydb import TinyDB, Query
-
 from src.entity import DependencyEntity
+from src.storage import open_table
 
 
 class DependencyModel:
     def __init__(self, run_id: str, table: str = "dep"):
-        db_dir = f"cache/{run_id}"
-        os.makedirs(db_dir, exist_ok=True)
-        self.db = TinyDB(f"{db_dir}/{table}.json")
+        self.db = open_table(run_id, table, indexes=[("caller_file_id", "caller_entity", "call.expr")])
 
     def has_data(self) -> bool:
         return len(self.db) > 0
     
     def find_callee_by_caller(self, file_id: int, component: str, expr: str) -> list[DependencyEntity]:
         """Find dependencies by file ID and expression"""
-        Dep = Query()
-        results = self.db.search(
-            (Dep['caller_file_id'] == file_id )&
-            (Dep['caller_entity'] == component) &
-            (Dep['call']['expr'] == expr)
-        )
+        results = self.db.search({
+            "caller_file_id": file_id,
+            "caller_entity": component,
+            "call.expr": expr
+        })
         
         return [DependencyEntity(**r) for r in results]
 
+    def build_index(self) -> None:
+        """Precompute and persist the (caller_file_id, caller_entity, expr) lookup index"""
+        self.db.build_indexes()
+
+    def load_index(self) -> None:
+        """Load the table and its lookup index into memory"""
+        self.db.load_indexes()
+
+    def all(self) -> list[DependencyEntity]:
+        """Get all dependency entities"""
+        return [DependencyEntity(**r) for r in self.db.all()]
+
     def batch_insert(self, deps_data: list[DependencyEntity]):
         """Insert multiple dependency entities at once"""
         self.db.insert_multiple([dep.model_dump() for dep in deps_data])
-    
\ No newline at end of file
+    
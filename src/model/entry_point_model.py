@@ -1,15 +1,12 @@
-import os
 from typing import List
-from tinydb import TinyDB, Query
 
 from src.entity.entry_point_entity import EntryPointEntity
+from src.storage import open_table
 
 
 class EntryPointModel:
     def __init__(self, run_id: str, table: str = "entry"):
-        db_dir = f"cache/{run_id}"
-        os.makedirs(db_dir, exist_ok=True)
-        self.db = TinyDB(f"{db_dir}/{table}.json")
+        self.db = open_table(run_id, table, indexes=[("entry_id",)])
         
     def batch_insert(self, data: List[EntryPointEntity]):
         """Insert multiple entry point entities at once"""
@@ -20,4 +17,4 @@ class EntryPointModel:
         return [EntryPointEntity(**record) for record in self.db.all()]
     
     def has_data(self) -> bool:
-        return len(self.db) > 0
\ No newline at end of file
+        return len(self.db) > 0
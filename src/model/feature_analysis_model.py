@@ -1,30 +1,28 @@
-import os
 from typing import Optional
-from tinydb import TinyDB, Query
 
 from src.entity.feature_analysis_entity import FeatureAnalysisEntity
+from src.storage import open_table
 
 
 class FeatureAnalysisModel:
     def __init__(self, run_id: str, table: str = "feat"):
-        db_dir = f"cache/{run_id}"
-        os.makedirs(db_dir, exist_ok=True)
-        self.db = TinyDB(f"{db_dir}/{table}.json")
-        self.q = Query()
+        self.db = open_table(run_id, table, indexes=[("entry_component_name", "entry_func_name")])
     
     def has_data(self) -> bool:
         return len(self.db) > 0
     
+    def keys(self) -> set[tuple[str, str]]:
+        """All analyzed (component, entry name) pairs"""
+        return {(row["entry_component_name"], row["entry_func_name"]) for row in self.db.all()}
+    
     def insert(self, feature: FeatureAnalysisEntity):
         """Insert a single feature analysis result"""
         self.db.insert(feature.model_dump())
     
     def get_by_component_and_entry(self, component: str, entry_name: str) -> Optional[FeatureAnalysisEntity]:
         """Find feature analysis by component and entry name"""
-        results = self.db.search(
-            (self.q.entry_component_name == component) & (self.q.entry_func_name == entry_name)
-        )
+        result = self.db.get({"entry_component_name": component, "entry_func_name": entry_name})
         
-        if results:
-            return FeatureAnalysisEntity(**results[0])
-        return None
\ No newline at end of file
+        if result:
+            return FeatureAnalysisEntity(**result)
+        return None
@@ -1,19 +1,16 @@
-import os
+from datetime import datetime, timedelta
 from typing import Optional
-from tinydb import TinyDB, Query
 
 from src.entity.feature_status_entity import FeatureStatusEntity
+from src.storage import open_table
 
 
 class FeatureStatusModel:
     def __init__(self, run_id: str, table: str = "feat_status"):
-        db_dir = f"cache/{run_id}"
-        os.makedirs(db_dir, exist_ok=True)
-        self.db = TinyDB(f"{db_dir}/{table}.json")
-        self.Q = Query()
+        self.db = open_table(run_id, table, indexes=[("id",), ("state",)])
 
     def get(self, id: int) -> Optional[FeatureStatusEntity]:
-        row = self.db.get(self.Q.id == id)
+        row = self.db.get({"id": id})
         if row is None:
             return None
         return FeatureStatusEntity(**row)
@@ -21,39 +18,72 @@ class FeatureStatusModel:
     def batch_insert(self, entities: list[FeatureStatusEntity]) -> None:
         self.db.insert_multiple([entity.model_dump() for entity in entities])
 
+    def all(self) -> list[FeatureStatusEntity]:
+        return [FeatureStatusEntity(**row) for row in self.db.all()]
+
+    def replace_all(self, entities: list[FeatureStatusEntity]) -> None:
+        """以一次寫入取代整張表（SQLite 為單一 transaction），中斷時不會留下空的 feat_status"""
+        self.db.replace_all([entity.model_dump() for entity in entities])
+
+    def complete_stage(self, id: int, stage: str) -> None:
+        row = self.db.get({"id": id})
+        if row is None:
+            return
+        completed = list(row.get("completed_stages", []))
+        if stage not in completed:
+            completed.append(stage)
+            self.db.update({"completed_stages": completed}, {"id": id})
+
     def to_running(self, id: int) -> None:
-        self.db.update({"state": "running"}, self.Q.id == id)
+        self.db.update({"state": "running"}, {"id": id})
 
     def to_done(self, id: int) -> None:
-        self.db.update({"state": "done"}, self.Q.id == id)
+        self.db.update({"state": "done"}, {"id": id})
 
     def to_failed(self, id: int) -> None:
-        self.db.update({"state": "failed"}, self.Q.id == id)
+        self.db.update({"state": "failed"}, {"id": id})
+
+    def record_prompt_tokens(self, id: int, tokens: int) -> None:
+        self.db.update({"feature_prompt_tokens": tokens}, {"id": id})
 
     def get_retry_count(self, id: int) -> int:
-        row = self.db.get(self.Q.id == id)
+        row = self.db.get({"id": id})
         if row is None:
             return 0
         return int(row.get("retry_count", 0))
 
     def inc_retry(self, id: int) -> int:
-        row = self.db.get(self.Q.id == id)
+        row = self.db.get({"id": id})
         new_rc = int(row.get("retry_count", 0)) + 1
-        self.db.update({"retry_count": new_rc}, self.Q.id == id)
+        self.db.update({"retry_count": new_rc}, {"id": id})
         return new_rc
 
+    def record_failure(self, id: int, stage: str, error: Exception, retry_delay: Optional[float] = None) -> int:
+        """記錄一次失敗並回傳新的 retry_count；retry_delay 為 None 表示不再重試"""
+        retry_count = self.inc_retry(id)
+        next_attempt_at = None
+        if retry_delay is not None:
+            next_attempt_at = (datetime.now() + timedelta(seconds=retry_delay)).isoformat(timespec="seconds")
+        self.db.update({
+            "state": "failed",
+            "failed_stage": stage,
+            "last_error": str(error)[:500],
+            "next_attempt_at": next_attempt_at
+        }, {"id": id})
+        return retry_count
+
     def truncate(self) -> None:
         """Drop all records from the feature status table"""
         self.db.truncate()
 
     def get_pending_or_failed_entries(self, max_retry: int = 3) -> list[FeatureStatusEntity]:
         """Get entries that are pending or failed but haven't exceeded max retry count"""
-        results = self.db.search(
-            (self.Q.state.one_of(['pending', 'failed'])) & 
-            (self.Q.retry_count < max_retry)
-        )
-        return [FeatureStatusEntity(**record) for record in results]
+        results = self.db.search_in("state", ['pending', 'failed'])
+        return [
+            FeatureStatusEntity(**record) for record in results
+            if record.get("retry_count", 0) < max_retry
+        ]
 
     def has_pending_work(self, max_retry: int = 3) -> bool:
         """Check if there are still entries to process"""
-        return len(self.get_pending_or_failed_entries(max_retry)) > 0
\ No newline at end of file
+        return len(self.get_pending_or_failed_entries(max_retry)) > 0
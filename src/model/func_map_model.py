@@ -1,50 +1,60 @@
-import os
 from typing import Optional
-from tinydb import TinyDB, Query
 
 from src.entity import FuncMapEntity
+from src.storage import open_table
 
 class FuncMapModel:
     def __init__(self, run_id: str, table: str = "func_map"):
-        db_dir = f"cache/{run_id}"
-        os.makedirs(db_dir, exist_ok=True)
-        self.db = TinyDB(f"{db_dir}/{table}.json")
+        self.db = open_table(run_id, table, indexes=[
+            ("ciname", "file_id", "funcs[]"),
+            ("ciname", "funcs[]"),
+            ("file_id",)
+        ])
 
     def has_data(self) -> bool:
         return len(self.db) > 0
     
     def list_by_type(self, file_type: str) -> list[FuncMapEntity]:
         """List all files of a specific type (e.g., 'class', 'interface')"""
-        File = Query()
-        results = self.db.search(File.type == file_type)
+        results = self.db.search({"type": file_type})
         return [FuncMapEntity(**record) for record in results]
     
     def get_id_by_class_and_function(self, class_name: str, function_name: str) -> int:
         """Find all entities that contain both the specified class and function (not supports partial classes)"""
-        File = Query()
-        results = self.db.search(
-            (File.ciname == class_name) & (File.funcs.any([function_name]))
-        )
+        result = self.db.get({"ciname": class_name, "funcs[]": function_name})
         
-        if not results:
+        if not result:
             return -1
     
-        return results[0]['file_id']
+        return result['file_id']
     
     def get_by_component_and_function(self, 
             component_name: str, function_name: str, file_id: int) -> Optional[FuncMapEntity]:
         """Get function analysis entity by component name, function name and file id"""
-        File = Query()
-        results = self.db.search(
-            (File.ciname == component_name) & 
-            (File.funcs.any([function_name])) & 
-            (File.file_id == file_id)
-        )
+        result = self.db.get({"ciname": component_name, "file_id": file_id, "funcs[]": function_name})
         
-        if results:
-            return FuncMapEntity(**results[0])
+        if result:
+            return FuncMapEntity(**result)
         return None
 
+    def list_by_component(self, component_name: str) -> list[FuncMapEntity]:
+        """List every entity with the given name (partial classes span several files)"""
+        results = self.db.search({"ciname": component_name})
+        return [FuncMapEntity(**record) for record in results]
+
+    def list_by_file(self, file_id: int) -> list[FuncMapEntity]:
+        """List all entities declared in a file"""
+        results = self.db.search({"file_id": file_id})
+        return [FuncMapEntity(**record) for record in results]
+
+    def build_index(self) -> None:
+        """Precompute and persist the (ciname, file_id, func) lookup index"""
+        self.db.build_indexes()
+
+    def load_index(self) -> None:
+        """Load the table and its lookup index into memory"""
+        self.db.load_indexes()
+
     def batch_insert(self, files_data: list[FuncMapEntity]):
         """Insert multiple file function mapping entities at once"""
         self.db.insert_multiple([file_entity.model_dump() for file_entity in files_data])
@@ -53,4 +63,4 @@ class FuncMapModel:
         """Get all function mapping entities"""
         results = self.db.all()
         return [FuncMapEntity(**record) for record in results]
-    
\ No newline at end of file
+    
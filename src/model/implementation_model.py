@@ -0,0 +1,26 @@
+from src.entity import ImplementationEntity
+from src.storage import open_table
+
+
+class ImplementationModel:
+    def __init__(self, run_id: str, table: str = "impl"):
+        self.db = open_table(run_id, table, indexes=[("interface",)])
+
+    def has_data(self) -> bool:
+        return len(self.db) > 0
+
+    def find_implementations(self, interface: str) -> list[ImplementationEntity]:
+        """Find every component that implements the interface"""
+        return [ImplementationEntity(**r) for r in self.db.search({"interface": interface})]
+
+    def build_index(self) -> None:
+        """Precompute and persist the interface lookup index"""
+        self.db.build_indexes()
+
+    def load_index(self) -> None:
+        """Load the table and its lookup index into memory"""
+        self.db.load_indexes()
+
+    def batch_insert(self, implementations: list[ImplementationEntity]):
+        """Insert multiple implementation entities at once"""
+        self.db.insert_multiple([impl.model_dump() for impl in implementations])
@@ -1,21 +1,16 @@
-import os
-from tinydb import TinyDB, Query
-
 from src.entity import SourceCodeEntity
+from src.storage import open_table
 
 
 class SourceCodeModel:
     
     def __init__(self, run_id: str, table: str = "src"):
-        db_dir = f"cache/{run_id}"
-        os.makedirs(db_dir, exist_ok=True)
-        self.db = TinyDB(f"{db_dir}/{table}.json")
+        self.db = open_table(run_id, table, indexes=[("file_id",)])
         
     def get_content_by_id(self, fid: int) -> str:
-        src = Query()
-        result = self.db.search(src.file_id == fid)
+        result = self.db.get({"file_id": fid})
         if result:
-            return result[0].get("content", "")
+            return result.get("content", "")
         return ""
     
     def list_structure(self) -> dict:
@@ -23,8 +18,7 @@ class SourceCodeModel:
         return {entry["file_id"]: entry["path"] for entry in all_entries if "file_id" in entry and "path" in entry}
     
     def list_structure_by_ids(self, ids: list[int]) -> dict:
-        src = Query()
-        files = self.db.search(src.file_id.one_of(ids))
+        files = self.db.search_in("file_id", ids)
         return {
             f["file_id"]: f["path"]
             for f in files 
@@ -41,12 +35,15 @@ class SourceCodeModel:
     def has_data(self) -> bool:
         return len(self.db) > 0
     
+    def load_index(self) -> None:
+        """Load the table and its file_id index into memory"""
+        self.db.load_indexes()
+    
     def find_by_id(self, fids: list[int]) -> list[SourceCodeEntity]:
         """Get multiple records by list of file IDs"""
-        src = Query()
         results = []
         for fid in fids:
-            result = self.db.search(src.file_id == fid)
+            result = self.db.get({"file_id": fid})
             if result:
-                results.append(SourceCodeEntity(**result[0]))
-        return results
\ No newline at end of file
+                results.append(SourceCodeEntity(**result))
+        return results
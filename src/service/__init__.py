@@ -5,6 +5,11 @@ from .analysis_service import AnalysisService
 from .func_map_service import FuncMapService
 from .chart_service import ChartService
 from .generate_documentation_service import GenerateDocumentationService
+from .feature_status_service import FeatureStatusService, PIPELINE_STAGES
+from .incremental_service import IncrementalService
+from .feature_prompt_builder import FeaturePromptBuilder
+from .method_summary_cache import MethodSummaryCache, open_method_summary_cache
+from .method_summary_service import MethodSummaryService
 
 __all__ = [
     'AnalysisService',
@@ -14,5 +19,12 @@ __all__ = [
     'SourceCodeService',
     'FuncMapService',
     'ChartService',
-    'GenerateDocumentationService'
+    'GenerateDocumentationService',
+    'FeatureStatusService',
+    'IncrementalService',
+    'FeaturePromptBuilder',
+    'MethodSummaryCache',
+    'MethodSummaryService',
+    'open_method_summary_cache',
+    'PIPELINE_STAGES'
 ]
\ No newline at end of file
@@ -1,15 +1,21 @@
 import json
+from typing import Optional
 
 from src.agent.call_chain_analyzer_agent import CallChainAnalyzerAgent
 from src.agent.call_chain_finisher_agent import CallChainFinisherAgent
+from src.agent.call_disambiguator_agent import CallDisambiguatorAgent
+from src.analyzer.call_chain_tracer import CallCandidate, CallChainTracer, CallSite
+from src.analyzer.dependency_graph import DependencyGraph
 from src.agent.feature_analyzer_agent import FeatureAnalyzerAgent
+from src.service.feature_prompt_builder import FeaturePromptBuilder
+from src.service.method_summary_service import MethodSummaryService
 from src.entity.feature_analysis_entity import FeatureAnalysisEntity
-from src.model import EntryPointModel, CallChainAnalysisModel, FeatureAnalysisModel, SourceCodeModel
+from src.model import EntryPointModel, CallChainAnalysisModel, FeatureAnalysisModel, FeatureStatusModel, SourceCodeModel
 from src.entity import CallChainResultEntity, EntryPointEntity
 from autogen_agentchat.messages import StructuredMessage
 from autogen_agentchat.teams import RoundRobinGroupChat
 from autogen_agentchat.conditions import SourceMatchTermination
-from autogen_agentchat.ui import Console
+from src.utils import class_outline, estimate_text_tokens, run_agent_task
 
 class AnalysisService:
     def __init__(self, 
@@ -19,7 +25,24 @@ class AnalysisService:
             source_code_model: SourceCodeModel,
             call_chain_analyzer_agent: CallChainAnalyzerAgent, 
             call_chain_finish_agent: CallChainFinisherAgent,
-            feature_analyzer_agent: FeatureAnalyzerAgent):
+            feature_analyzer_agent: FeatureAnalyzerAgent,
+            stream_console: bool = True,
+            call_chain_tracer: Optional[CallChainTracer] = None,
+            call_disambiguator_agent: Optional[CallDisambiguatorAgent] = None,
+            feature_prompt_builder: Optional[FeaturePromptBuilder] = None,
+            feature_status_model: Optional[FeatureStatusModel] = None,
+            method_summary_service: Optional[MethodSummaryService] = None,
+            dependency_graph: Optional[DependencyGraph] = None):
+        """
+        call_chain_tracer 有值時以靜態追蹤產生呼叫鏈，只有多個候選的呼叫點才交給 call_disambiguator_agent；
+        否則沿用 CallChainAnalyzerAgent + CallChainFinisherAgent 的 tool loop
+
+        feature_prompt_builder 未提供時功能分析的輸入為呼叫鏈上的完整檔案；
+        feature_status_model 有值時記錄每個入口點功能分析 prompt 的估計 token 數；
+        method_summary_service 有值時以 map-reduce 分析功能：呼叫鏈上的方法先各自摘要（可跨入口點重複使用），
+        FeatureAnalyzerAgent 只讀入口點檔案與方法摘要；
+        dependency_graph 有值時，以 agent 追蹤呼叫鏈會附上入口點可到達的循環，避免 agent 在循環中反覆查詢
+        """
         
         self.entry_point_model = entry_point_model
         self.call_chain_analysis_model = call_chain_analysis_model
@@ -28,19 +51,35 @@ class AnalysisService:
         self.call_chain_analyzer_agent = call_chain_analyzer_agent
         self.call_chain_finish_agent = call_chain_finish_agent
         self.feature_analyzer_agent = feature_analyzer_agent
+        self.stream_console = stream_console
+        self.call_chain_tracer = call_chain_tracer
+        self.call_disambiguator_agent = call_disambiguator_agent
+        self.feature_prompt_builder = feature_prompt_builder or FeaturePromptBuilder(source_code_model)
+        self.feature_status_model = feature_status_model
+        self.method_summary_service = method_summary_service
+        self.dependency_graph = dependency_graph
     
     def has_analyze_call_chain_cache(self, entry_point: EntryPointEntity) -> bool:
         result = self.call_chain_analysis_model.find_by_component_and_entry(entry_point.component, entry_point.name)
         return result is not None
     
-    async def analyze_call_chain(self, entry_point: EntryPointEntity):           
-        prompt = json.dumps({
+    async def analyze_call_chain(self, entry_point: EntryPointEntity):
+        if self.call_chain_tracer is not None:
+            await self.trace_call_chain(entry_point)
+            return
+        
+        task = {
             "entry_point": {
                 "name": entry_point.name,
                 "component": entry_point.component,
                 "file_id": entry_point.file_id
             }
-        })
+        }
+        if self.dependency_graph is not None:
+            cycles = self.dependency_graph.reachable_cycles((entry_point.file_id, entry_point.component, entry_point.name))
+            if cycles:
+                task["known_cycles"] = [self.dependency_graph.format_cycle(cycle) for cycle in cycles]
+        prompt = json.dumps(task)
 
         analyzer = await self.call_chain_analyzer_agent.get_agent(entry_point.name)
         finisher = self.call_chain_finish_agent.get_agent(entry_point.name)
@@ -52,10 +91,49 @@ class AnalysisService:
             custom_message_types=custom_types
         )
         
-        result = await Console(team.run_stream(task=prompt), output_stats=True)
+        result = await run_agent_task(team, prompt, self.stream_console)
         content = result.messages[-1].content
         self.call_chain_analysis_model.insert(content)
         
+    async def trace_call_chain(self, entry_point: EntryPointEntity):
+        disambiguator = self.disambiguate_call if self.call_disambiguator_agent else None
+        result = await self.call_chain_tracer.trace(entry_point, disambiguator)
+        print(f" > Traced {entry_point.component}.{entry_point.name}: {len(result.call_chain)} nodes ({result.stop_reason})")
+        self.call_chain_analysis_model.insert(result)
+    
+    async def disambiguate_call(self, site: CallSite, candidates: list[CallCandidate]) -> list[CallCandidate]:
+        """請 LLM 從多個候選中選出呼叫點實際呼叫的組件"""
+        caller = self.source_code_model.find_by_id([site.file_id])
+        prompt = json.dumps({
+            "caller": {
+                "component": site.component,
+                "method": site.method,
+                "path": caller[0].path if caller else ""
+            },
+            "expr": site.call.expr,
+            "source": self._method_excerpt(site, caller[0].content if caller else ""),
+            "candidates": [
+                {"index": i, "component": c.component, "method": c.method, "path": c.path}
+                for i, c in enumerate(candidates)
+            ]
+        }, ensure_ascii=False)
+        
+        agent = self.call_disambiguator_agent.get_agent(site.method)
+        res = await run_agent_task(agent, prompt, self.stream_console, output_stats=False)
+        selected = res.messages[-1].content.selected
+        return [candidates[i] for i in dict.fromkeys(selected) if 0 <= i < len(candidates)]
+    
+    def _method_excerpt(self, site: CallSite, content: str, context_lines: int = 80) -> str:
+        """
+        呼叫點所在類別的摘錄：欄位、屬性、建構子與呼叫端方法保留原文（讓模型看得到接收者的型別），
+        其餘方法省略；func map 沒有範圍資訊時回傳檔案開頭
+        """
+        entities = self.call_chain_tracer.func_map_model.list_by_file(site.file_id) if self.call_chain_tracer else []
+        entity = next((e for e in entities if e.ciname == site.component and e.span is not None), None)
+        if entity is not None and site.method in entity.methods:
+            return class_outline(content, entity, {site.method})
+        return "\n".join(content.splitlines()[:context_lines])
+    
     def has_analyze_feature_cache(self, entry_point: EntryPointEntity) -> bool:
         result = self.feature_analysis_model.get_by_component_and_entry(entry_point.component, entry_point.name)
         return result is not None
@@ -65,24 +143,21 @@ class AnalysisService:
         if not call_chain_entity:
             raise ValueError(f"Call chain analysis result not found for {entry_point.component}.{entry_point.name}")
         
-        fids = self._extract_file_ids(call_chain_entity)
-        source_code_entities = self.source_code_model.find_by_id(fids)
-        prompt = json.dumps({
-            "func": entry_point.name,
-            "contents": [source_file.model_dump() for source_file in source_code_entities]
-        })
+        summaries = None
+        if self.method_summary_service is not None:
+            # 入口點檔案的方法直接放原始碼，不另外摘要
+            methods = [
+                (entity, method) for entity, method in self.feature_prompt_builder.traced_methods(call_chain_entity)
+                if entity.file_id != call_chain_entity.file_id
+            ]
+            summaries = await self.method_summary_service.summarize(f"{entry_point.component}.{entry_point.name}", methods)
+        
+        prompt = json.dumps(self.feature_prompt_builder.build(entry_point, call_chain_entity, summaries))
+        if self.feature_status_model is not None:
+            # 送出前記錄，超出 context 而失敗的入口點也查得到 prompt 大小
+            self.feature_status_model.record_prompt_tokens(entry_point.entry_id, estimate_text_tokens(prompt))
             
         agent = self.feature_analyzer_agent.get_agent(entry_point.name)
-        res = await Console(agent.run_stream(task=prompt), output_stats=True)
+        res = await run_agent_task(agent, prompt, self.stream_console)
         content =  res.messages[-1].content.model_dump()
         self.feature_analysis_model.insert(FeatureAnalysisEntity(**content))
-        
-    def _extract_file_ids(self, call_chain_analyze_result:CallChainResultEntity ) -> list[int]:
-        fids = set()
-        
-        fids.add(call_chain_analyze_result.file_id)
-        
-        for c in call_chain_analyze_result.call_chain:
-            fids.add(c.file_id)
-        
-        return list(fids)
\ No newline at end of file
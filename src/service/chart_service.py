@@ -2,17 +2,19 @@ import json
 from src.agent import GenerateChartAgent
 from src.entity import ChartEntity, EntryPointEntity
 from src.model import ChartModel, FeatureAnalysisModel
-from autogen_agentchat.ui import Console
+from src.utils import run_agent_task
 
 
 class ChartService:
     def __init__(self, 
             chart_model: ChartModel, 
             feature_analysis_model: FeatureAnalysisModel, 
-            generate_chart_agent: GenerateChartAgent):
+            generate_chart_agent: GenerateChartAgent,
+            stream_console: bool = True):
         self.chart_model = chart_model
         self.feature_analysis_model = feature_analysis_model
         self.generate_chart_agent = generate_chart_agent
+        self.stream_console = stream_console
         
     def has_cache(self, id: int) -> bool:
         return self.chart_model.is_exist(id)
@@ -25,7 +27,7 @@ class ChartService:
         agent = await self.generate_chart_agent.get_agent(feat.entry_func_name, feat.entry_component_name)
         # Convert dict to JSON string for agent
         prompt = json.dumps(feat.model_dump(exclude_none=True))
-        res = await Console(agent.run_stream(task=prompt), output_stats=True)
+        res = await run_agent_task(agent, prompt, self.stream_console)
         
         # Get the chart data from agent response
         chart_data = res.messages[-1].content
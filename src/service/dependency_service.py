@@ -1,5 +1,7 @@
-from src.entity import FuncMapEntity, DependencyEntity
-from src.model import DependencyModel, FuncMapModel
+from typing import Optional
+
+from src.entity import FuncMapEntity, DependencyEntity, ImplementationEntity
+from src.model import DependencyModel, FuncMapModel, ImplementationModel
 from src.analyzer.code_dependency_analyzer import CodeDependencyAnalyzer
 
 class DependencyService:
@@ -7,20 +9,31 @@ class DependencyService:
         dependency_model: DependencyModel, 
         func_map_model: FuncMapModel, 
         dep_analyzer: CodeDependencyAnalyzer,
+        implementation_model: ImplementationModel
         ):
         self.dependency_model = dependency_model
         self.dep_analyzer = dep_analyzer
         self.func_map_model = func_map_model
+        self.implementation_model = implementation_model
         
     def has_cache(self) -> bool:
         return self.dependency_model.has_data()
 
-    def analyze_dependencies(self) -> list[DependencyEntity]:
+    def _func_maps(self) -> list[FuncMapEntity]:
         func_maps = self.func_map_model.all()
         if not func_maps:
             raise ValueError("Function map is empty, cannot analyze dependencies.")
-        
-        return self.dep_analyzer.analyze_project(func_maps)
+        return func_maps
+
+    def analyze_implementations(self) -> list[ImplementationEntity]:
+        """interface → 實作組件的索引"""
+        return self.dep_analyzer.build_implementation_index(self._func_maps())
+
+    def analyze_dependencies(self, implementations: Optional[list[ImplementationEntity]] = None) -> list[DependencyEntity]:
+        return self.dep_analyzer.analyze_project(self._func_maps(), implementations)
     
-    def save_cache(self, dependencies: list[FuncMapEntity]) -> None:
-        self.dependency_model.batch_insert(dependencies)
\ No newline at end of file
+    def save_cache(self, dependencies: list[DependencyEntity], implementations: list[ImplementationEntity] = []) -> None:
+        self.dependency_model.batch_insert(dependencies)
+        self.dependency_model.build_index()
+        self.implementation_model.batch_insert(implementations)
+        self.implementation_model.build_index()
@@ -28,13 +28,17 @@ class EntryPointService:
     def save_cache(self, entry_points):
         self.entry_point_model.batch_insert(entry_points)
     
-    async def extract_entry_points(self, appoint_entries: Optional[list[str]] = None) -> list[EntryPointEntity]:
+    async def extract_entry_points(self, appoint_entries: Optional[list[str]] = None,
+                                   file_ids: Optional[set[int]] = None) -> list[EntryPointEntity]:
+        """file_ids 指定時只從這些檔案中找入口點（增量更新時的變動檔案）"""
         entry_points = None
         
         if appoint_entries:
             entry_points = self._extract_manually(appoint_entries)
+            if file_ids is not None:
+                entry_points = [ep for ep in entry_points if ep.file_id in file_ids]
         else:
-            entry_points = await self._extract_with_ai()
+            entry_points = await self._extract_with_ai(file_ids)
             
         return entry_points
     
@@ -73,9 +77,13 @@ class EntryPointService:
         return entries
     
     
-    async def _extract_with_ai(self) -> list[EntryPointEntity]:
+    async def _extract_with_ai(self, file_ids: Optional[set[int]] = None) -> list[EntryPointEntity]:
         # Get file function mappings
         func_map = self.file_function_map_model.list_by_type("class")
+        if file_ids is not None:
+            func_map = [entity for entity in func_map if entity.file_id in file_ids]
+        if not func_map:
+            return []
         # Collect file_ids from func_map
         file_ids = [entity.file_id for entity in func_map]
         dir_structure = self.source_code_model.list_structure_by_ids(file_ids)
@@ -83,7 +91,8 @@ class EntryPointService:
         # Convert entities to dict format and remove empty fields
         files_list = []
         for m in func_map:
-            data = m.model_dump(exclude_none=True)
+            # 方法範圍與雜湊只用於變動偵測與摘錄，不放進 prompt
+            data = m.model_dump(exclude_none=True, exclude={"methods", "member_hash", "span"})
             files_list.append(data)
         
         prompt = {
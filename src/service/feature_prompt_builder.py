@@ -0,0 +1,162 @@
+import json
+from typing import Optional
+
+from src.analyzer.call_chain_tracer import with_local_calls
+from src.entity import CallChainResultEntity, EntryPointEntity, FuncMapEntity, MethodSummaryEntity, SourceCodeEntity
+from src.model import FuncMapModel, SourceCodeModel
+from src.utils import class_outline, estimate_text_tokens, slice_span
+
+# 超出預算而整個省略的檔案仍保留 file_id / path，讓模型知道呼叫鏈經過哪些檔案
+OMITTED = "// omitted: over the prompt token budget"
+# 截斷入口點檔案時至少保留的字元數，不送出沒有入口點原始碼的 prompt
+ENTRY_MIN_CHARS = 1000
+
+
+class FeaturePromptBuilder:
+    """
+    組出 FeatureAnalyzerAgent 的輸入，只放呼叫鏈走訪到的方法
+
+    每個檔案只保留含有走訪方法的類別：欄位、屬性、建構子與走訪到的方法（含同組件內呼叫的方法）保留原文，
+    其餘方法以一行註解取代。沒有 func_map_model 或 func map 沒有範圍資訊時退回整個檔案。
+
+    token_budget > 0 時，估計的 prompt token 數超過預算會依優先順序縮減（入口點檔案 > 方法摘要 > 呼叫鏈方法 > 整個檔案）：
+    1. 先省略沒有範圍資訊、只能整個送出的檔案（從呼叫鏈尾端開始）
+    2. 呼叫鏈檔案從尾端開始去掉類別欄位與建構子，只留走訪到的方法；仍超過時再整個省略
+    3. 方法摘要從呼叫鏈尾端開始移除
+    4. 入口點檔案只留走訪到的方法，最後才截斷（至少保留 ENTRY_MIN_CHARS 個字元）
+    仍無法符合預算時照常回傳並輸出警告。
+    """
+
+    def __init__(self, source_code_model: SourceCodeModel, func_map_model: Optional[FuncMapModel] = None,
+                 token_budget: int = 0):
+        self.source_code_model = source_code_model
+        self.func_map_model = func_map_model
+        self.token_budget = token_budget
+
+    def traced_methods(self, call_chain: CallChainResultEntity) -> list[tuple[FuncMapEntity, str]]:
+        """呼叫鏈走訪到的方法（含同組件內呼叫的方法）與所屬的類別，依檔案在呼叫鏈中的順序與方法位置排序"""
+        file_ids, func_maps, traced = self._trace(call_chain)
+        methods = [
+            (entity, method) for fid, method in traced for entity in func_maps.get(fid, [])
+            if entity.type == "class" and method in entity.methods
+        ]
+        return sorted(methods, key=lambda item: (file_ids.index(item[0].file_id), item[0].methods[item[1]].start_byte))
+
+    def build(self, entry_point: EntryPointEntity, call_chain: CallChainResultEntity,
+              summaries: Optional[list[MethodSummaryEntity]] = None) -> dict:
+        """summaries 有值時（map-reduce）加上方法摘要；走訪到的方法都有摘要的檔案不再放原始碼，入口點檔案一律保留"""
+        file_ids, func_maps, traced = self._trace(call_chain)
+        sources = {source.file_id: source for source in self.source_code_model.find_by_id(file_ids)}
+        summarized = {(summary.file_id, summary.method) for summary in summaries or []}
+
+        contents = []
+        # 每個檔案由大到小的候選內容，縮減時往下一個換
+        renderings = []
+        for file_id in file_ids:
+            source = sources.get(file_id)
+            if source is None:
+                continue
+            methods = {method for fid, method in traced if fid == file_id}
+            if file_id != call_chain.file_id and summarized and all((file_id, m) in summarized for m in methods):
+                continue
+            renderings.append(self._renderings(source, func_maps.get(file_id, []), methods))
+            contents.append({"file_id": source.file_id, "path": source.path, "content": renderings[-1][0]})
+        prompt = {"func": entry_point.name, "contents": contents}
+        if summaries is not None:
+            prompt["method_summaries"] = [self._summary_item(summary, func_maps) for summary in summaries]
+
+        tokens = self.estimate(prompt)
+        summary = f"~{tokens} tokens"
+        if self.token_budget > 0 and tokens > self.token_budget:
+            tokens = self._fit(prompt, renderings)
+            summary = f"~{tokens} tokens after trimming to the {self.token_budget} token budget"
+        full = sum(len(source.content) for source in sources.values())
+        excerpt = sum(len(item["content"]) for item in contents)
+        print(f" > Feature prompt for {entry_point.component}.{entry_point.name}: {excerpt} of {full} chars, {summary}")
+        if self.token_budget > 0 and tokens > self.token_budget:
+            print(f" > Warning: feature prompt for {entry_point.component}.{entry_point.name} is ~{tokens} tokens, "
+                  f"still over the {self.token_budget} token budget after trimming")
+        return prompt
+
+    def _trace(self, call_chain: CallChainResultEntity) -> tuple[list[int], dict[int, list[FuncMapEntity]], set[tuple[int, str]]]:
+        """呼叫鏈經過的檔案（入口點檔案在最前面，其餘依呼叫鏈順序）、各檔案的 func map 與走訪到的 (file_id, method)"""
+        file_ids = list(dict.fromkeys([call_chain.file_id] + [node.file_id for node in call_chain.call_chain]))
+        func_maps = {}
+        if self.func_map_model is not None:
+            func_maps = {file_id: self.func_map_model.list_by_file(file_id) for file_id in file_ids}
+        traced = with_local_calls(
+            {(call_chain.file_id, call_chain.name)} | {(node.file_id, node.method) for node in call_chain.call_chain},
+            func_maps
+        )
+        return file_ids, func_maps, traced
+
+    def _summary_item(self, summary: MethodSummaryEntity, func_maps: dict[int, list[FuncMapEntity]]) -> dict:
+        """方法摘要加上檔案路徑與方法內的呼叫，讓模型能排出呼叫順序"""
+        entity = next((e for e in func_maps.get(summary.file_id, []) if e.ciname == summary.component), None)
+        return {
+            "file_id": summary.file_id,
+            "path": entity.path if entity else "",
+            "component": summary.component,
+            "method": summary.method,
+            "calls": [call.expr for call in entity.fcalls.get(summary.method, [])] if entity else [],
+            **summary.summary.model_dump()
+        }
+
+    def estimate(self, prompt: dict) -> int:
+        """估計 prompt 送出時（JSON 序列化後）的 token 數"""
+        return estimate_text_tokens(json.dumps(prompt))
+
+    def _fit(self, prompt: dict, renderings: list[list[str]]) -> int:
+        """依優先順序縮減檔案內容與方法摘要，直到估計的 token 數不超過預算，回傳最後的估計值（可能仍超過預算）"""
+        contents = prompt["contents"]
+        summaries = prompt.get("method_summaries", [])
+        whole = [i for i in range(1, len(contents)) if len(renderings[i]) == 1]
+        chain = [i for i in range(1, len(contents)) if len(renderings[i]) > 1]
+        steps = [lambda i=i: contents[i].update(content=OMITTED) for i in reversed(whole)]
+        steps += [lambda i=i: contents[i].update(content=renderings[i][1]) for i in reversed(chain)]
+        steps += [lambda i=i: contents[i].update(content=OMITTED) for i in reversed(chain)]
+        # 摘要依呼叫鏈順序排列，離入口點越遠的越先移除
+        steps += [summaries.pop for _ in summaries]
+        if contents and len(renderings[0]) > 1:
+            steps.append(lambda: contents[0].update(content=renderings[0][1]))
+
+        tokens = self.estimate(prompt)
+        for step in steps:
+            if tokens <= self.token_budget:
+                return tokens
+            step()
+            tokens = self.estimate(prompt)
+
+        # 只剩入口點檔案仍超過預算：依超出比例截斷，但至少保留 ENTRY_MIN_CHARS 個字元
+        if contents:
+            original = contents[0]["content"]
+            keep = len(original)
+            while tokens > self.token_budget and keep > ENTRY_MIN_CHARS:
+                keep = max(int(keep * self.token_budget / tokens * 0.9), ENTRY_MIN_CHARS)
+                contents[0]["content"] = original[:keep] + "\n// ... truncated"
+                tokens = self.estimate(prompt)
+        return tokens
+
+    def _renderings(self, source: SourceCodeEntity, entities: list[FuncMapEntity], methods: set[str]) -> list[str]:
+        """檔案的候選內容：[類別摘錄, 只有走訪到的方法]；有方法找不到範圍時只有 [整個檔案]"""
+        selected = [e for e in entities if e.type == "class" and e.span is not None and methods & e.methods.keys()]
+        covered = {name for e in entities if e.span is not None for name in e.methods}
+        if not selected or not methods <= covered:
+            return [source.content]
+
+        # 巢狀類別已包含在外層類別的摘錄中
+        outermost = [
+            e for e in selected
+            if not any(o is not e and o.span.start_byte <= e.span.start_byte and e.span.end_byte <= o.span.end_byte
+                       for o in selected)
+        ]
+        outline = "\n...\n".join(class_outline(source.content, entity, methods) for entity in outermost)
+        bodies = "\n...\n".join(
+            f"// {entity.ciname}\n" + "\n".join(
+                slice_span(source.content, info)
+                for _, info in sorted(((n, i) for n, i in entity.methods.items() if n in methods),
+                                      key=lambda item: item[1].start_byte)
+            )
+            for entity in selected
+        )
+        return [outline, bodies]
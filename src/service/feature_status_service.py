@@ -0,0 +1,96 @@
+from datetime import datetime
+from typing import Optional
+
+from src.entity import EntryPointEntity, FeatureStatusEntity
+from src.model import CallChainAnalysisModel, ChartModel, EntryPointModel, FeatureAnalysisModel, FeatureStatusModel
+from src.service.generate_documentation_service import GenerateDocumentationService
+
+# 每個入口點依序經過的階段
+PIPELINE_STAGES = ["call_chain", "feature", "chart", "doc"]
+
+
+class FeatureStatusService:
+    """
+    管理每個入口點在 pipeline 中的進度
+
+    reset() 讓所有入口點從頭開始；reconcile() 保留既有的狀態與 retry 次數，
+    並以各階段已存在的結果一次比對出每個入口點完成到哪個階段。
+    """
+
+    def __init__(self,
+            feature_status_model: FeatureStatusModel,
+            entry_point_model: EntryPointModel,
+            call_chain_analysis_model: CallChainAnalysisModel,
+            feature_analysis_model: FeatureAnalysisModel,
+            chart_model: ChartModel,
+            documentation_service: GenerateDocumentationService):
+        self.feature_status_model = feature_status_model
+        self.entry_point_model = entry_point_model
+        self.call_chain_analysis_model = call_chain_analysis_model
+        self.feature_analysis_model = feature_analysis_model
+        self.chart_model = chart_model
+        self.documentation_service = documentation_service
+
+    def reset(self) -> list[FeatureStatusEntity]:
+        """Drop existing progress and mark every entry point as pending"""
+        statuses = [
+            FeatureStatusEntity(id=ep.entry_id, component=ep.component, name=ep.name, state="pending")
+            for ep in self.entry_point_model.all()
+        ]
+        self.feature_status_model.replace_all(statuses)
+        return statuses
+
+    def reconcile(self) -> list[FeatureStatusEntity]:
+        """
+        Rebuild status rows from the stage outputs that already exist.
+
+        - running 狀態代表上次執行中斷，改回 pending
+        - retry_count、最後一次錯誤與排定的重試時間（next_attempt_at）保留
+        - 所有階段都有結果的入口點標記為 done
+        """
+        existing = {status.id: status for status in self.feature_status_model.all()}
+        call_chains = self.call_chain_analysis_model.keys()
+        features = self.feature_analysis_model.keys()
+        charts = self.chart_model.entry_ids()
+        docs = self.documentation_service.documented_names()
+
+        statuses = []
+        for ep in self.entry_point_model.all():
+            completed = {
+                "call_chain": (ep.component, ep.name) in call_chains,
+                "feature": (ep.component, ep.name) in features,
+                "chart": ep.entry_id in charts,
+                "doc": f"{ep.component}.{ep.name}" in docs,
+            }
+            completed_stages = [stage for stage in PIPELINE_STAGES if completed[stage]]
+
+            status = existing.get(ep.entry_id) or FeatureStatusEntity(
+                id=ep.entry_id, component=ep.component, name=ep.name, state="pending")
+            status.completed_stages = completed_stages
+            if len(completed_stages) == len(PIPELINE_STAGES):
+                status.state = "done"
+            elif status.state in ("running", "done"):
+                status.state = "pending"
+            statuses.append(status)
+
+        self.feature_status_model.replace_all(statuses)
+        return statuses
+
+    @staticmethod
+    def next_stage(status: FeatureStatusEntity) -> Optional[str]:
+        """First stage that has not completed yet, None when the entry point is done"""
+        for stage in PIPELINE_STAGES:
+            if stage not in status.completed_stages:
+                return stage
+        return None
+
+    @staticmethod
+    def start_delay(status: FeatureStatusEntity) -> float:
+        """Seconds until the retry scheduled by the previous run (next_attempt_at), 0 when it is due or unset"""
+        if not status.next_attempt_at:
+            return 0.0
+        try:
+            next_attempt_at = datetime.fromisoformat(status.next_attempt_at)
+        except ValueError:
+            return 0.0
+        return max((next_attempt_at - datetime.now()).total_seconds(), 0.0)
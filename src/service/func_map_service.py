@@ -1,47 +1,147 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from src.analyzer.func_map_cache import FuncMapCache
 from src.analyzer.language_analyze_provider import LanguageAnalyzeProvider
-from src.entity import FuncMapEntity
+from src.entity import FuncMapEntity, SourceCodeEntity
 from src.model import SourceCodeModel, FuncMapModel
 
 
+def analyze_sources(lang_provider: LanguageAnalyzeProvider, source_code_entities: list[SourceCodeEntity]) -> list[FuncMapEntity]:
+    func_map = []
+    for ent in source_code_entities:
+        if not ent.content:
+            continue
+        
+        lang_analyzer = lang_provider.get_analyzer_from_path(ent.path)
+        
+        if not lang_analyzer:
+            continue
+        
+        function_analysis_entities = lang_analyzer.analyze_file(ent)
+        # 只保留有意義的實體
+        meaningful_entities = [
+            function_analysis_entity for function_analysis_entity in function_analysis_entities 
+            if function_analysis_entity.funcs or function_analysis_entity.fcalls
+        ]
+        
+        func_map.extend(meaningful_entities)
+    
+    return func_map
+
+
+# worker process 內的 provider，由 initializer 建立一次（tree-sitter parser / 已編譯查詢不能跨 process 傳遞）
+_worker_provider: Optional[LanguageAnalyzeProvider] = None
+
+
+def _init_worker() -> None:
+    global _worker_provider
+    _worker_provider = LanguageAnalyzeProvider()
+
+
+def _analyze_batch(batch: list[SourceCodeEntity]) -> list[FuncMapEntity]:
+    return analyze_sources(_worker_provider, batch)
+
+
 class FuncMapService:
+    """
+    以 tree-sitter 分析原始碼，產生每個組件的方法與呼叫資訊
+
+    jobs > 1 時以 ProcessPoolExecutor 平行解析，每個 worker 處理 batch_size 個檔案，
+    結果依 file_id 排序後回傳，與 jobs=1 的序列處理結果相同（序列路徑保留作為除錯用）。
+    有 func_map_cache 時只解析內容（或分析器版本）有變動的檔案，其餘直接取用先前 run 的結果。
+    """
+    
     def __init__(self,
         file_function_map_model: FuncMapModel,
         source_code_model: SourceCodeModel,
         lang_provider: LanguageAnalyzeProvider,
+        jobs: int = 1,
+        batch_size: int = 200,
+        func_map_cache: Optional[FuncMapCache] = None
         ):
         self.file_function_map_model = file_function_map_model
         self.source_code_model = source_code_model
         self.lang_provider = lang_provider
+        # 0 表示使用所有 CPU
+        self.jobs = jobs if jobs > 0 else os.cpu_count() or 1
+        self.batch_size = max(batch_size, 1)
+        self.func_map_cache = func_map_cache
         
     def has_cache(self) -> bool:
         return self.file_function_map_model.has_data()
     
     def save_cache(self, func_map: list[FuncMapEntity]) -> None:
         self.file_function_map_model.batch_insert(func_map)
+        self.file_function_map_model.build_index()
     
-    def analyze_file(self) -> list[FuncMapEntity]:
+    def analyze_file(self, file_ids: Optional[set[int]] = None) -> list[FuncMapEntity]:
+        """解析原始碼；file_ids 指定時只解析這些檔案（增量更新）"""
         source_code_entities = self.source_code_model.all()
         
         if source_code_entities is None:
             raise ValueError("No source code data found for run_id")
 
-        func_map = []
+        source_code_entities = sorted(
+            (ent for ent in source_code_entities if ent.content and (file_ids is None or ent.file_id in file_ids)),
+            key=lambda ent: ent.file_id)
+        
+        start = time.perf_counter()
+        if self.func_map_cache is None:
+            func_map = self._analyze(source_code_entities)
+            parsed = len(source_code_entities)
+        else:
+            func_map, parsed = self._analyze_with_cache(source_code_entities)
+        print(f" > Parsed {parsed} of {len(source_code_entities)} files in {time.perf_counter() - start:.1f}s")
+        return func_map
+    
+    def _analyze_with_cache(self, source_code_entities: list[SourceCodeEntity]) -> tuple[list[FuncMapEntity], int]:
+        cache = self.func_map_cache
+        keys = {}
         for ent in source_code_entities:
-            if not ent.content:
-                continue
-            
             lang_analyzer = self.lang_provider.get_analyzer_from_path(ent.path)
-            
-            if not lang_analyzer:
-                continue
-            
-            function_analysis_entities = lang_analyzer.analyze_file(ent)
-            # 只保留有意義的實體
-            meaningful_entities = [
-                function_analysis_entity for function_analysis_entity in function_analysis_entities 
-                if function_analysis_entity.funcs or function_analysis_entity.fcalls
-            ]
-            
-            func_map.extend(meaningful_entities)
+            if lang_analyzer:
+                keys[ent.file_id] = cache.key(lang_analyzer, ent.content)
         
-        return func_map
+        cached = cache.get_many(list(keys.values()))
+        changed = [ent for ent in source_code_entities if ent.file_id in keys and keys[ent.file_id] not in cached]
+        analyzed = {ent.file_id: [] for ent in changed}
+        for entity in self._analyze(changed):
+            analyzed[entity.file_id].append(entity)
+        # 沒有產生實體的檔案也寫入（空列表），下次同樣直接命中
+        cache.put_many({keys[file_id]: entities for file_id, entities in analyzed.items()})
+        cache.prune()
+        cache.print_stats()
+        
+        func_map = []
+        for ent in source_code_entities:
+            if ent.file_id in analyzed:
+                func_map.extend(analyzed[ent.file_id])
+            elif ent.file_id in keys:
+                func_map.extend(cache.restore(cached[keys[ent.file_id]], ent))
+        return func_map, len(changed)
+    
+    def _analyze(self, source_code_entities: list[SourceCodeEntity]) -> list[FuncMapEntity]:
+        if self.jobs <= 1 or len(source_code_entities) <= self.batch_size:
+            return analyze_sources(self.lang_provider, source_code_entities)
+        return self._analyze_parallel(source_code_entities)
+    
+    def _analyze_parallel(self, source_code_entities: list[SourceCodeEntity]) -> list[FuncMapEntity]:
+        batches = [
+            source_code_entities[i:i + self.batch_size]
+            for i in range(0, len(source_code_entities), self.batch_size)
+        ]
+        workers = min(self.jobs, len(batches))
+        print(f" > Analyzing {len(source_code_entities)} files with {workers} processes")
+        
+        # spawn：主 process 已有 asyncio loop 與資料庫連線，不以 fork 複製
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        ) as executor:
+            # map() 依提交順序回傳，batch 已依 file_id 排序，因此結果順序固定
+            return [entity for batch in executor.map(_analyze_batch, batches) for entity in batch]
@@ -1,10 +1,11 @@
 import json
 from pathlib import Path
+from typing import Optional
 
 from src.agent import GenerateDocumentationAgent
 from src.entity import EntryPointEntity
 from src.model import FeatureAnalysisModel, ChartModel
-from autogen_agentchat.ui import Console
+from src.utils import run_agent_task
 
 
 class GenerateDocumentationService:
@@ -12,11 +13,13 @@ class GenerateDocumentationService:
             run_id: str,
             feature_analysis_model: FeatureAnalysisModel,
             chart_model: ChartModel,
-            generate_documentation_agent: GenerateDocumentationAgent):
+            generate_documentation_agent: GenerateDocumentationAgent,
+            stream_console: bool = True):
         self.run_id = run_id
         self.feature_analysis_model = feature_analysis_model
         self.chart_model = chart_model
         self.generate_documentation_agent = generate_documentation_agent
+        self.stream_console = stream_console
         self.output_dir = Path(f"output/{run_id}")
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -25,6 +28,10 @@ class GenerateDocumentationService:
         doc_file = self.output_dir / f"{entry_point.component}.{entry_point.name}.md"
         return doc_file.exists()
 
+    def documented_names(self) -> set[str]:
+        """All `component.name` pairs that already have a documentation file"""
+        return {path.stem for path in self.output_dir.glob("*.md")}
+
     async def generate_documentation(self, entry_point: EntryPointEntity) -> str:
         """Generate documentation for a specific entry point"""
         # Get feature analysis data
@@ -48,7 +55,7 @@ class GenerateDocumentationService:
             entry_point.component, entry_point.name)
         prompt_str = json.dumps(prompt_data, ensure_ascii=False)
         
-        res = await Console(agent.run_stream(task=prompt_str), output_stats=True)
+        res = await run_agent_task(agent, prompt_str, self.stream_console)
         documentation_content = res.messages[-1].content
         
         return documentation_content
@@ -68,6 +75,7 @@ class GenerateDocumentationService:
         content = await self.generate_documentation(entry_point)
         return self.save_documentation(entry_point, content)
 
-    def get_output_path(self, entry_point: EntryPointEntity) -> str:
-        """Get the output path for a specific entry point"""
-        return str(self.output_dir / f"{entry_point.component}.{entry_point.name}.md")
\ No newline at end of file
+    def get_output_path(self, entry_point: EntryPointEntity, run_id: Optional[str] = None) -> str:
+        """Get the output path for a specific entry point; run_id 指定時為該 run 的輸出路徑（增量更新沿用先前的文件）"""
+        output_dir = self.output_dir if run_id is None else self.output_dir.parent / run_id
+        return str(output_dir / f"{entry_point.component}.{entry_point.name}.md")
\ No newline at end of file
@@ -0,0 +1,218 @@
+import hashlib
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from src.analyzer.call_chain_tracer import with_local_calls
+from src.entity import DependencyEntity, EntryPointEntity, FuncMapEntity, SourceCodeEntity
+from src.model import CallChainAnalysisModel, ChartModel, DependencyModel, EntryPointModel, FeatureAnalysisModel, FuncMapModel, SourceCodeModel
+from src.service.generate_documentation_service import GenerateDocumentationService
+
+# 整個檔案都視為變動（刪除、新增或無法以方法比對的檔案）
+WHOLE_FILE = "*"
+
+
+class IncrementalService:
+    """
+    以先前的 run 為基準的增量更新（--incremental-from）
+
+    1. 路徑相同的檔案沿用先前的 file_id，讓入口點與呼叫鏈中的 file_id 在兩個 run 之間一致
+    2. 以內容雜湊比對出新增 / 修改 / 刪除的檔案，func map 只重新解析有變動的檔案
+    3. 呼叫鏈經過變動方法（或相依關係有變化的方法）的入口點重新執行 LLM 階段，其餘入口點的
+       呼叫鏈、功能分析、圖表與文件直接從先前的 run 複製
+    """
+
+    def __init__(self,
+            previous_run_id: str,
+            source_code_model: SourceCodeModel,
+            func_map_model: FuncMapModel,
+            dependency_model: DependencyModel,
+            entry_point_model: EntryPointModel,
+            call_chain_analysis_model: CallChainAnalysisModel,
+            feature_analysis_model: FeatureAnalysisModel,
+            chart_model: ChartModel,
+            documentation_service: GenerateDocumentationService):
+        self.previous_run_id = previous_run_id
+        self.previous_source_code_model = SourceCodeModel(previous_run_id)
+        if not self.previous_source_code_model.has_data():
+            raise ValueError(f"No source code cache found for previous run_id {previous_run_id}")
+        self.previous_func_map_model = FuncMapModel(previous_run_id)
+        self.previous_dependency_model = DependencyModel(previous_run_id)
+        self.previous_entry_point_model = EntryPointModel(previous_run_id)
+        self.previous_call_chain_analysis_model = CallChainAnalysisModel(previous_run_id)
+        self.previous_feature_analysis_model = FeatureAnalysisModel(previous_run_id)
+        self.previous_chart_model = ChartModel(previous_run_id)
+
+        self.source_code_model = source_code_model
+        self.func_map_model = func_map_model
+        self.dependency_model = dependency_model
+        self.entry_point_model = entry_point_model
+        self.call_chain_analysis_model = call_chain_analysis_model
+        self.feature_analysis_model = feature_analysis_model
+        self.chart_model = chart_model
+        self.documentation_service = documentation_service
+
+    def assign_stable_ids(self, source_code_entities: list[SourceCodeEntity]) -> list[SourceCodeEntity]:
+        """Reuse the previous run's file_id for every known path; new paths get ids after the previous maximum"""
+        previous_ids = self.previous_source_code_model.list_structure()
+        id_by_path = {path: file_id for file_id, path in previous_ids.items()}
+        next_id = max(previous_ids, default=-1) + 1
+        for ent in source_code_entities:
+            if ent.path in id_by_path:
+                ent.file_id = id_by_path[ent.path]
+            else:
+                ent.file_id = next_id
+                next_id += 1
+        return source_code_entities
+
+    def diff(self) -> tuple[set[int], set[int]]:
+        """(新增或修改的 file_id, 刪除的 file_id)，以目前 run 已儲存的原始碼與先前的 run 比對"""
+        previous = {ent.file_id: self._hash(ent) for ent in self.previous_source_code_model.all()}
+        current = {ent.file_id: self._hash(ent) for ent in self.source_code_model.all()}
+        changed = {file_id for file_id, digest in current.items() if previous.get(file_id) != digest}
+        removed = set(previous) - set(current)
+        return changed, removed
+
+    def _hash(self, ent: SourceCodeEntity) -> str:
+        return hashlib.sha256(f"{ent.path}\0{ent.content}".encode("utf-8")).hexdigest()
+
+    def previous_func_maps(self, exclude_file_ids: set[int]) -> list[FuncMapEntity]:
+        """先前 run 中未變動檔案的 func map"""
+        return [entity for entity in self.previous_func_map_model.all() if entity.file_id not in exclude_file_ids]
+
+    def _method_hashes(self, func_maps: list[FuncMapEntity], file_ids: set[int]) -> dict[int, Optional[dict[tuple[str, str], str]]]:
+        """{file_id: {(component, method): body_hash}}；先前版本的分析器沒有記錄方法雜湊時為 None"""
+        hashes = {}
+        for entity in func_maps:
+            if entity.file_id not in file_ids:
+                continue
+            file_hashes = hashes.setdefault(entity.file_id, {})
+            if file_hashes is None:
+                continue
+            if entity.funcs and not entity.methods:
+                hashes[entity.file_id] = None
+                continue
+            for method, info in entity.methods.items():
+                file_hashes[(entity.ciname, method)] = info.body_hash
+        return hashes
+
+    def _member_hashes(self, func_maps: list[FuncMapEntity], file_ids: set[int]) -> dict[int, dict[str, Optional[str]]]:
+        """{file_id: {component: member_hash}}；先前版本的分析器沒有記錄時為 None（與新的雜湊比對時視為變動）"""
+        hashes = {}
+        for entity in func_maps:
+            if entity.file_id in file_ids:
+                hashes.setdefault(entity.file_id, {})[entity.ciname] = entity.member_hash
+        return hashes
+
+    def _changed_methods(self, changed: set[int], removed: set[int]) -> set[tuple[int, str]]:
+        """內容有變動的 (file_id, method)；method 為 WHOLE_FILE 表示整個檔案都視為變動"""
+        dirty = {(file_id, WHOLE_FILE) for file_id in removed}
+        previous_func_maps, current_func_maps = self.previous_func_map_model.all(), self.func_map_model.all()
+        previous = self._method_hashes(previous_func_maps, changed)
+        current = self._method_hashes(current_func_maps, changed)
+        previous_members = self._member_hashes(previous_func_maps, changed)
+        current_members = self._member_hashes(current_func_maps, changed)
+        for file_id in changed:
+            before, after = previous.get(file_id), current.get(file_id)
+            if before is None or after is None:
+                # 新增的檔案，或無法比對方法雜湊
+                dirty.add((file_id, WHOLE_FILE))
+                continue
+            for key in set(before) | set(after):
+                if before.get(key) != after.get(key):
+                    dirty.add((file_id, key[1]))
+            # 欄位、常數、建構子等方法以外的內容有變動時，該組件的方法都視為變動
+            members_before, members_after = previous_members.get(file_id, {}), current_members.get(file_id, {})
+            for component in set(members_before) | set(members_after):
+                if members_before.get(component) != members_after.get(component):
+                    dirty.update((file_id, method) for c, method in set(before) | set(after) if c == component)
+        return dirty
+
+    def _dependency_changed_methods(self) -> set[tuple[int, str]]:
+        """相依關係有變化的呼叫端 (file_id, method)，例如呼叫的介面多了新的實作"""
+        def edges(deps: list[DependencyEntity]) -> dict[tuple[int, str], set[tuple]]:
+            by_caller = {}
+            for dep in deps:
+                by_caller.setdefault((dep.caller_file_id, dep.caller_func), set()).add(
+                    (dep.caller_entity, dep.call.expr, dep.callee_file_if, dep.callee_entity))
+            return by_caller
+
+        previous = edges(self.previous_dependency_model.all())
+        current = edges(self.dependency_model.all())
+        return {caller for caller in set(previous) | set(current) if previous.get(caller) != current.get(caller)}
+
+    def carry_forward(self) -> list[EntryPointEntity]:
+        """
+        Copy the previous run's entry points and, for entry points whose traced methods did not change,
+        their call chain / feature / chart / doc artifacts.
+
+        變動以方法為單位：入口點方法、呼叫鏈上的方法（含同組件內呼叫的方法）的內容或相依關係有變化時才重新分析。
+        入口點方法已不存在於目前 func map 的入口點捨棄；變動檔案中新增的入口點由 merge_entry_points() 加入。
+        回傳沿用的入口點；受影響的入口點沒有任何產出，之後由 reconcile() 排回 pipeline 重新分析。
+        """
+        changed, removed = self.diff()
+        changed_methods = self._changed_methods(changed, removed)
+        dependency_changed = self._dependency_changed_methods()
+        dirty = changed_methods | dependency_changed
+        func_maps = {}
+        for entity in self.func_map_model.all():
+            func_maps.setdefault(entity.file_id, []).append(entity)
+
+        previous_entry_points = self.previous_entry_point_model.all()
+        entry_points = [
+            ep for ep in previous_entry_points
+            if any(entity.ciname == ep.component and (ep.name in entity.methods or ep.name in entity.funcs)
+                   for entity in func_maps.get(ep.file_id, []))
+        ]
+        reused = 0
+        for ep in entry_points:
+            call_chain = self.previous_call_chain_analysis_model.find_by_component_and_entry(ep.component, ep.name)
+            if call_chain is None:
+                continue
+            traced = with_local_calls(
+                {(ep.file_id, ep.name)} | {(node.file_id, node.method) for node in call_chain.call_chain}, func_maps)
+            if any(node in dirty or (node[0], WHOLE_FILE) in dirty for node in traced):
+                continue
+
+            self.call_chain_analysis_model.insert(call_chain)
+            feature = self.previous_feature_analysis_model.get_by_component_and_entry(ep.component, ep.name)
+            if feature is None:
+                continue
+            self.feature_analysis_model.insert(feature)
+            chart = self.previous_chart_model.get(ep.entry_id)
+            if chart is None:
+                continue
+            self.chart_model.insert(chart)
+            doc_file = Path(self.documentation_service.get_output_path(ep, self.previous_run_id))
+            if doc_file.exists():
+                shutil.copyfile(doc_file, self.documentation_service.get_output_path(ep))
+                reused += 1
+
+        self.entry_point_model.batch_insert(entry_points)
+        print(
+            f"--- Incremental from {self.previous_run_id}: {len(changed)} changed / {len(removed)} removed files, "
+            f"{len(changed_methods)} changed methods, {len(dependency_changed)} callers with changed dependencies; "
+            f"reused {reused}/{len(entry_points)} entry points, dropped {len(previous_entry_points) - len(entry_points)} ---"
+        )
+        return entry_points
+
+    def merge_entry_points(self, detected: list[EntryPointEntity]) -> list[EntryPointEntity]:
+        """
+        Add entry points detected in the changed files that the previous run did not have.
+
+        沿用的入口點保留原本的 entry_id（圖表以 entry_id 對應），新的入口點編號接在最大值之後。
+        """
+        existing = self.entry_point_model.all()
+        known = {(ep.component, ep.name) for ep in existing}
+        next_id = max((ep.entry_id for ep in existing), default=0) + 1
+        added = []
+        for ep in detected:
+            if (ep.component, ep.name) in known:
+                continue
+            known.add((ep.component, ep.name))
+            added.append(ep.model_copy(update={"entry_id": next_id}))
+            next_id += 1
+        if added:
+            self.entry_point_model.batch_insert(added)
+        print(f" > {len(added)} new entry points in changed files")
+        return added
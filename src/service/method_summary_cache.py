@@ -0,0 +1,74 @@
+import json
+import os
+import time
+from typing import Optional
+
+from src.entity import FuncMapEntity, MethodSummaryEntity
+from src.storage.sqlite_storage import get_connection
+
+METHOD_SUMMARY_CACHE_FILE_NAME = "method_summary_cache.db"
+
+
+class MethodSummaryCache:
+    """
+    跨 run 共用的方法摘要快取，以「摘要範圍 + 檔案路徑 + 組件 + 方法 + body_hash + member_hash」為 key
+
+    file_id 屬於各 run，存入時移除、取出時換成目前 func map 的值，新的 run 與 --incremental-from 的 run
+    只摘要內容有變動或第一次出現的方法。scope 區分產生摘要的模型與輸出語言。
+    超過 ttl_days 未使用的紀錄在 prune() 時刪除。
+    """
+
+    def __init__(self, db_path: str, scope: str = "", ttl_days: float = 30):
+        self.db_path = db_path
+        self.scope = scope
+        self.ttl_seconds = ttl_days * 24 * 60 * 60
+        self.hits = 0
+        self.misses = 0
+        self.conn = get_connection(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS method_summary_cache ("
+            "key TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+        )
+
+    def key(self, entity: FuncMapEntity, method: str) -> str:
+        return json.dumps([
+            self.scope, entity.path, entity.ciname, method, entity.methods[method].body_hash, entity.member_hash
+        ])
+
+    def get(self, entity: FuncMapEntity, method: str, record_stats: bool = True) -> Optional[MethodSummaryEntity]:
+        """Look up the summary of a method whose body and class members are unchanged, restored with the current file_id"""
+        key = self.key(entity, method)
+        row = self.conn.execute("SELECT summary FROM method_summary_cache WHERE key = ?", (key,)).fetchone()
+        if record_stats:
+            self.hits += row is not None
+            self.misses += row is None
+        if row is None:
+            return None
+        self.conn.execute("UPDATE method_summary_cache SET last_used_at = ? WHERE key = ?", (time.time(), key))
+        return MethodSummaryEntity(**json.loads(row[0]), file_id=entity.file_id)
+
+    def put(self, entity: FuncMapEntity, summary: MethodSummaryEntity) -> None:
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO method_summary_cache (key, summary, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+            (self.key(entity, summary.method), json.dumps(summary.model_dump(exclude={"file_id"})), now, now)
+        )
+
+    def prune(self) -> int:
+        cursor = self.conn.execute(
+            "DELETE FROM method_summary_cache WHERE last_used_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM method_summary_cache").fetchone()[0]
+
+    def print_stats(self) -> None:
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0.0
+        print(f"--- Method summary cache: hits={self.hits} misses={self.misses} ({hit_rate:.1f}% hit) entries={len(self)} ---")
+
+
+def open_method_summary_cache(cache_path: str, scope: str = "", ttl_days: float = 30) -> MethodSummaryCache:
+    """快取放在 cache 目錄根部，所有 run_id 共用"""
+    return MethodSummaryCache(os.path.join(cache_path, METHOD_SUMMARY_CACHE_FILE_NAME), scope, ttl_days)
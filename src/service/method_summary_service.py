@@ -0,0 +1,93 @@
+import asyncio
+import json
+from typing import Optional
+
+from src.agent.method_summary_agent import MethodSummaryAgent
+from src.analyzer.dependency_graph import DependencyGraph
+from src.entity import FuncMapEntity, MethodSummaryEntity
+from src.model import SourceCodeModel
+from src.service.method_summary_cache import MethodSummaryCache
+from src.utils import class_outline, run_agent_task, slice_span
+
+
+class MethodSummaryService:
+    """
+    功能分析的 map 階段：為呼叫鏈上的方法產生可重複使用的摘要（角色、讀寫的資料表、外部 API）
+
+    摘要存在跨 run 共用的 MethodSummaryCache（以路徑、組件、方法、body_hash、member_hash 為 key），
+    同一個方法不論出現在多少入口點、多少個 run 的呼叫鏈中只摘要一次，方法內容或類別的欄位 / 建構子變動後才重新摘要；
+    多個入口點同時需要同一個方法時共用同一個進行中的請求。
+    """
+
+    def __init__(self,
+            method_summary_cache: MethodSummaryCache,
+            source_code_model: SourceCodeModel,
+            method_summary_agent: MethodSummaryAgent,
+            dependency_graph: Optional[DependencyGraph] = None,
+            max_concurrency: int = 1):
+        """
+        dependency_graph 有值時依呼叫圖由葉節點往上送出摘要請求，被共用的 repository / client 方法先完成；
+        max_concurrency 為所有入口點合計同時進行的摘要請求上限，請求依送出順序取得名額
+        """
+        self.method_summary_cache = method_summary_cache
+        self.source_code_model = source_code_model
+        self.method_summary_agent = method_summary_agent
+        self.dependency_graph = dependency_graph
+        self.max_concurrency = max(max_concurrency, 1)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending: dict[str, asyncio.Future] = {}
+
+    async def summarize(self, label: str, methods: list[tuple[FuncMapEntity, str]]) -> list[MethodSummaryEntity]:
+        """取得每個方法的摘要，沒有快取的才送給 MethodSummaryAgent；回傳順序與 methods 相同"""
+        keys = [self.method_summary_cache.key(entity, method) for entity, method in methods]
+        summaries = {key: self.method_summary_cache.get(entity, method) for (entity, method), key in zip(methods, keys)}
+        missing = {key: (entity, method) for (entity, method), key in zip(methods, keys) if summaries[key] is None}
+        print(f" > Method summaries for {label}: {len(summaries) - len(missing)} cached, {len(missing)} to summarize")
+        if self.dependency_graph is not None:
+            missing = dict(sorted(missing.items(), key=lambda item: self.dependency_graph.order_key(
+                (item[1][0].file_id, item[1][0].ciname, item[1][1]))))
+
+        results = await asyncio.gather(*(self._summary(key, entity, method) for key, (entity, method) in missing.items()))
+        summaries.update(zip(missing, results))
+        return [summaries[key] for key in keys]
+
+    async def _summary(self, key: str, entity: FuncMapEntity, method: str) -> MethodSummaryEntity:
+        future = self._pending.get(key)
+        if future is None:
+            # 另一個入口點可能在查詢快取之後才完成同一個方法的摘要
+            existing = self.method_summary_cache.get(entity, method, record_stats=False)
+            if existing is not None:
+                return existing
+            future = asyncio.ensure_future(self._summarize(entity, method))
+            self._pending[key] = future
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await future
+
+    async def _summarize(self, entity: FuncMapEntity, method: str) -> MethodSummaryEntity:
+        info = entity.methods[method]
+        content = self.source_code_model.get_content_by_id(entity.file_id)
+        # 保留欄位與建構子，讓模型看得到 DbContext、HttpClient 等注入的相依
+        source = class_outline(content, entity, {method}) or slice_span(content, info)
+        prompt = json.dumps({
+            "component": entity.ciname,
+            "method": method,
+            "path": entity.path,
+            "source": source,
+            "calls": [call.expr for call in entity.fcalls.get(method, [])]
+        }, ensure_ascii=False)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            agent = self.method_summary_agent.get_agent(method)
+            res = await run_agent_task(agent, prompt, stream=False)
+        summary = MethodSummaryEntity(
+            file_id=entity.file_id,
+            component=entity.ciname,
+            method=method,
+            body_hash=info.body_hash,
+            member_hash=entity.member_hash,
+            summary=res.messages[-1].content
+        )
+        self.method_summary_cache.put(entity, summary)
+        return summary
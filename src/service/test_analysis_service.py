@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+from src.analyzer.call_chain_tracer import CallChainTracer, CallSite
+from src.analyzer.csharp_analyzer import CSharpAnalyzer
+from src.entity import FuncCallEntity, SourceCodeEntity
+from src.model import FuncMapModel
+from src.service.analysis_service import AnalysisService
+from src.storage import close_all
+
+SOURCE = SourceCodeEntity(file_id=1, path="src/UserController.cs", content="""public class UserController {
+private readonly IUserService _userService;
+// Get(...) 在註解中出現不影響摘錄
+public User Get(int id) { return _userService.GetUser(id); }
+public void Delete(int id) { _userService.Remove(id); }
+}""")
+
+
+class TestMethodExcerpt(TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        os.environ["CACHE_PATH"] = self.test_dir
+        self.func_map_model = FuncMapModel("excerpt")
+        self.func_map_model.batch_insert(CSharpAnalyzer().analyze_file(SOURCE))
+        self.service = AnalysisService(
+            None, None, None, None, None, None, None,
+            call_chain_tracer=CallChainTracer(self.func_map_model, None))
+
+    def tearDown(self):
+        close_all()
+        os.environ.pop("CACHE_PATH", None)
+        shutil.rmtree(self.test_dir)
+
+    def test_excerpt_keeps_fields_and_calling_method_only(self):
+        site = CallSite(file_id=1, component="UserController", method="Delete",
+                        call=FuncCallEntity(method="Remove", expr="_userService.Remove(id)"))
+
+        excerpt = self.service._method_excerpt(site, SOURCE.content)
+
+        self.assertIn("private readonly IUserService _userService;", excerpt)
+        self.assertIn("public void Delete(int id) { _userService.Remove(id); }", excerpt)
+        self.assertIn("// Get(...) omitted", excerpt)
+        self.assertNotIn("GetUser", excerpt)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+from src.analyzer.csharp_analyzer import CSharpAnalyzer
+from src.entity import CallChainResultEntity, EntryPointEntity, MethodSummary, MethodSummaryEntity, SourceCodeEntity
+from src.entity.call_chain_result_entity import CallNode
+from src.model import FuncMapModel, SourceCodeModel
+from src.service.feature_prompt_builder import OMITTED, FeaturePromptBuilder
+from src.storage import close_all
+
+SOURCES = [
+    SourceCodeEntity(file_id=1, path="src/UserController.cs", content="""public class UserController {
+private readonly IUserService _userService;
+public UserController(IUserService userService) { _userService = userService; }
+[HttpGet("{id}")]
+public User Get(int id) { return _userService.GetUser(id); }
+public void Delete(int id) { _userService.Remove(id); }
+}"""),
+    SourceCodeEntity(file_id=2, path="src/UserService.cs", content="""public class UserService : IUserService {
+private readonly UserRepository _repo;
+public User GetUser(int id) { return Load(id); }
+private User Load(int id) { return _repo.Find(id); }
+public void Remove(int id) { _repo.Delete(id); }
+public void Rename(int id) { _repo.Update(id); }
+}"""),
+    SourceCodeEntity(file_id=3, path="src/Legacy.cs", content="public class Legacy { public void Run() { } }"),
+]
+
+
+class TestFeaturePromptBuilder(TestCase):
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        os.environ["CACHE_PATH"] = self.test_dir
+        self.source_code_model = SourceCodeModel("prompt")
+        self.source_code_model.batch_insert(SOURCES)
+        self.func_map_model = FuncMapModel("prompt")
+        analyzer = CSharpAnalyzer()
+        func_maps = [e for source in SOURCES for e in analyzer.analyze_file(source)]
+        # 模擬舊版分析器的資料：沒有範圍資訊
+        for entity in func_maps:
+            if entity.file_id == 3:
+                entity.span = None
+        self.func_map_model.batch_insert(func_maps)
+        self.entry = EntryPointEntity(entry_id=1, file_id=1, component="UserController", name="Get")
+    
+    def tearDown(self):
+        close_all()
+        os.environ.pop("CACHE_PATH", None)
+        shutil.rmtree(self.test_dir)
+    
+    def build(self, func_map_model, nodes, token_budget=0, summaries=None):
+        call_chain = CallChainResultEntity(
+            file_id=1, name="Get", component="UserController", stop_reason="done",
+            call_chain=[CallNode(file_id=file_id, method=method, reason="") for file_id, method in nodes]
+        )
+        builder = FeaturePromptBuilder(self.source_code_model, func_map_model, token_budget)
+        prompt = builder.build(self.entry, call_chain, summaries)
+        self.tokens = builder.estimate(prompt)
+        self.summaries = [item["method"] for item in prompt.get("method_summaries", [])]
+        return {item["file_id"]: item["content"] for item in prompt["contents"]}
+    
+    def test_keeps_traced_methods_local_callees_and_class_members(self):
+        contents = self.build(self.func_map_model, [(2, "GetUser"), (3, "Run")])
+        
+        self.assertEqual(list(contents), [1, 2, 3])
+        self.assertIn("private readonly IUserService _userService;", contents[1])
+        self.assertIn("public UserController(IUserService userService)", contents[1])
+        self.assertIn('[HttpGet("{id}")]', contents[1])
+        self.assertIn("// Delete(...) omitted", contents[1])
+        # Load 是同組件內的呼叫，不在呼叫鏈節點中但仍要保留
+        self.assertIn("private User Load(int id) { return _repo.Find(id); }", contents[2])
+        self.assertIn("// Remove(...) omitted", contents[2])
+        self.assertIn("// Rename(...) omitted", contents[2])
+        self.assertNotIn("_repo.Update", contents[2])
+        # 沒有範圍資訊時退回整個檔案
+        self.assertEqual(contents[3], SOURCES[2].content)
+    
+    def test_whole_files_without_func_map_model(self):
+        contents = self.build(None, [(2, "GetUser")])
+        self.assertEqual(contents, {1: SOURCES[0].content, 2: SOURCES[1].content})
+    
+    def test_budget_trims_whole_files_then_chain_then_entry(self):
+        nodes = [(2, "GetUser"), (3, "Run")]
+        untrimmed = self.build(self.func_map_model, nodes)
+        full_tokens = self.tokens
+        
+        # 只超出一點：先省略只能整個送出的檔案，其餘不變
+        contents = self.build(self.func_map_model, nodes, full_tokens - 1)
+        self.assertEqual(contents[3], OMITTED)
+        self.assertEqual((contents[1], contents[2]), (untrimmed[1], untrimmed[2]))
+        
+        # 呼叫鏈檔案去掉欄位只留走訪到的方法，入口點檔案維持類別摘錄
+        contents = self.build(self.func_map_model, nodes, full_tokens - 30)
+        self.assertLessEqual(self.tokens, full_tokens - 30)
+        self.assertEqual(contents[1], untrimmed[1])
+        self.assertEqual(contents[2], "// UserService\npublic User GetUser(int id) { return Load(id); }\n"
+                                      "private User Load(int id) { return _repo.Find(id); }")
+        
+        # 預算極小時入口點檔案只留走訪到的方法，不會截到沒有原始碼；仍超過預算時照常回傳
+        contents = self.build(self.func_map_model, nodes, 80)
+        self.assertGreater(self.tokens, 80)
+        self.assertEqual((contents[2], contents[3]), (OMITTED, OMITTED))
+        self.assertEqual(contents[1], '// UserController\n[HttpGet("{id}")]\n'
+                                      'public User Get(int id) { return _userService.GetUser(id); }')
+    
+    def test_budget_drops_summaries_from_the_tail_before_the_entry_file(self):
+        summaries = [
+            MethodSummaryEntity(file_id=2, component="UserService", method=method, body_hash="",
+                                summary=MethodSummary(role="service", desc=f"{method} " + "detail " * 20))
+            for method in ("GetUser", "Load")
+        ]
+        untrimmed = self.build(self.func_map_model, [(2, "GetUser")], summaries=summaries)
+        full_tokens = self.tokens
+        
+        contents = self.build(self.func_map_model, [(2, "GetUser")], full_tokens - 1, summaries)
+        self.assertEqual(self.summaries, ["GetUser"])
+        self.assertEqual(contents, untrimmed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+from src.analyzer.func_map_cache import open_func_map_cache
+from src.analyzer.language_analyze_provider import LanguageAnalyzeProvider
+from src.entity import SourceCodeEntity
+from src.model import FuncMapModel, SourceCodeModel
+from src.service.func_map_service import FuncMapService
+from src.storage import close_all
+
+
+def source(file_id):
+    return SourceCodeEntity(file_id=file_id, path=f"src/Service{file_id}.cs", content=f"""
+    public class Service{file_id} : IService{file_id} {{
+        private readonly IRepo _repo;
+        public void Run(int id) {{ _repo.Load(id); Helper(); }}
+    }}
+    public interface IService{file_id} {{ void Run(int id); }}
+    """)
+
+
+class TestFuncMapService(TestCase):
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        os.environ["CACHE_PATH"] = self.test_dir
+        self.source_code_model = SourceCodeModel("funcs")
+        # 依非 file_id 順序寫入，確認結果仍依 file_id 排序
+        self.source_code_model.batch_insert([source(i) for i in (5, 3, 9, 1, 7, 2, 8, 4, 6, 0)])
+        self.source_code_model.batch_insert([SourceCodeEntity(file_id=10, path="README.md", content="# docs")])
+    
+    def tearDown(self):
+        close_all()
+        os.environ.pop("CACHE_PATH", None)
+        shutil.rmtree(self.test_dir)
+    
+    def analyze(self, jobs, func_map_cache=None, source_code_model=None):
+        service = FuncMapService(FuncMapModel("funcs"), source_code_model or self.source_code_model,
+                                 LanguageAnalyzeProvider(), jobs, batch_size=3, func_map_cache=func_map_cache)
+        return [entity.model_dump() for entity in service.analyze_file()]
+    
+    def test_parallel_matches_serial_in_file_id_order(self):
+        serial = self.analyze(jobs=1)
+        self.assertEqual([e["file_id"] for e in serial], [i for i in range(10) for _ in range(2)])
+        self.assertEqual(self.analyze(jobs=2), serial)
+    
+    def test_cache_reuses_unchanged_files_across_runs(self):
+        cache = open_func_map_cache(self.test_dir)
+        first = self.analyze(jobs=1, func_map_cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (0, 10))
+        
+        # 下一個 run：file_id 重新編號、只有一個檔案內容改變
+        next_run = SourceCodeModel("next")
+        changed = source(3)
+        changed.content = changed.content.replace("Helper();", "Helper(); _repo.Save(id);")
+        next_run.batch_insert([
+            SourceCodeEntity(file_id=i + 100, path=s.path, content=s.content)
+            for i, s in enumerate(changed if n == 3 else source(n) for n in range(10))
+        ])
+        second = self.analyze(jobs=1, func_map_cache=cache, source_code_model=next_run)
+        self.assertEqual((cache.hits, cache.misses), (9, 11))
+        
+        self.assertEqual([e["file_id"] for e in second], [i + 100 for i in range(10) for _ in range(2)])
+        self.assertEqual(second[0]["fcalls"], first[0]["fcalls"])
+        self.assertEqual([c["method"] for c in second[6]["fcalls"]["Run"]], ["Load", "Save", "Helper"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+from src.analyzer.csharp_analyzer import CSharpAnalyzer
+from src.entity import CallChainResultEntity, ChartEntity, EntryPointEntity, FeatureAnalysisEntity, SourceCodeEntity
+from src.entity.call_chain_result_entity import CallNode
+from src.model import CallChainAnalysisModel, ChartModel, DependencyModel, EntryPointModel, FeatureAnalysisModel, FuncMapModel, SourceCodeModel
+from src.service.generate_documentation_service import GenerateDocumentationService
+from src.service.incremental_service import IncrementalService
+from src.storage import close_all
+
+FILES = {
+    "OrderController.cs": "public class OrderController { public void Get() { _orders.Load(); } }",
+    "UserController.cs": "public class UserController { public void Get() { _users.Find(); } }",
+    "OrderService.cs": "public class OrderService { public void Load() { _db.Query(); Check(); } "
+                       "void Check() { _rules.Apply(); } public void Export() { _csv.Write(); } }",
+    "UserService.cs": "public class UserService { public void Find() { _db.Query(); } }",
+}
+
+
+class RunModels:
+    def __init__(self, run_id):
+        self.source_code_model = SourceCodeModel(run_id)
+        self.func_map_model = FuncMapModel(run_id)
+        self.dependency_model = DependencyModel(run_id)
+        self.entry_point_model = EntryPointModel(run_id)
+        self.call_chain_analysis_model = CallChainAnalysisModel(run_id)
+        self.feature_analysis_model = FeatureAnalysisModel(run_id)
+        self.chart_model = ChartModel(run_id)
+        self.documentation_service = GenerateDocumentationService(
+            run_id, self.feature_analysis_model, self.chart_model, None)
+
+
+class TestIncrementalService(TestCase):
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.test_dir)
+        os.environ["CACHE_PATH"] = os.path.join(self.test_dir, "cache")
+        
+        previous = RunModels("prev")
+        sources = [SourceCodeEntity(file_id=i, path=path, content=content) for i, (path, content) in enumerate(FILES.items())]
+        previous.source_code_model.batch_insert(sources)
+        previous.func_map_model.batch_insert(self.func_maps(sources))
+        previous.entry_point_model.batch_insert([
+            EntryPointEntity(entry_id=1, file_id=0, component="OrderController", name="Get"),
+            EntryPointEntity(entry_id=2, file_id=1, component="UserController", name="Get"),
+        ])
+        for entry_id, file_id, component, callee, method in ((1, 0, "OrderController", 2, "Load"), (2, 1, "UserController", 3, "Find")):
+            previous.call_chain_analysis_model.insert(CallChainResultEntity(
+                file_id=file_id, name="Get", component=component, stop_reason="done",
+                call_chain=[CallNode(file_id=callee, method=method, reason="")]
+            ))
+            previous.feature_analysis_model.insert(FeatureAnalysisEntity(entry_func_name="Get", entry_component_name=component))
+            previous.chart_model.insert(ChartEntity(entry_id=entry_id, mermaid_flow_chart="graph TD"))
+            previous.documentation_service.save_documentation(
+                EntryPointEntity(entry_id=entry_id, file_id=file_id, component=component, name="Get"), "# doc")
+        self.current = RunModels("next")
+        self.service = IncrementalService("prev", **vars(self.current))
+    
+    def tearDown(self):
+        close_all()
+        os.chdir(self.cwd)
+        os.environ.pop("CACHE_PATH", None)
+        shutil.rmtree(self.test_dir)
+    
+    def func_maps(self, sources):
+        analyzer = CSharpAnalyzer()
+        return [entity for source in sources for entity in analyzer.analyze_file(source)]
+    
+    def crawl(self, files):
+        crawled = [SourceCodeEntity(file_id=i, path=path, content=content) for i, (path, content) in enumerate(files.items())]
+        crawled = self.service.assign_stable_ids(crawled)
+        self.current.source_code_model.batch_insert(crawled)
+        self.current.func_map_model.batch_insert(self.func_maps(crawled))
+    
+    def reused(self, files):
+        self.crawl(files)
+        self.service.carry_forward()
+        return self.current.call_chain_analysis_model.keys()
+    
+    def test_stable_ids_and_diff(self):
+        files = {"New.cs": "public class New {}", **FILES, "UserService.cs": "public class UserService { }"}
+        del files["OrderController.cs"]
+        self.crawl(files)
+        
+        self.assertEqual(self.current.source_code_model.list_structure(), {
+            4: "New.cs", 1: "UserController.cs", 2: "OrderService.cs", 3: "UserService.cs"
+        })
+        self.assertEqual(self.service.diff(), ({3, 4}, {0}))
+    
+    def test_carry_forward_reuses_only_unaffected_entries(self):
+        self.crawl({**FILES, "UserService.cs": "public class UserService { public void Find() { _db.Save(); } }"})
+        
+        entries = self.service.carry_forward()
+        
+        self.assertEqual([ep.entry_id for ep in entries], [1, 2])
+        self.assertEqual(self.current.call_chain_analysis_model.keys(), {("OrderController", "Get")})
+        self.assertEqual(self.current.feature_analysis_model.keys(), {("OrderController", "Get")})
+        self.assertEqual(self.current.chart_model.entry_ids(), {1})
+        self.assertEqual(self.current.documentation_service.documented_names(), {"OrderController.Get"})
+    
+    def test_unrelated_method_change_keeps_entry(self):
+        files = {**FILES, "OrderService.cs": FILES["OrderService.cs"].replace("_csv.Write()", "_csv.Flush()")}
+        self.assertEqual(self.reused(files), {("OrderController", "Get"), ("UserController", "Get")})
+    
+    def test_field_or_constructor_change_invalidates_entries_using_the_component(self):
+        files = {**FILES, "OrderService.cs": FILES["OrderService.cs"].replace(
+            "{ public void Load()", "{ private const decimal Rate = 0.10m; public OrderService() { Init(); } public void Load()")}
+        self.assertEqual(self.reused(files), {("UserController", "Get")})
+    
+    def test_change_in_same_component_callee_invalidates_entry(self):
+        files = {**FILES, "OrderService.cs": FILES["OrderService.cs"].replace("_rules.Apply()", "_rules.Skip()")}
+        self.assertEqual(self.reused(files), {("UserController", "Get")})
+
+    
+    def test_entry_point_removed_from_file_is_dropped(self):
+        self.crawl({**FILES, "UserController.cs": "public class UserController { public void List() { _users.All(); } }"})
+        
+        entries = self.service.carry_forward()
+        
+        self.assertEqual([ep.entry_id for ep in entries], [1])
+        self.assertEqual([ep.entry_id for ep in self.current.entry_point_model.all()], [1])
+    
+    def test_merge_entry_points_from_changed_files(self):
+        self.crawl({**FILES, "UserController.cs": FILES["UserController.cs"].replace(
+            "} }", "} public void List() { _users.All(); } }")})
+        self.service.carry_forward()
+        
+        added = self.service.merge_entry_points([
+            EntryPointEntity(entry_id=1, file_id=1, component="UserController", name="Get"),
+            EntryPointEntity(entry_id=2, file_id=1, component="UserController", name="List"),
+        ])
+        
+        self.assertEqual([(ep.entry_id, ep.name) for ep in added], [(3, "List")])
+        self.assertEqual(
+            [(ep.entry_id, ep.component, ep.name) for ep in self.current.entry_point_model.all()],
+            [(1, "OrderController", "Get"), (2, "UserController", "Get"), (3, "UserController", "List")]
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase, main
+
+from src.analyzer.csharp_analyzer import CSharpAnalyzer
+from src.analyzer.dependency_graph import DependencyGraph
+from src.entity import CallChainResultEntity, DependencyEntity, EntryPointEntity, FuncCallEntity, MethodSummary, SourceCodeEntity
+from src.entity.call_chain_result_entity import CallNode
+from src.model import FuncMapModel, SourceCodeModel
+from src.service.feature_prompt_builder import FeaturePromptBuilder
+from src.service.method_summary_cache import open_method_summary_cache
+from src.service.method_summary_service import MethodSummaryService
+from src.storage import close_all
+
+SOURCES = [
+    SourceCodeEntity(file_id=1, path="src/UserController.cs", content="""public class UserController {
+private readonly UserService _userService;
+public User Get(int id) { return _userService.GetUser(id); }
+}"""),
+    SourceCodeEntity(file_id=2, path="src/UserService.cs", content="""public class UserService {
+private readonly AppDbContext _db;
+public User GetUser(int id) { return Load(id); }
+private User Load(int id) { return _db.Users.Find(id); }
+}"""),
+]
+
+
+class FakeSummaryAgent:
+    """以方法名稱產生摘要並記錄被要求摘要的方法"""
+    
+    def __init__(self):
+        self.prompts = []
+        self.running = 0
+        self.max_running = 0
+    
+    def get_agent(self, func_name):
+        async def run(task):
+            self.prompts.append(task)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            await asyncio.sleep(0.01)
+            self.running -= 1
+            summary = MethodSummary(role="service", desc=f"{func_name} summary")
+            return SimpleNamespace(messages=[SimpleNamespace(content=summary)])
+        return SimpleNamespace(run=run)
+
+
+class TestMethodSummaryService(IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        os.environ["CACHE_PATH"] = self.test_dir
+        self.source_code_model = SourceCodeModel("summary")
+        self.source_code_model.batch_insert(SOURCES)
+        self.func_map_model = FuncMapModel("summary")
+        self.func_map_model.batch_insert([e for source in SOURCES for e in CSharpAnalyzer().analyze_file(source)])
+        self.agent = FakeSummaryAgent()
+        self.service = MethodSummaryService(open_method_summary_cache(self.test_dir), self.source_code_model, self.agent)
+        self.builder = FeaturePromptBuilder(self.source_code_model, self.func_map_model)
+        self.call_chain = CallChainResultEntity(
+            file_id=1, name="Get", component="UserController", stop_reason="done",
+            call_chain=[CallNode(file_id=2, method="GetUser", reason="")]
+        )
+    
+    def tearDown(self):
+        close_all()
+        os.environ.pop("CACHE_PATH", None)
+        shutil.rmtree(self.test_dir)
+    
+    def chain_methods(self):
+        return [(e, m) for e, m in self.builder.traced_methods(self.call_chain) if e.file_id != 1]
+    
+    async def test_summarizes_each_method_once_across_entries(self):
+        methods = self.chain_methods()
+        self.assertEqual([(e.ciname, m) for e, m in methods], [("UserService", "GetUser"), ("UserService", "Load")])
+        
+        # 兩個入口點同時需要同一組方法時共用進行中的請求
+        first, second = await asyncio.gather(
+            self.service.summarize("A.Get", methods), self.service.summarize("B.Get", methods))
+        self.assertEqual(len(self.agent.prompts), 2)
+        self.assertEqual([s.summary.desc for s in first], ["GetUser summary", "Load summary"])
+        self.assertEqual(first, second)
+        self.assertIn("private readonly AppDbContext _db;", self.agent.prompts[1])
+        
+        await self.service.summarize("C.Get", methods)
+        self.assertEqual(len(self.agent.prompts), 2)
+    
+    async def test_requests_are_limited_and_sent_leaf_first(self):
+        graph = DependencyGraph()
+        graph.add_dependencies([DependencyEntity(
+            caller_file_id=2, caller_entity="UserService", caller_func="GetUser",
+            callee_file_if=2, callee_entity="UserService", call=FuncCallEntity(method="Load", expr="Load(id)"))])
+        service = MethodSummaryService(
+            open_method_summary_cache(self.test_dir), self.source_code_model, self.agent, graph, max_concurrency=1)
+        
+        await asyncio.gather(service.summarize("A.Get", self.chain_methods()), service.summarize("B.Get", self.chain_methods()))
+        
+        self.assertEqual(self.agent.max_running, 1)
+        self.assertEqual([json.loads(prompt)["method"] for prompt in self.agent.prompts], ["Load", "GetUser"])
+    
+    async def test_next_run_reuses_summaries_without_calling_the_agent(self):
+        await self.service.summarize("A.Get", self.chain_methods())
+        self.assertEqual(len(self.agent.prompts), 2)
+        
+        # 下一個 run：新的 run_id 與不同的 file_id，路徑與方法內容相同
+        sources = [source.model_copy(update={"file_id": source.file_id + 10}) for source in SOURCES]
+        source_code_model = SourceCodeModel("next")
+        source_code_model.batch_insert(sources)
+        func_map_model = FuncMapModel("next")
+        func_map_model.batch_insert([e for source in sources for e in CSharpAnalyzer().analyze_file(source)])
+        agent = FakeSummaryAgent()
+        service = MethodSummaryService(open_method_summary_cache(self.test_dir), source_code_model, agent)
+        builder = FeaturePromptBuilder(source_code_model, func_map_model)
+        call_chain = self.call_chain.model_copy(update={
+            "file_id": 11, "call_chain": [CallNode(file_id=12, method="GetUser", reason="")]})
+        methods = [(e, m) for e, m in builder.traced_methods(call_chain) if e.file_id != 11]
+        
+        summaries = await service.summarize("A.Get", methods)
+        self.assertEqual(agent.prompts, [])
+        self.assertEqual([(s.file_id, s.method, s.summary.desc) for s in summaries],
+                         [(12, "GetUser", "GetUser summary"), (12, "Load", "Load summary")])
+    
+    async def test_changed_body_is_summarized_again(self):
+        await self.service.summarize("A.Get", self.chain_methods())
+        entity, method = self.chain_methods()[1]
+        entity.methods[method].body_hash = "changed"
+        
+        await self.service.summarize("A.Get", [(entity, method)])
+        self.assertEqual(len(self.agent.prompts), 3)
+    
+    async def test_changed_class_members_are_summarized_again(self):
+        await self.service.summarize("A.Get", self.chain_methods())
+        entity, method = self.chain_methods()[0]
+        entity.member_hash = "changed"
+        
+        await self.service.summarize("A.Get", [(entity, method)])
+        self.assertEqual(len(self.agent.prompts), 3)
+    
+    async def test_prompt_keeps_entry_source_and_replaces_summarized_files(self):
+        summaries = await self.service.summarize("A.Get", self.chain_methods())
+        entry = EntryPointEntity(entry_id=1, file_id=1, component="UserController", name="Get")
+        prompt = self.builder.build(entry, self.call_chain, summaries)
+        
+        self.assertEqual([item["file_id"] for item in prompt["contents"]], [1])
+        self.assertEqual(
+            [(s["path"], s["method"], s["calls"], s["desc"]) for s in prompt["method_summaries"]],
+            [("src/UserService.cs", "GetUser", ["Load(id)"], "GetUser summary"),
+             ("src/UserService.cs", "Load", ["_db.Users.Find(id)"], "Load summary")]
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+from .base_storage import BaseTable
+from .storage_provider import open_table, get_run_dir, flush_all, close_all
+
+__all__ = [
+    'BaseTable',
+    'open_table',
+    'get_run_dir',
+    'flush_all',
+    'close_all'
+]
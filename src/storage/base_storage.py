@@ -0,0 +1,110 @@
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Optional
+
+
+class BaseTable(ABC):
+    """儲存後端資料表基類
+    
+    所有查詢條件皆以 `{欄位路徑: 值}` 的等值比對表示，巢狀欄位以 "." 分隔（例如 "call.expr"），
+    路徑以 "[]" 結尾代表清單欄位包含該值（例如 "funcs[]"）。
+    `indexes` 宣告 model 實際會用到的查詢欄位組合，由各後端自行決定如何利用。
+    """
+    
+    def __init__(self, name: str, indexes: Optional[list[tuple[str, ...]]] = None):
+        self.name = name
+        self.indexes = [tuple(index) for index in (indexes or [])]
+    
+    @abstractmethod
+    def all(self) -> list[dict]:
+        """Get all records in insertion order"""
+        pass
+    
+    @abstractmethod
+    def search(self, where: dict[str, Any]) -> list[dict]:
+        """Get all records whose fields equal the given values"""
+        pass
+    
+    @abstractmethod
+    def search_in(self, field: str, values: Iterable[Any]) -> list[dict]:
+        """Get all records whose field value is one of the given values"""
+        pass
+    
+    def get(self, where: dict[str, Any]) -> Optional[dict]:
+        """Get the first matching record"""
+        results = self.search(where)
+        return results[0] if results else None
+    
+    def contains(self, where: dict[str, Any]) -> bool:
+        return self.get(where) is not None
+    
+    @abstractmethod
+    def insert(self, doc: dict) -> None:
+        pass
+    
+    @abstractmethod
+    def insert_multiple(self, docs: list[dict]) -> None:
+        pass
+    
+    @abstractmethod
+    def update(self, fields: dict[str, Any], where: dict[str, Any]) -> None:
+        """Update top-level fields of all matching records"""
+        pass
+    
+    @abstractmethod
+    def truncate(self) -> None:
+        pass
+    
+    def replace_all(self, docs: list[dict]) -> None:
+        """Replace every record with docs; backends override this to do it in a single write"""
+        self.truncate()
+        self.insert_multiple(docs)
+    
+    def build_indexes(self) -> None:
+        """Precompute all declared indexes after a bulk load (no-op by default)"""
+        pass
+    
+    def load_indexes(self) -> None:
+        """Eagerly load all declared indexes so the first lookup does not pay for it (no-op by default)"""
+        pass
+    
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+def is_multi_valued(path: str) -> bool:
+    return path.endswith("[]")
+
+
+def get_field(doc: dict, path: str) -> Any:
+    """Resolve a dotted field path (e.g. "call.expr") against a record"""
+    value = doc
+    for part in path.removesuffix("[]").split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def index_keys(doc: dict, index: tuple[str, ...]) -> list[tuple]:
+    """Expand a record into its index keys; multi-valued paths yield one key per element"""
+    keys = [()]
+    for path in index:
+        value = get_field(doc, path)
+        if is_multi_valued(path):
+            values = value if isinstance(value, list) else []
+            keys = [key + (v,) for key in keys for v in dict.fromkeys(values)]
+        else:
+            keys = [key + (value,) for key in keys]
+    return keys
+
+
+def matches(doc: dict, where: dict[str, Any]) -> bool:
+    for path, value in where.items():
+        field = get_field(doc, path)
+        if is_multi_valued(path):
+            if not isinstance(field, list) or value not in field:
+                return False
+        elif field != value:
+            return False
+    return True
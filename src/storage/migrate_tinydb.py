@@ -0,0 +1,56 @@
+import argparse
+import glob
+import os
+from tinydb import TinyDB
+
+from src.storage.storage_provider import SQLITE_FILE_NAME, get_run_dir, open_table
+
+
+def migrate_run(run_id: str, overwrite: bool = False) -> dict[str, int]:
+    """
+    將既有 TinyDB run 目錄下的所有 `{table}.json` 一次性搬移到同目錄的 SQLite 資料庫
+    
+    索引欄位不在此建立，各 model 以 sqlite backend 開啟資料表時會自動補上並回填。
+    
+    Args:
+        run_id: 要搬移的執行 ID
+        overwrite: 目標資料表已有資料時是否清空重寫
+        
+    Returns:
+        每個資料表搬移的筆數
+    """
+    run_dir = get_run_dir(run_id)
+    # `{table}.idx.json` 是 TinyDB 的查詢索引，不是資料表
+    json_files = sorted(f for f in glob.glob(os.path.join(run_dir, "*.json")) if not f.endswith(".idx.json"))
+    if not json_files:
+        raise ValueError(f"No TinyDB tables found in {run_dir}")
+    
+    migrated = {}
+    for json_file in json_files:
+        name = os.path.splitext(os.path.basename(json_file))[0]
+        source = TinyDB(json_file)
+        target = open_table(run_id, name, backend="sqlite")
+        
+        if len(target) > 0:
+            if not overwrite:
+                print(f" > SKIP: {name} already exists in {SQLITE_FILE_NAME}")
+                source.close()
+                continue
+            target.truncate()
+        
+        docs = [dict(doc) for doc in source.all()]
+        target.insert_multiple(docs)
+        source.close()
+        migrated[name] = len(docs)
+        print(f" > Migrated {name}: {len(docs)} records")
+    
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate a TinyDB run directory to the SQLite storage backend.")
+    parser.add_argument("run_id", help="Run ID under the cache directory (e.g., '20250812T032052Z')")
+    parser.add_argument("--overwrite", action="store_true", help="Replace tables that already exist in the SQLite database")
+    args = parser.parse_args()
+    
+    migrate_run(args.run_id, args.overwrite)
@@ -0,0 +1,147 @@
+import json
+import os
+import sqlite3
+from typing import Any, Iterable, Optional
+
+from src.storage.base_storage import BaseTable, get_field, is_multi_valued, matches
+
+# 同一個 run 的所有 table 共用一個連線
+_connections: dict[str, sqlite3.Connection] = {}
+
+
+def get_connection(db_path: str) -> sqlite3.Connection:
+    conn = _connections.get(db_path)
+    if conn is None:
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _connections[db_path] = conn
+    return conn
+
+
+def close_connections() -> None:
+    for conn in _connections.values():
+        conn.close()
+    _connections.clear()
+
+
+class SQLiteTable(BaseTable):
+    """以 SQLite 實作的資料表
+
+    整筆紀錄以 JSON 存放於 `doc` 欄位，`indexes` 中出現的欄位路徑另外展開成實體欄位並建立索引，
+    查詢條件命中這些欄位時直接走 SQL 索引，其餘條件（包含 "[]" 清單欄位）在讀出後以 Python 比對。
+    """
+
+    def __init__(self, db_path: str, name: str, indexes: Optional[list[tuple[str, ...]]] = None):
+        super().__init__(name, indexes)
+        self.conn = get_connection(db_path)
+        self.columns: dict[str, str] = {}
+        self.sql_indexes = []
+        for index in self.indexes:
+            scalar_paths = tuple(path for path in index if not is_multi_valued(path))
+            for path in scalar_paths:
+                self.columns.setdefault(path, "ix_" + path.replace(".", "__"))
+            if scalar_paths and scalar_paths not in self.sql_indexes:
+                self.sql_indexes.append(scalar_paths)
+        self._create_table()
+
+    def _create_table(self) -> None:
+        self.conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self.name}" (id INTEGER PRIMARY KEY AUTOINCREMENT, doc TEXT NOT NULL)'
+        )
+        existing = {row[1] for row in self.conn.execute(f'PRAGMA table_info("{self.name}")')}
+        for path, column in self.columns.items():
+            if column in existing:
+                continue
+            # 既有資料表（例如 migrator 建立的）補上索引欄位並回填
+            self.conn.execute(f'ALTER TABLE "{self.name}" ADD COLUMN "{column}"')
+            self.conn.execute(
+                f'UPDATE "{self.name}" SET "{column}" = json_extract(doc, ?)', (f"$.{path}",)
+            )
+        for index in self.sql_indexes:
+            columns = [self.columns[path] for path in index]
+            index_name = "__".join([self.name] + columns)
+            cols = ", ".join(f'"{column}"' for column in columns)
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{index_name}" ON "{self.name}" ({cols})')
+
+    def _row_values(self, doc: dict) -> tuple:
+        return (json.dumps(doc, ensure_ascii=False),) + tuple(get_field(doc, path) for path in self.columns)
+
+    def _select(self, clause: str = "", params: tuple = ()) -> list[dict]:
+        rows = self.conn.execute(f'SELECT doc FROM "{self.name}" {clause} ORDER BY id', params)
+        return [json.loads(row[0]) for row in rows]
+
+    def _split_where(self, where: dict[str, Any]) -> tuple[str, tuple, dict[str, Any]]:
+        """將條件拆成可走索引的 SQL 條件與剩餘需在 Python 比對的條件"""
+        clauses, params, rest = [], [], {}
+        for path, value in where.items():
+            if path in self.columns and not isinstance(value, (dict, list)):
+                clauses.append(f'"{self.columns[path]}" IS ?')
+                params.append(value)
+            else:
+                rest[path] = value
+        clause = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return clause, tuple(params), rest
+
+    def all(self) -> list[dict]:
+        return self._select()
+
+    def search(self, where: dict[str, Any]) -> list[dict]:
+        clause, params, rest = self._split_where(where)
+        return [doc for doc in self._select(clause, params) if matches(doc, rest)]
+
+    def search_in(self, field: str, values: Iterable[Any]) -> list[dict]:
+        values = list(values)
+        if not values:
+            return []
+        if field not in self.columns:
+            return [doc for doc in self.all() if get_field(doc, field) in values]
+        placeholders = ", ".join("?" for _ in values)
+        return self._select(f'WHERE "{self.columns[field]}" IN ({placeholders})', tuple(values))
+
+    def _insert_sql(self) -> str:
+        cols = ", ".join(["doc"] + [f'"{column}"' for column in self.columns.values()])
+        placeholders = ", ".join("?" for _ in range(len(self.columns) + 1))
+        return f'INSERT INTO "{self.name}" ({cols}) VALUES ({placeholders})'
+
+    def insert(self, doc: dict) -> None:
+        self.conn.execute(self._insert_sql(), self._row_values(doc))
+
+    def insert_multiple(self, docs: list[dict]) -> None:
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(self._insert_sql(), [self._row_values(doc) for doc in docs])
+
+    def update(self, fields: dict[str, Any], where: dict[str, Any]) -> None:
+        clause, params, rest = self._split_where(where)
+        rows = self.conn.execute(f'SELECT id, doc FROM "{self.name}" {clause}', params).fetchall()
+        assignments = ", ".join(["doc = ?"] + [f'"{column}" = ?' for column in self.columns.values()])
+        updates = []
+        for row_id, raw in rows:
+            doc = json.loads(raw)
+            if not matches(doc, rest):
+                continue
+            doc.update(fields)
+            updates.append(self._row_values(doc) + (row_id,))
+        if updates:
+            with self.conn:
+                self.conn.execute("BEGIN")
+                self.conn.executemany(f'UPDATE "{self.name}" SET {assignments} WHERE id = ?', updates)
+
+    def truncate(self) -> None:
+        self.conn.execute(f'DELETE FROM "{self.name}"')
+
+    def replace_all(self, docs: list[dict]) -> None:
+        # 刪除與寫入在同一個 transaction，中途中斷時保留原本的資料
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute(f'DELETE FROM "{self.name}"')
+            self.conn.executemany(self._insert_sql(), [self._row_values(doc) for doc in docs])
+
+    def build_indexes(self) -> None:
+        """SQL 索引隨寫入維護，這裡只更新查詢規劃器的統計資訊"""
+        self.conn.execute(f'ANALYZE "{self.name}"')
+
+    def __len__(self) -> int:
+        return self.conn.execute(f'SELECT COUNT(*) FROM "{self.name}"').fetchone()[0]
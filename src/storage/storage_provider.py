@@ -0,0 +1,50 @@
+import os
+from typing import Optional
+
+from src.core.config import Config
+from src.storage.base_storage import BaseTable
+from src.storage.sqlite_storage import SQLiteTable, close_connections
+from src.storage.tinydb_storage import TinyDBTable, close_databases, flush_databases
+
+SQLITE_FILE_NAME = "cache.db"
+
+
+def get_run_dir(run_id: str) -> str:
+    return os.path.join(Config().cache_path, run_id)
+
+
+def open_table(
+    run_id: str,
+    name: str,
+    indexes: Optional[list[tuple[str, ...]]] = None,
+    backend: Optional[str] = None
+    ) -> BaseTable:
+    """
+    依 storage backend 開啟 run 底下的資料表
+    
+    Args:
+        run_id: 執行 ID，對應 `{cache_path}/{run_id}` 目錄
+        name: 資料表名稱
+        indexes: model 會用到的查詢欄位組合
+        backend: "tinydb" 或 "sqlite"，未指定時使用 Config.storage_backend
+    """
+    backend = backend or Config().storage_backend
+    run_dir = get_run_dir(run_id)
+    
+    if backend == "tinydb":
+        return TinyDBTable(run_dir, name, indexes)
+    if backend == "sqlite":
+        return SQLiteTable(os.path.join(run_dir, SQLITE_FILE_NAME), name, indexes)
+    
+    raise ValueError(f"Unsupported storage backend: {backend}")
+
+
+def flush_all() -> None:
+    """將所有尚未寫回的資料表寫入磁碟（SQLite 每次寫入即提交，不需 flush）"""
+    flush_databases()
+
+
+def close_all() -> None:
+    """寫回並關閉所有已開啟的資料表"""
+    close_databases()
+    close_connections()
@@ -0,0 +1,210 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+from tinydb import TinyDB
+
+from src.storage.sqlite_storage import SQLiteTable
+from src.storage.storage_provider import close_all, flush_all
+from src.storage.tinydb_storage import TinyDBTable
+
+
+DEPS = [
+    {"caller_file_id": 1, "caller_entity": "UserController", "call": {"method": "GetUser", "expr": "_svc.GetUser(id)"}},
+    {"caller_file_id": 1, "caller_entity": "UserController", "call": {"method": "Save", "expr": "_svc.Save(u)"}},
+    {"caller_file_id": 2, "caller_entity": "UserService", "call": {"method": "GetUser", "expr": "_svc.GetUser(id)"}},
+]
+INDEXES = [("caller_file_id", "caller_entity", "call.expr")]
+FUNC_MAPS = [
+    {"ciname": "UserController", "file_id": 1, "funcs": ["GetUser"]},
+    {"ciname": "UserService", "file_id": 2, "funcs": ["GetUser", "Save"]},
+]
+
+
+class StorageContract:
+    """Behaviour shared by every storage backend"""
+    
+    def make_table(self, name: str, indexes=None):
+        raise NotImplementedError
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.table = self.make_table("dep", INDEXES)
+        self.table.insert_multiple(DEPS)
+    
+    def tearDown(self):
+        close_all()
+        shutil.rmtree(self.test_dir)
+    
+    def test_all_keeps_insertion_order(self):
+        self.assertEqual(self.table.all(), DEPS)
+        self.assertEqual(len(self.table), 3)
+    
+    def test_search_by_nested_field(self):
+        results = self.table.search({"caller_file_id": 1, "caller_entity": "UserController", "call.expr": "_svc.Save(u)"})
+        self.assertEqual(results, [DEPS[1]])
+    
+    def test_search_on_unindexed_field(self):
+        results = self.table.search({"call.method": "GetUser"})
+        self.assertEqual(results, [DEPS[0], DEPS[2]])
+    
+    def test_search_in(self):
+        results = self.table.search_in("caller_file_id", [2, 3])
+        self.assertEqual(results, [DEPS[2]])
+    
+    def test_get_and_contains(self):
+        self.assertEqual(self.table.get({"caller_file_id": 2}), DEPS[2])
+        self.assertIsNone(self.table.get({"caller_file_id": 9}))
+        self.assertFalse(self.table.contains({"caller_entity": "Nope"}))
+    
+    def test_update_keeps_index_in_sync(self):
+        self.table.update({"caller_entity": "AdminController"}, {"caller_file_id": 1})
+        self.assertEqual(len(self.table.search({"caller_entity": "AdminController"})), 2)
+        self.assertEqual(self.table.search({"caller_file_id": 1, "caller_entity": "UserController"}), [])
+    
+    def test_truncate(self):
+        self.table.truncate()
+        self.assertEqual(len(self.table), 0)
+    
+    def test_replace_all(self):
+        self.table.replace_all(DEPS[:1])
+        self.assertEqual(self.table.all(), DEPS[:1])
+        self.assertEqual(len(self.table.search({"caller_file_id": 1})), 1)
+        self.table.insert(DEPS[1])
+        self.assertEqual(self.table.all(), DEPS[:2])
+    
+    def test_search_multi_valued_field(self):
+        funcs = self.make_table("func_map", [("ciname", "file_id", "funcs[]")])
+        funcs.insert_multiple(FUNC_MAPS)
+        funcs.build_indexes()
+        
+        self.assertEqual(funcs.search({"ciname": "UserService", "file_id": 2, "funcs[]": "Save"}), [FUNC_MAPS[1]])
+        self.assertEqual(funcs.search({"ciname": "UserService", "file_id": 2, "funcs[]": "Delete"}), [])
+        self.assertEqual(funcs.search({"funcs[]": "GetUser"}), FUNC_MAPS)
+
+
+class TestTinyDBTable(StorageContract, TestCase):
+    
+    def make_table(self, name, indexes=None):
+        return TinyDBTable(self.test_dir, name, indexes)
+
+
+class TestTinyDBTableCache(TestCase):
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        close_all()
+        shutil.rmtree(self.test_dir)
+    
+    def test_tables_share_memory_and_write_behind(self):
+        writer = TinyDBTable(self.test_dir, "dep", INDEXES)
+        reader = TinyDBTable(self.test_dir, "dep", INDEXES)
+        writer.insert_multiple(DEPS)
+        
+        # 同一個檔案共用記憶體中的資料，寫入在 flush 前不落地
+        self.assertEqual(len(reader), 3)
+        with open(os.path.join(self.test_dir, "dep.json")) as f:
+            self.assertNotIn("GetUser", f.read())
+        
+        flush_all()
+        with open(os.path.join(self.test_dir, "dep.json")) as f:
+            self.assertIn("GetUser", f.read())
+    
+    def test_index_invalidated_on_write(self):
+        table = TinyDBTable(self.test_dir, "dep", INDEXES)
+        table.insert_multiple(DEPS[:1])
+        where = {"caller_file_id": 2, "caller_entity": "UserService", "call.expr": "_svc.GetUser(id)"}
+        self.assertEqual(table.search(where), [])
+        
+        table.insert(DEPS[2])
+        self.assertEqual(table.search(where), [DEPS[2]])
+
+
+class TestPersistedIndex(TestCase):
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        close_all()
+        shutil.rmtree(self.test_dir)
+    
+    def test_index_reloaded_from_disk(self):
+        table = TinyDBTable(self.test_dir, "dep", INDEXES)
+        table.insert_multiple(DEPS)
+        table.build_indexes()
+        close_all()
+        
+        reopened = TinyDBTable(self.test_dir, "dep", INDEXES)
+        index = INDEXES[0]
+        self.assertIsNotNone(reopened._load_persisted(index))
+        self.assertEqual(reopened.search(dict(zip(index, (1, "UserController", "_svc.Save(u)")))), [DEPS[1]])
+    
+    def test_stale_index_discarded(self):
+        table = TinyDBTable(self.test_dir, "dep", INDEXES)
+        table.insert_multiple(DEPS)
+        table.build_indexes()
+        table.truncate()
+        table.insert_multiple(DEPS[::-1])
+        
+        self.assertFalse(os.path.exists(table.index_path))
+        self.assertEqual(table.search({"caller_file_id": 2, "caller_entity": "UserService", "call.expr": "_svc.GetUser(id)"}), [DEPS[2]])
+
+
+class TestSQLiteTable(StorageContract, TestCase):
+    
+    def make_table(self, name, indexes=None):
+        return SQLiteTable(os.path.join(self.test_dir, "cache.db"), name, indexes)
+    
+    def test_index_added_to_existing_table(self):
+        """Tables created without indexes (e.g. by the migrator) get backfilled columns"""
+        plain = self.make_table("plain")
+        plain.insert_multiple(DEPS)
+        
+        indexed = self.make_table("plain", INDEXES)
+        self.assertEqual(indexed.search({"caller_file_id": 2, "caller_entity": "UserService", "call.expr": "_svc.GetUser(id)"}), [DEPS[2]])
+
+
+class TestMigrateTinyDB(TestCase):
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.prev_cache_path = os.environ.get("CACHE_PATH")
+        os.environ["CACHE_PATH"] = self.test_dir
+    
+    def tearDown(self):
+        close_all()
+        if self.prev_cache_path is None:
+            os.environ.pop("CACHE_PATH", None)
+        else:
+            os.environ["CACHE_PATH"] = self.prev_cache_path
+        shutil.rmtree(self.test_dir)
+    
+    def test_migrate_run(self):
+        from src.storage.migrate_tinydb import migrate_run
+        from src.model import DependencyModel
+        
+        run_dir = os.path.join(self.test_dir, "run1")
+        os.makedirs(run_dir)
+        db = TinyDB(os.path.join(run_dir, "dep.json"))
+        db.insert_multiple([dict(dep, caller_func="Get", callee_file_if=3, callee_entity="UserService") for dep in DEPS])
+        db.close()
+        # 索引檔不應被當成資料表搬移
+        with open(os.path.join(run_dir, "dep.idx.json"), "w") as f:
+            f.write('{"version": 1, "indexes": {}}')
+        
+        self.assertEqual(migrate_run("run1"), {"dep": 3})
+        
+        os.environ["STORAGE_BACKEND"] = "sqlite"
+        try:
+            deps = DependencyModel("run1").find_callee_by_caller(1, "UserController", "_svc.GetUser(id)")
+        finally:
+            os.environ.pop("STORAGE_BACKEND")
+        self.assertEqual([dep.callee_entity for dep in deps], ["UserService"])
+
+
+if __name__ == '__main__':
+    main()
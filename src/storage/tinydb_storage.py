@@ -0,0 +1,220 @@
+import json
+import os
+from functools import reduce
+from typing import Any, Iterable, Optional
+from tinydb import TinyDB, Query
+from tinydb.middlewares import CachingMiddleware
+from tinydb.storages import JSONStorage
+
+from src.storage.base_storage import BaseTable, index_keys, is_multi_valued
+
+
+class WriteBehindMiddleware(CachingMiddleware):
+    """讀取一律走記憶體；寫入累積在記憶體，由 flush_databases() 在階段邊界統一寫回"""
+
+    WRITE_CACHE_SIZE = 10000
+
+
+# 同一個 JSON 檔在整個 process 內只載入一次，所有 model / tool 共用
+_databases: dict[str, TinyDB] = {}
+# 每個 JSON 檔的等值索引: {index 欄位: {key: [doc_id, ...]}}，寫入時清除受影響的索引
+_index_maps: dict[str, dict[tuple[str, ...], dict[tuple, list[int]]]] = {}
+
+
+def get_database(path: str) -> TinyDB:
+    path = os.path.abspath(path)
+    db = _databases.get(path)
+    if db is None:
+        db = TinyDB(path, storage=WriteBehindMiddleware(JSONStorage))
+        _databases[path] = db
+        _index_maps[path] = {}
+    return db
+
+
+def flush_databases() -> None:
+    for db in _databases.values():
+        db.storage.flush()
+
+
+def close_databases() -> None:
+    for db in _databases.values():
+        db.close()
+    _databases.clear()
+    _index_maps.clear()
+
+
+class TinyDBTable(BaseTable):
+    """以 TinyDB JSON 檔案實作的資料表，每個 table 對應 `{db_dir}/{name}.json`
+
+    資料在第一次讀取時載入記憶體並在 process 內共用，`indexes` 宣告的欄位組合會在第一次查詢時
+    建立記憶體雜湊索引，之後同樣條件的查詢不必掃描整張表。
+    build_indexes() 會把索引另存為 `{db_dir}/{name}.idx.json`，之後的 run 直接載入而不必重建。
+    """
+
+    def __init__(self, db_dir: str, name: str, indexes: Optional[list[tuple[str, ...]]] = None):
+        super().__init__(name, indexes)
+        os.makedirs(db_dir, exist_ok=True)
+        path = os.path.abspath(f"{db_dir}/{name}.json")
+        self.db = get_database(path)
+        self._index_map = _index_maps[path]
+        self.index_path = os.path.abspath(f"{db_dir}/{name}.idx.json")
+
+    def _field(self, path: str):
+        q = Query()
+        for part in path.removesuffix("[]").split("."):
+            q = q[part]
+        return q
+
+    def _cond(self, where: dict[str, Any]):
+        return reduce(lambda a, b: a & b, [
+            self._field(path).any([value]) if is_multi_valued(path) else self._field(path) == value
+            for path, value in where.items()
+        ])
+
+    def _find_index(self, where: dict[str, Any]) -> Optional[tuple[str, ...]]:
+        keys = set(where)
+        for index in self.indexes:
+            if set(index) == keys:
+                return index
+        return None
+
+    def _lookup(self, index: tuple[str, ...], where: dict[str, Any]) -> Optional[list[dict]]:
+        """透過記憶體索引查詢；條件值不可雜湊時回傳 None 交由掃描處理"""
+        try:
+            key = tuple(where[path] for path in index)
+            hash(key)
+        except TypeError:
+            return None
+
+        index_map = self._get_index(index)
+        return [self.db.get(doc_id=doc_id) for doc_id in index_map.get(key, [])]
+
+    def _get_index(self, index: tuple[str, ...]) -> dict[tuple, list[int]]:
+        index_map = self._index_map.get(index)
+        if index_map is None:
+            index_map = self._load_persisted(index)
+            if index_map is None:
+                index_map = self._build_index(index)
+            self._index_map[index] = index_map
+        return index_map
+
+    def _build_index(self, index: tuple[str, ...], docs: Optional[list[dict]] = None) -> dict[tuple, list[int]]:
+        index_map = {}
+        for doc in self.db.all() if docs is None else docs:
+            for doc_key in index_keys(doc, index):
+                try:
+                    index_map.setdefault(doc_key, []).append(doc.doc_id)
+                except TypeError:
+                    continue
+        return index_map
+
+    def _stamp(self, docs: Optional[list[dict]] = None) -> list[int]:
+        """用筆數與最後一筆 doc_id 判斷持久化索引是否仍對應目前資料"""
+        docs = self.db.all() if docs is None else docs
+        return [len(docs), docs[-1].doc_id if docs else 0]
+
+    def _load_persisted(self, index: tuple[str, ...]) -> Optional[dict[tuple, list[int]]]:
+        if not os.path.exists(self.index_path):
+            return None
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                persisted = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if persisted.get("stamp") != self._stamp():
+            return None
+        entries = persisted.get("indexes", {}).get("|".join(index))
+        if entries is None:
+            return None
+        return {tuple(key): doc_ids for key, doc_ids in entries}
+
+    def build_indexes(self) -> None:
+        """建立所有宣告的索引並寫入 `{name}.idx.json`"""
+        docs = self.db.all()
+        persisted = {}
+        for index in self.indexes:
+            index_map = self._build_index(index, docs)
+            self._index_map[index] = index_map
+            persisted["|".join(index)] = [[list(key), doc_ids] for key, doc_ids in index_map.items()]
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump({"stamp": self._stamp(docs), "indexes": persisted}, f, ensure_ascii=False)
+
+    def load_indexes(self) -> None:
+        for index in self.indexes:
+            self._get_index(index)
+
+    def _invalidate(self, fields: Optional[Iterable[str]] = None) -> None:
+        """清除受影響的索引；未指定欄位時全部清除"""
+        if fields is None:
+            affected = list(self.indexes)
+        else:
+            fields = set(fields)
+            affected = [
+                index for index in self.indexes
+                if any(path.removesuffix("[]").split(".")[0] in fields for path in index)
+            ]
+        for index in affected:
+            self._index_map.pop(index, None)
+        if affected and os.path.exists(self.index_path):
+            os.remove(self.index_path)
+
+    def all(self) -> list[dict]:
+        return self.db.all()
+
+    def search(self, where: dict[str, Any]) -> list[dict]:
+        if not where:
+            return self.all()
+        index = self._find_index(where)
+        if index:
+            results = self._lookup(index, where)
+            if results is not None:
+                return results
+        return self.db.search(self._cond(where))
+
+    def search_in(self, field: str, values: Iterable[Any]) -> list[dict]:
+        return self.db.search(self._field(field).one_of(list(values)))
+
+    def get(self, where: dict[str, Any]) -> Optional[dict]:
+        if self._find_index(where):
+            results = self.search(where)
+            return results[0] if results else None
+        return self.db.get(self._cond(where))
+
+    def contains(self, where: dict[str, Any]) -> bool:
+        return self.get(where) is not None
+
+    def insert(self, doc: dict) -> None:
+        self.db.insert(doc)
+        self._invalidate()
+
+    def insert_multiple(self, docs: list[dict]) -> None:
+        self.db.insert_multiple(docs)
+        self._invalidate()
+
+    def update(self, fields: dict[str, Any], where: dict[str, Any]) -> None:
+        if self._find_index(where):
+            doc_ids = [doc.doc_id for doc in self.search(where)]
+            if doc_ids:
+                self.db.update(fields, doc_ids=doc_ids)
+        else:
+            self.db.update(fields, self._cond(where))
+        self._invalidate(fields)
+
+    def truncate(self) -> None:
+        self.db.truncate()
+        self._invalidate()
+
+    def replace_all(self, docs: list[dict]) -> None:
+        # 以單次 table 寫入取代，避免 truncate 之後、insert 之前被寫回檔案而留下空表
+        table = self.db.table(self.db.default_table_name)
+
+        def replace(rows: dict) -> None:
+            rows.clear()
+            rows.update({doc_id: dict(doc) for doc_id, doc in enumerate(docs, start=1)})
+
+        table._update_table(replace)
+        table._next_id = None
+        self._invalidate()
+
+    def __len__(self) -> int:
+        return len(self.db)
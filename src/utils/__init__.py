@@ -1,9 +1,16 @@
 from .extract_json_response import extract_json_response
 from .crawl_local_files import crawl_local_files
 from .compress_content import compress_content
+from .run_agent_task import run_agent_task
+from .source_snippet import slice_span, class_outline
+from .token_estimator import estimate_text_tokens
 
 __all__ = [
     'extract_json_response',
     'crawl_local_files',
-    'compress_content'
+    'compress_content',
+    'run_agent_task',
+    'slice_span',
+    'class_outline',
+    'estimate_text_tokens'
 ]
\ No newline at end of file
@@ -0,0 +1,18 @@
+from autogen_agentchat.base import TaskResult
+from autogen_agentchat.ui import Console
+
+
+async def run_agent_task(runner, task: str, stream: bool = True, output_stats: bool = True) -> TaskResult:
+    """
+    Run an agent or team on a task
+    
+    Args:
+        runner: AssistantAgent or team exposing run / run_stream
+        task: Task prompt
+        stream: Stream every message to the console; disable when several entries run
+            concurrently so their outputs do not interleave
+        output_stats: Print token usage stats when streaming
+    """
+    if stream:
+        return await Console(runner.run_stream(task=task), output_stats=output_stats)
+    return await runner.run(task=task)
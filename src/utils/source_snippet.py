@@ -0,0 +1,39 @@
+from typing import Iterable
+
+from src.entity.func_map_entity import FuncMapEntity
+from src.entity.source_span_entity import SourceSpanEntity
+
+
+def slice_span(content: str, span: SourceSpanEntity) -> str:
+    """依 byte 範圍切出原始碼（範圍以 UTF-8 編碼計算，中文註解不會造成位移）"""
+    return content.encode("utf-8")[span.start_byte:span.end_byte].decode("utf-8", errors="replace")
+
+
+def class_outline(content: str, entity: FuncMapEntity, keep: Iterable[str]) -> str:
+    """
+    取出類別原始碼，只保留 keep 中的方法，其餘方法以一行註解取代
+
+    欄位、屬性、建構子與 attribute 都保留，讓模型看得到注入的相依與路由設定。
+    entity 沒有範圍資訊（舊版分析器的資料）時回傳空字串，由呼叫端退回整個檔案。
+    """
+    if entity.span is None:
+        return ""
+    keep = set(keep)
+    kept = [info for name, info in entity.methods.items() if name in keep]
+    # 多載的範圍涵蓋第一個到最後一個，與保留的方法重疊時不省略，避免把保留的方法一起刪掉
+    omitted = sorted(
+        (info.start_byte, info.end_byte, name) for name, info in entity.methods.items()
+        if name not in keep and not any(k.start_byte < info.end_byte and info.start_byte < k.end_byte for k in kept)
+    )
+    
+    data = content.encode("utf-8")
+    parts = []
+    pos = entity.span.start_byte
+    for start, end, name in omitted:
+        if start < pos:
+            continue
+        parts.append(data[pos:start])
+        parts.append(f"// {name}(...) omitted".encode("utf-8"))
+        pos = end
+    parts.append(data[pos:entity.span.end_byte])
+    return b"".join(parts).decode("utf-8", errors="replace")
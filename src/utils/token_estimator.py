@@ -0,0 +1,8 @@
+def estimate_text_tokens(text: str) -> int:
+    """
+    在本機粗估文字的 token 數，不需要呼叫模型的 count_tokens API
+
+    ASCII（程式碼、英文、JSON）約 4 個字元 1 個 token；中日韓等非 ASCII 字元通常各自成為 1 個以上的 token，以 1 個計。
+    """
+    ascii_chars = len(text.encode("ascii", errors="ignore"))
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1